@@ -10,7 +10,10 @@ import sys
 import time
 import datetime
 import asyncio
+import queue
+import threading
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -38,7 +41,7 @@ from tradingagents.default_config import DEFAULT_CONFIG
 
 # 导入频率限制器统计
 try:
-    from tradingagents.dataflows.rate_limiter import get_api_statistics, reset_api_statistics
+    from tradingagents.dataflows.rate_limiter import get_api_statistics, reset_api_statistics, get_global_rate_limiter
     RATE_LIMITER_AVAILABLE = True
 except ImportError:
     RATE_LIMITER_AVAILABLE = False
@@ -51,10 +54,14 @@ logger = get_logger("auto_analysis")
 console = Console()
 
 class MySQLManager:
-    """MySQL数据库管理器"""
+    """MySQL数据库管理器（线程安全的连接池，pymysql连接不能跨线程共享）"""
     
-    def __init__(self):
-        self.connection = None
+    def __init__(self, pool_size: int = 4):
+        self.pool_size = max(1, pool_size)
+        self._pool: "queue.Queue" = queue.Queue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+        self.connected = False
         self.config = {
             'host': os.getenv('MYSQL_HOST', 'localhost'),
             'port': int(os.getenv('MYSQL_PORT', 3306)),
@@ -65,31 +72,71 @@ class MySQLManager:
         }
         
     def connect(self) -> bool:
-        """连接到MySQL数据库"""
+        """连接到MySQL数据库（创建第一个池内连接，其余按需创建）"""
         try:
-            self.connection = pymysql.connect(**self.config)
-            logger.info(f"✅ 成功连接到MySQL数据库: {self.config['host']}:{self.config['port']}/{self.config['database']}")
+            self._pool.put(self._new_connection())
+            self.connected = True
+            logger.info(f"✅ 成功连接到MySQL数据库: {self.config['host']}:{self.config['port']}/{self.config['database']} (连接池上限: {self.pool_size})")
             return True
         except Exception as e:
             logger.error(f"❌ 连接MySQL数据库失败: {e}")
             console.print(f"[red]❌ 数据库连接失败: {e}[/red]")
             return False
     
+    def _new_connection(self):
+        with self._pool_lock:
+            self._created += 1
+        try:
+            return pymysql.connect(**self.config)
+        except Exception:
+            with self._pool_lock:
+                self._created -= 1
+            raise
+    
+    @contextmanager
+    def connection(self):
+        """从连接池借出一个连接，用完归还"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_create = self._created < self.pool_size
+            conn = self._new_connection() if can_create else self._pool.get()
+        
+        try:
+            conn.ping(reconnect=True)
+            yield conn
+        finally:
+            self._pool.put(conn)
+    
     def disconnect(self):
-        """断开数据库连接"""
-        if self.connection:
-            self.connection.close()
-            logger.info("🔌 已断开MySQL数据库连接")
+        """断开所有数据库连接"""
+        closed = 0
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Exception:
+                pass
+            closed += 1
+        with self._pool_lock:
+            self._created = 0
+        if self.connected:
+            self.connected = False
+            logger.info(f"🔌 已断开MySQL数据库连接 ({closed}个)")
     
     def get_today_stocks(self) -> List[str]:
         """获取今日的股票代码列表"""
-        if not self.connection:
+        if not self.connected:
             return []
         
         today = datetime.date.today().strftime('%Y-%m-%d')
         
         try:
-            with self.connection.cursor() as cursor:
+            with self.connection() as conn, conn.cursor() as cursor:
                 sql = "SELECT DISTINCT code FROM rising_stocks WHERE record_date = %s"
                 cursor.execute(sql, (today,))
                 results = cursor.fetchall()
@@ -105,11 +152,11 @@ class MySQLManager:
     
     def create_response_table(self):
         """创建response表（如果不存在）"""
-        if not self.connection:
+        if not self.connected:
             return False
         
         try:
-            with self.connection.cursor() as cursor:
+            with self.connection() as conn, conn.cursor() as cursor:
                 sql = """
                 CREATE TABLE IF NOT EXISTS response (
                     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -128,7 +175,7 @@ class MySQLManager:
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='股票分析结果表'
                 """
                 cursor.execute(sql)
-                self.connection.commit()
+                conn.commit()
                 logger.info("✅ response表已创建或已存在")
                 return True
                 
@@ -139,11 +186,11 @@ class MySQLManager:
     
     def save_analysis_result(self, stock_code: str, result: Dict[str, Any]) -> bool:
         """保存分析结果到数据库"""
-        if not self.connection:
+        if not self.connected:
             return False
         
         try:
-            with self.connection.cursor() as cursor:
+            with self.connection() as conn, conn.cursor() as cursor:
                 sql = """
                 INSERT INTO response (
                     stock_code, action, target_price, confidence, 
@@ -164,7 +211,7 @@ class MySQLManager:
                 )
                 
                 cursor.execute(sql, values)
-                self.connection.commit()
+                conn.commit()
                 
                 logger.info(f"✅ 股票 {stock_code} 分析结果已保存到数据库")
                 return True
@@ -178,16 +225,20 @@ class AutoAnalyzer:
     """自动化分析器"""
     
     def __init__(self, max_workers: int = 4):
-        self.max_workers = max_workers
-        self.db_manager = MySQLManager()
-        self.trading_graph = None
+        self.max_workers = max(1, max_workers)
+        self.db_manager = MySQLManager(pool_size=self.max_workers)
+        self.config: Optional[Dict[str, Any]] = None
+        self.selected_analysts: List[str] = []
+        
+        # TradingAgentsGraph.run 是可重入的，所有工作线程共享同一个已编译的交易图
+        self.graph: Optional[TradingAgentsGraph] = None
         
         # 重置API统计信息
         if RATE_LIMITER_AVAILABLE:
             reset_api_statistics()
             logger.info(f"📊 已重置API频率限制器统计信息")
         
-        logger.info(f"📊 自动分析器初始化完成 (并发数: {max_workers})")
+        logger.info(f"📊 自动分析器初始化完成 (并发数: {self.max_workers})")
         logger.info(f"📊 API频率限制: {'已启用' if RATE_LIMITER_AVAILABLE else '未启用'}")
         
     def initialize(self) -> bool:
@@ -205,20 +256,20 @@ class AutoAnalyzer:
         # 初始化交易图
         try:
             # 确保包含所有分析师，特别是新闻分析师和情绪分析师
-            selected_analysts = ["market", "social", "news", "fundamentals"]
+            self.selected_analysts = ["market", "social", "news", "fundamentals"]
             
             # 创建配置副本并禁用memory功能
-            config = DEFAULT_CONFIG.copy()
-            config["memory_enabled"] = False
+            self.config = DEFAULT_CONFIG.copy()
+            self.config["memory_enabled"] = False
             
-            self.trading_graph = TradingAgentsGraph(
-                selected_analysts=selected_analysts,
-                config=config,
+            self.graph = TradingAgentsGraph(
+                selected_analysts=self.selected_analysts,
+                config=self.config,
                 debug=False
             )
-            logger.info(f"✅ TradingAgentsGraph 初始化成功，包含分析师: {selected_analysts}")
+            logger.info(f"✅ TradingAgentsGraph 初始化成功，包含分析师: {self.selected_analysts}")
             logger.info(f"🚫 Memory功能已禁用，不会从历史记忆中获取信息")
-            console.print(f"[green]✅ 已启用分析师: {', '.join(selected_analysts)}[/green]")
+            console.print(f"[green]✅ 已启用分析师: {', '.join(self.selected_analysts)}[/green]")
             console.print(f"[yellow]🚫 Memory功能已禁用，每次分析都是独立的[/yellow]")
             return True
         except Exception as e:
@@ -226,13 +277,28 @@ class AutoAnalyzer:
             console.print(f"[red]❌ 交易图初始化失败: {e}[/red]")
             return False
     
+    def _resolve_workers(self, task_count: int) -> int:
+        """
+        计算实际并发数：不超过任务数，也不超过LLM数据源令牌桶的突发容量，
+        否则多出的线程只会在频率限制器上排队
+        """
+        workers = min(self.max_workers, max(1, task_count))
+        if RATE_LIMITER_AVAILABLE and self.config:
+            provider = str(self.config.get("llm_provider", "")).lower()
+            bucket = get_global_rate_limiter().buckets.get(provider)
+            if bucket is not None and bucket.capacity < workers:
+                logger.info(f"📊 {provider} 突发容量为 {bucket.capacity}，并发数由 {workers} 调整为 {bucket.capacity}")
+                workers = bucket.capacity
+        return workers
+    
     def analyze_stock(self, stock_code: str) -> Optional[Dict[str, Any]]:
         """分析单只股票"""
         try:
             console.print(f"\n🔍 开始分析股票: [bold cyan]{stock_code}[/bold cyan]")
             
-            # 执行分析
-            state, result = self.trading_graph.propagate(stock_code, datetime.date.today().strftime("%Y-%m-%d"))
+            # 执行分析（每次运行的状态保存在返回的运行上下文中）
+            run = self.graph.run(stock_code, datetime.date.today().strftime("%Y-%m-%d"))
+            state, result = run.final_state, run.decision
             
             # 提取关键信息
             if result and isinstance(result, dict):
@@ -300,6 +366,7 @@ class AutoAnalyzer:
     
     def analyze_and_save_stock(self, stock_code: str) -> Dict[str, Any]:
         """分析并保存单只股票的结果"""
+        start_time = time.time()
         try:
             console.print(f"🔍 开始分析股票: [bold cyan]{stock_code}[/bold cyan]")
             
@@ -310,18 +377,22 @@ class AutoAnalyzer:
                 # 保存结果
                 if self.db_manager.save_analysis_result(stock_code, result):
                     console.print(f"[green]✅ {stock_code} 分析并保存成功[/green]")
-                    return {'stock_code': stock_code, 'status': 'success', 'result': result}
+                    status = 'success'
                 else:
                     console.print(f"[red]❌ {stock_code} 保存失败[/red]")
-                    return {'stock_code': stock_code, 'status': 'save_failed', 'result': result}
+                    status = 'save_failed'
             else:
                 console.print(f"[red]❌ {stock_code} 分析失败[/red]")
-                return {'stock_code': stock_code, 'status': 'analysis_failed', 'result': None}
+                status = 'analysis_failed'
                 
         except Exception as e:
             logger.error(f"❌ 处理股票 {stock_code} 时发生错误: {e}")
             console.print(f"[red]❌ 处理股票 {stock_code} 时发生错误: {e}[/red]")
-            return {'stock_code': stock_code, 'status': 'error', 'result': None}
+            result, status = None, 'error'
+        
+        duration = time.time() - start_time
+        logger.info(f"⏱️ 股票 {stock_code} 处理耗时: {duration:.1f}秒 ({status})")
+        return {'stock_code': stock_code, 'status': status, 'result': result, 'duration': duration}
     
     async def run_analysis_async(self):
         """运行异步自动化分析"""
@@ -336,7 +407,8 @@ class AutoAnalyzer:
                 console.print("[yellow]⚠️ 今日没有找到需要分析的股票[/yellow]")
                 return
             
-            console.print(f"[bold green]📊 获取到 {len(stock_codes)} 只股票，将使用 {self.max_workers} 个并发线程进行分析[/bold green]")
+            workers = self._resolve_workers(len(stock_codes))
+            console.print(f"[bold green]📊 获取到 {len(stock_codes)} 只股票，将使用 {workers} 个并发线程进行分析[/bold green]")
             
             # 显示分析计划
             table = Table(title="📋 分析计划")
@@ -350,9 +422,10 @@ class AutoAnalyzer:
             console.print(table)
             
             # 使用线程池执行器进行并发分析
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
+            batch_start = time.time()
             
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto_analysis") as executor:
                 # 创建任务列表
                 tasks = []
                 for stock_code in stock_codes:
@@ -374,6 +447,8 @@ class AutoAnalyzer:
                         status_color = "green" if result['status'] == 'success' else "red"
                         console.print(f"[{status_color}]完成: {result['stock_code']} - {result['status']}[/{status_color}]")
             
+            total_duration = time.time() - batch_start
+            
             # 统计结果
             successful_count = sum(1 for r in results if r['status'] == 'success')
             failed_count = len(results) - successful_count
@@ -392,6 +467,17 @@ class AutoAnalyzer:
             console.print(f"✅ 成功: {successful_count}")
             console.print(f"❌ 失败: {failed_count}")
             console.print(f"📊 总计: {len(stock_codes)}")
+            if total_duration > 0:
+                console.print(f"⏱️ 总耗时: {total_duration:.1f}秒, 吞吐量: {len(results) / total_duration * 60:.2f} 只/分钟")
+            
+            # 显示每只股票的耗时
+            timing_table = Table(title="⏱️ 分析耗时")
+            timing_table.add_column("股票代码", style="magenta")
+            timing_table.add_column("状态", style="green")
+            timing_table.add_column("耗时(秒)", justify="right", style="cyan")
+            for r in sorted(results, key=lambda r: r['duration'], reverse=True):
+                timing_table.add_row(r['stock_code'], r['status'], f"{r['duration']:.1f}")
+            console.print(timing_table)
             
             # 显示API统计信息
             if api_stats:
@@ -401,6 +487,14 @@ class AutoAnalyzer:
                 console.print(f"  剩余调用额度: {api_stats['remaining_calls']}")
                 console.print(f"  被阻止次数: {api_stats['blocked_calls']}")
                 console.print(f"  平均调用频率: {api_stats['calls_per_second']:.2f} 次/秒")
+                for provider, bucket_stats in api_stats.get('buckets', {}).items():
+                    if bucket_stats['total_calls'] == 0:
+                        continue
+                    console.print(
+                        f"  [{provider}] 调用 {bucket_stats['total_calls']} 次, "
+                        f"限流 {bucket_stats['blocked_calls']} 次, "
+                        f"累计等待 {bucket_stats['total_wait_seconds']:.1f}秒"
+                    )
             
             # 显示失败的股票详情
             failed_stocks = [r for r in results if r['status'] != 'success']
@@ -423,7 +517,9 @@ class AutoAnalyzer:
 
 def main():
     """主函数"""
-    analyzer = AutoAnalyzer(max_workers=4)  # 并发数量限制为4
+    # 并发数量默认4，可通过 AUTO_ANALYSIS_MAX_WORKERS 调整（实际值还受LLM频率限制约束）
+    max_workers = int(os.getenv('AUTO_ANALYSIS_MAX_WORKERS', 4))
+    analyzer = AutoAnalyzer(max_workers=max_workers)
     analyzer.run_analysis()
 
 if __name__ == "__main__":
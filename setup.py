@@ -19,6 +19,7 @@ setup(
         "langgraph>=0.0.20",
         "numpy>=1.24.0",
         "pandas>=2.0.0",
+        "pyarrow>=15.0.0",
         "praw>=7.7.0",
         "stockstats>=0.5.4",
         "yfinance>=0.2.31",
@@ -25,39 +25,33 @@ def test_direct_limiter():
         
         print("3. 测试基本属性...")
         print(f"   最大调用频率: {limiter.max_calls_per_minute}")
-        print(f"   警告阈值: {limiter.warning_threshold}")
-        print(f"   基础等待时间: {limiter.base_wait_time}")
+        print(f"   突发容量: {limiter.get_bucket('tushare').capacity}")
+        print(f"   已配置数据源: {list(limiter.buckets.keys())}")
         print("   ✅ 基本属性正常")
         
-        print("4. 测试统计信息（直接调用）...")
-        # 直接在锁内获取信息，避免死锁
-        with limiter.lock:
-            limiter._cleanup_old_timestamps()
-            current_count = len(limiter.call_timestamps)
-            remaining = limiter.max_calls_per_minute - current_count
-            print(f"   当前调用次数: {current_count}")
-            print(f"   剩余调用次数: {remaining}")
-            print(f"   总调用次数: {limiter.total_calls}")
+        print("4. 测试统计信息...")
+        stats = limiter.get_statistics()
+        print(f"   当前调用次数: {stats['current_calls_per_minute']}")
+        print(f"   剩余调用次数: {stats['remaining_calls']}")
+        print(f"   总调用次数: {stats['total_calls']}")
         print("   ✅ 统计信息获取成功")
         
-        print("5. 测试单次API调用（无等待）...")
-        # 临时设置基础等待时间为0
-        original_wait = limiter.base_wait_time
-        limiter.base_wait_time = 0
-        
+        print("5. 测试单次API调用（令牌充足时无等待）...")
         start_time = time.time()
         result = limiter.wait_for_api_call("test_api")
         end_time = time.time()
         
         print(f"   调用结果: {result}")
         print(f"   耗时: {end_time - start_time:.3f}秒")
-        
-        # 恢复原始等待时间
-        limiter.base_wait_time = original_wait
+        assert end_time - start_time < 0.1, "令牌充足时不应等待"
         print("   ✅ API调用测试成功")
         
+        print("6. 测试非阻塞获取...")
+        print(f"   try_acquire: {limiter.try_acquire('akshare')}")
+        print("   ✅ 非阻塞获取成功")
+        
         print("\n✅ 所有测试通过！频率限制器工作正常")
-        print("\n📊 当API调用达到950次时，程序会进入60秒缓冲期")
+        print("\n📊 令牌耗尽时才会等待，等待时间为补足一个令牌所需的时间")
         
     except Exception as e:
         print(f"❌ 测试失败: {e}")
@@ -142,9 +142,9 @@ def test_rate_limiter_configuration():
     
     print(f"频率限制器配置:")
     print(f"  最大调用频率: {limiter.max_calls_per_minute}/分钟")
-    print(f"  警告阈值: {limiter.warning_threshold}/分钟")
+    print(f"  突发容量: {limiter.get_bucket('tushare').capacity}")
     print(f"  安全边距: {limiter.safety_margin}")
-    print(f"  基础等待时间: {limiter.base_wait_time}秒")
+    print(f"  已配置数据源: {list(limiter.buckets.keys())}")
     
     # 测试统计信息获取
     stats = get_api_statistics()
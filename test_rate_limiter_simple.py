@@ -36,8 +36,8 @@ def test_basic_functionality():
     limiter = get_global_rate_limiter()
     print(f"\n📊 频率限制器配置:")
     print(f"  最大调用频率: {limiter.max_calls_per_minute}/分钟")
-    print(f"  警告阈值: {limiter.warning_threshold}/分钟")
-    print(f"  基础等待时间: {limiter.base_wait_time}秒")
+    print(f"  突发容量: {limiter.get_bucket('tushare').capacity}")
+    print(f"  已配置数据源: {list(limiter.buckets.keys())}")
     
     # 测试5次API调用
     print(f"\n🔄 测试5次API调用...")
@@ -72,10 +72,11 @@ def test_basic_functionality():
     print(f"\n✅ 基础功能测试完成！")
     
     # 验证频率控制是否生效
-    if final_stats['total_calls'] == 5 and total_time >= 2.5:  # 至少2.5秒（5次 × 0.5秒）
-        print(f"✅ 频率控制正常工作 - 符合预期的最小等待时间")
+    # 令牌桶在令牌充足时不等待，5次调用应立即完成且都被计数
+    if final_stats['total_calls'] == 5 and final_stats['blocked_calls'] == 0:
+        print(f"✅ 频率控制正常工作 - 突发容量内的调用无需等待")
     else:
-        print(f"⚠️ 频率控制可能异常 - 请检查等待时间是否合理")
+        print(f"⚠️ 频率控制可能异常 - 请检查调用计数和阻塞次数")
 
 def test_integration_with_existing_code():
     """测试与现有代码的集成"""
@@ -27,19 +27,13 @@ def test_basic_import():
         stats = limiter.get_statistics()
         print(f"   ✅ 获取统计信息成功: {stats}")
         
-        print("4. 测试简单调用（无等待）...")
-        # 临时设置基础等待时间为0
-        original_wait = limiter.base_wait_time
-        limiter.base_wait_time = 0
-        
+        print("4. 测试简单调用（令牌充足时无等待）...")
         start_time = time.time()
         result = limiter.wait_for_api_call("test")
         end_time = time.time()
         
         print(f"   ✅ API调用完成，结果: {result}，耗时: {end_time - start_time:.3f}秒")
-        
-        # 恢复原始等待时间
-        limiter.base_wait_time = original_wait
+        print(f"   剩余令牌: {limiter.get_bucket('tushare').get_statistics()['available_tokens']}")
         
         print("\n✅ 所有测试通过！")
         
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+异步LLM调用测试
+验证 ChatDashScope 的异步接口不阻塞事件循环，多个请求可以并发
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class FakeAioGeneration:
+    """模拟 dashscope.AioGeneration：每次调用耗时0.2秒"""
+
+    calls = 0
+
+    @classmethod
+    async def call(cls, **params):
+        cls.calls += 1
+        await asyncio.sleep(0.2)
+        message = SimpleNamespace(content=f"reply to {params['messages'][-1]['content']}")
+        return SimpleNamespace(
+            status_code=200,
+            output=SimpleNamespace(choices=[SimpleNamespace(message=message)]),
+            usage=None,
+        )
+
+
+def test_dashscope_agenerate_concurrent():
+    """测试多个异步请求并发执行"""
+    from langchain_core.messages import HumanMessage
+    import tradingagents.llm_adapters.dashscope_adapter as dashscope_adapter
+
+    original = dashscope_adapter.AioGeneration
+    dashscope_adapter.AioGeneration = FakeAioGeneration
+    try:
+        llm = dashscope_adapter.ChatDashScope(model="qwen-turbo", api_key="test-key")
+
+        async def run():
+            return await asyncio.gather(*[
+                llm.ainvoke([HumanMessage(content=f"q{i}")]) for i in range(5)
+            ])
+
+        start = time.time()
+        replies = asyncio.run(run())
+        elapsed = time.time() - start
+    finally:
+        dashscope_adapter.AioGeneration = original
+
+    print(f"📊 5个请求耗时: {elapsed:.2f}秒")
+    assert [r.content for r in replies] == [f"reply to q{i}" for i in range(5)]
+    assert FakeAioGeneration.calls == 5
+    assert elapsed < 0.8, "异步请求应并发执行"
+
+    print("✅ 异步请求并发执行")
+    return True
+
+
+def main():
+    print("🚀 异步LLM调用测试")
+    print("=" * 50)
+
+    tests = [
+        ("DashScope异步并发", test_dashscope_agenerate_concurrent),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+自动化批量分析并发测试
+验证所有工作线程共享同一个交易图实例，各次运行并发执行且结果互不干扰
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class FakeGraph:
+    """模拟TradingAgentsGraph：记录run的最大并发数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def run(self, company_name, trade_date):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            state = {'news_report': f'{company_name}新闻', 'sentiment_report': '情绪'}
+            return SimpleNamespace(final_state=state, decision={'action': '持有', 'reasoning': company_name})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_shared_graph_concurrent():
+    """测试共享交易图在并发分析中的使用"""
+    import cli.auto_analysis as auto_analysis
+
+    analyzer = auto_analysis.AutoAnalyzer(max_workers=3)
+    analyzer.selected_analysts = ["market"]
+    analyzer.config = {"llm_provider": "none"}
+    analyzer.graph = FakeGraph()
+
+    codes = [f"00000{i}" for i in range(9)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(analyzer.analyze_stock, codes))
+
+    print(f"📊 最大并发运行数: {analyzer.graph.max_active}")
+    assert [r['reasoning'] for r in results] == codes
+    assert all(r['news_analysis'] == f'{code}新闻' for r, code in zip(results, codes))
+    assert analyzer.graph.max_active > 1
+    assert analyzer._resolve_workers(2) == 2
+
+    print("✅ 共享交易图并发运行正常")
+    return True
+
+
+def main():
+    print("🚀 自动化批量分析并发测试")
+    print("=" * 50)
+
+    tests = [
+        ("共享交易图并发运行", test_shared_graph_concurrent),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+缓存元数据索引测试
+验证旧版 *_meta.json 自动导入、按条件查找以及max_files淘汰
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def test_legacy_import_and_lookup():
+    """测试旧版元数据导入与部分匹配查找"""
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        metadata_dir = Path(cache_dir) / "metadata"
+        metadata_dir.mkdir()
+        data_file = Path(cache_dir) / "legacy.txt"
+        data_file.write_text("legacy data", encoding='utf-8')
+        (metadata_dir / "legacy_key_meta.json").write_text(json.dumps({
+            'symbol': 'AAPL',
+            'data_type': 'stock_data',
+            'market_type': 'us',
+            'data_source': 'yfinance',
+            'file_path': str(data_file),
+            'file_format': 'txt',
+            'cached_at': '2020-01-01T00:00:00',
+        }), encoding='utf-8')
+
+        cache = StockDataCache(cache_dir)
+        assert cache.load_stock_data("legacy_key") == "legacy data"
+        # 旧缓存已过期，TTL内查不到，不限时间时能查到
+        assert cache.find_cached_stock_data("AAPL", data_source="yfinance") is None
+        assert cache.find_cache_entries("AAPL", 'stock_data')[0]['cache_key'] == "legacy_key"
+
+        key = cache.save_stock_data("AAPL", "fresh data", "2024-01-01", "2024-02-01", "yfinance")
+        assert cache.find_cached_stock_data("AAPL", "2024-01-01", "2024-02-01", "yfinance") == key
+        # 格式化文本无法截取子区间，不同区间不算部分命中
+        assert cache.find_cached_stock_data("AAPL", "2023-01-01", "2023-02-01", "yfinance") is None
+
+    print("✅ 旧版元数据导入与索引查找正常")
+    return True
+
+
+def test_max_files_eviction():
+    """测试超过max_files时淘汰最旧的缓存"""
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        cache.cache_config['china_fundamentals']['max_files'] = 3
+
+        for i in range(5):
+            cache.save_fundamentals_data(f"00000{i}", f"report {i}", data_source="test")
+
+        stats = cache.get_cache_stats()
+        print(f"📊 缓存统计: {stats}")
+        assert stats['fundamentals_count'] == 3
+        assert len(list(cache.china_fundamentals_dir.glob("*.txt"))) == 3
+        assert cache.find_cached_fundamentals_data("000000") is None
+        assert cache.find_cached_fundamentals_data("000004") is not None
+
+    print("✅ max_files淘汰正常")
+    return True
+
+
+def main():
+    print("🚀 缓存元数据索引测试")
+    print("=" * 50)
+
+    tests = [
+        ("旧版导入与查找", test_legacy_import_and_lookup),
+        ("max_files淘汰", test_max_files_eviction),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
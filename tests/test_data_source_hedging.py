@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+数据源对冲与熔断测试
+验证主数据源过慢时对冲请求备用数据源、失败数据源被熔断跳过，且不修改当前数据源
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _make_manager(behaviours, hedged=False, hedge_delay=None):
+    """
+    创建使用模拟数据源的管理器
+
+    Args:
+        behaviours: {ChinaDataSource: (延迟秒数, 返回文本或异常)}，文本中含错误标记视为失败
+    """
+    from tradingagents.dataflows.data_source_manager import DataSourceManager, ChinaDataSource
+    from tradingagents.dataflows.stock_data_result import StockDataResult
+
+    manager = DataSourceManager(hedged=hedged, hedge_delay=hedge_delay)
+    manager.available_sources = list(behaviours)
+    manager.current_source = list(behaviours)[0]
+    manager.calls = []
+
+    def fake(source):
+        def fetch(symbol, start_date, end_date):
+            manager.calls.append(source)
+            delay, outcome = behaviours[source]
+            time.sleep(delay)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return StockDataResult.from_text(symbol, source.value, outcome, start_date, end_date)
+        return fetch
+
+    manager._get_tushare_data = fake(ChinaDataSource.TUSHARE)
+    manager._get_akshare_data = fake(ChinaDataSource.AKSHARE)
+    manager._get_baostock_data = fake(ChinaDataSource.BAOSTOCK)
+    manager._get_tdx_data = fake(ChinaDataSource.TDX)
+    return manager
+
+
+def test_sequential_fallback():
+    """测试顺序降级且不修改当前数据源"""
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource
+
+    manager = _make_manager({
+        ChinaDataSource.TUSHARE: (0, "❌ Tushare获取失败"),
+        ChinaDataSource.AKSHARE: (0, RuntimeError("网络错误")),
+        ChinaDataSource.BAOSTOCK: (0, "000001 股票数据"),
+    })
+
+    result = manager.get_stock_data("000001", "2025-01-01", "2025-01-31")
+    assert result == "000001 股票数据"
+    assert manager.calls == [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE, ChinaDataSource.BAOSTOCK]
+    assert manager.current_source == ChinaDataSource.TUSHARE
+
+    # 全部失败时返回主数据源的错误信息
+    manager = _make_manager({
+        ChinaDataSource.TUSHARE: (0, "❌ Tushare获取失败"),
+        ChinaDataSource.AKSHARE: (0, "获取数据错误"),
+    })
+    assert manager.get_stock_data("000001", "2025-01-01", "2025-01-31") == "❌ Tushare获取失败"
+
+    print("✅ 顺序降级正常")
+    return True
+
+
+def test_hedged_slow_primary():
+    """测试主数据源超出预算时对冲请求下一个数据源"""
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource
+
+    manager = _make_manager({
+        ChinaDataSource.TUSHARE: (1.0, "tushare 数据"),
+        ChinaDataSource.AKSHARE: (0.05, "akshare 数据"),
+    }, hedged=True, hedge_delay=0.1)
+
+    start = time.time()
+    result = manager.get_stock_data("000001", "2025-01-01", "2025-01-31")
+    elapsed = time.time() - start
+
+    print(f"📊 对冲耗时: {elapsed:.2f}秒")
+    assert result == "akshare 数据"
+    assert elapsed < 0.5, "不应等待慢速主数据源"
+
+    # 主数据源快速失败时立即尝试下一个，不等待预算
+    manager = _make_manager({
+        ChinaDataSource.TUSHARE: (0, "❌ Tushare获取失败"),
+        ChinaDataSource.AKSHARE: (0, "akshare 数据"),
+    }, hedged=True, hedge_delay=5.0)
+    start = time.time()
+    assert manager.get_stock_data("000001", "2025-01-01", "2025-01-31") == "akshare 数据"
+    assert time.time() - start < 1.0
+
+    print("✅ 对冲请求正常")
+    return True
+
+
+def test_circuit_breaker():
+    """测试连续失败的数据源被熔断跳过"""
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource
+
+    manager = _make_manager({
+        ChinaDataSource.TUSHARE: (0, RuntimeError("接口超时")),
+        ChinaDataSource.AKSHARE: (0, "akshare 数据"),
+    })
+
+    for _ in range(3):
+        assert manager.get_stock_data("000001", "2025-01-01", "2025-01-31") == "akshare 数据"
+    health = manager.get_source_health()
+    assert health['tushare']['circuit_open']
+    assert health['tushare']['consecutive_failures'] == 3
+    assert health['akshare']['error_rate'] == 0.0
+
+    manager.calls.clear()
+    manager.get_stock_data("000001", "2025-01-01", "2025-01-31")
+    assert manager.calls == [ChinaDataSource.AKSHARE], "熔断中的数据源应被直接跳过"
+
+    print("✅ 熔断器正常")
+    return True
+
+
+def test_source_health_ewma():
+    """测试延迟EWMA和p95估算"""
+    from tradingagents.dataflows.data_source_manager import SourceHealth
+
+    health = SourceHealth(alpha=0.5)
+    assert health.p95_latency() is None
+    health.record(True, 1.0)
+    health.record(True, 3.0)
+    assert health.latency_ewma == 2.0
+    assert health.p95_latency() > 2.0
+    health.record(False, 1.0)
+    assert health.error_rate == 0.5
+
+    print("✅ EWMA统计正常")
+    return True
+
+
+def main():
+    print("🚀 数据源对冲与熔断测试")
+    print("=" * 50)
+
+    tests = [
+        ("顺序降级", test_sequential_fallback),
+        ("对冲请求", test_hedged_slow_primary),
+        ("熔断器", test_circuit_breaker),
+        ("EWMA统计", test_source_health_ewma),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+嵌入缓存测试
+验证相同情景只请求一次嵌入、批量请求去重、磁盘缓存，以及不同嵌入服务端点互不共用缓存
+"""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _make_memory(cache, base_url="https://api.openai.com/v1"):
+    """构造一个不连接真实嵌入服务的记忆实例"""
+    from tradingagents.agents.utils.memory import FinancialSituationMemory
+
+    memory = FinancialSituationMemory.__new__(FinancialSituationMemory)
+    memory.llm_provider = "openai"
+    memory.embedding = "test-embedding"
+    memory.client = SimpleNamespace(base_url=base_url)
+    memory.embedding_cache = cache
+    memory.calls = []
+
+    def fake_batch(texts):
+        memory.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    memory._embed_batch = fake_batch
+    return memory
+
+
+def test_single_embed_per_situation():
+    """测试同一情景在多个记忆实例间只嵌入一次"""
+    from tradingagents.agents.utils.memory import EmbeddingCache
+
+    cache = EmbeddingCache(max_entries=8)
+    bull = _make_memory(cache)
+    bear = _make_memory(cache)
+
+    situation = "市场报告\n\n情绪报告\n\n新闻报告\n\n基本面报告"
+    assert bull.get_embedding(situation) == bear.get_embedding(situation)
+    assert len(bull.calls) == 1 and len(bear.calls) == 0
+    print(f"✅ 嵌入缓存命中: hits={cache.hits}, misses={cache.misses}")
+    return True
+
+
+def test_batch_dedup_and_disk_store():
+    """测试批量请求去重和磁盘缓存"""
+    from tradingagents.agents.utils.memory import EmbeddingCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "embeddings.sqlite")
+        cache = EmbeddingCache(max_entries=8)
+        cache.enable_disk_store(db_path)
+        memory = _make_memory(cache)
+
+        embeddings = memory.get_embeddings(["a", "bb", "a"])
+        assert embeddings[0] == embeddings[2]
+        assert memory.calls == [["a", "bb"]]
+
+        # 新的进程内缓存从磁盘读取
+        fresh = EmbeddingCache(max_entries=8)
+        fresh.enable_disk_store(db_path)
+        other = _make_memory(fresh)
+        assert other.get_embedding("bb") == [2.0, 1.0]
+        assert other.calls == []
+
+    print("✅ 批量去重与磁盘缓存正常")
+    return True
+
+
+def test_endpoint_in_cache_key():
+    """测试同名模型在不同嵌入服务端点上不共用缓存"""
+    from tradingagents.agents.utils.memory import EmbeddingCache
+
+    cache = EmbeddingCache(max_entries=8)
+    openai_memory = _make_memory(cache)
+    local_memory = _make_memory(cache, base_url="http://localhost:11434/v1")
+
+    openai_memory.get_embedding("市场轮动")
+    local_memory.get_embedding("市场轮动")
+    assert len(openai_memory.calls) == 1 and len(local_memory.calls) == 1
+    assert EmbeddingCache.make_key("m", "t", "a") != EmbeddingCache.make_key("m", "t", "b")
+
+    print("✅ 嵌入服务端点区分正常")
+    return True
+
+
+if __name__ == "__main__":
+    for test_func in (test_single_embed_per_situation, test_batch_dedup_and_disk_store,
+                      test_endpoint_in_cache_key):
+        try:
+            test_func()
+        except Exception as e:
+            print(f"❌ {test_func.__name__} 失败: {e}")
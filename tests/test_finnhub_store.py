@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Finnhub离线数据缓存测试
+验证区间查询与逐键扫描结果（含顺序）一致，且文件修改后自动重新加载
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _write_data(data_dir, ticker, data_type, data):
+    path = os.path.join(data_dir, "finnhub_data", data_type)
+    os.makedirs(path, exist_ok=True)
+    path = os.path.join(path, f"{ticker}_data_formatted.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def test_range_matches_scan():
+    """测试区间查询与原逐键扫描一致"""
+    from tradingagents.dataflows.finnhub_utils import get_data_in_range
+
+    # 键故意不按日期排序，且包含空条目
+    data = {
+        "2024-01-05": [{"headline": "e"}],
+        "2024-01-01": [{"headline": "a"}],
+        "2024-01-03": [],
+        "2024-01-09": [{"headline": "i"}],
+        "2024-01-02": [{"headline": "b"}, {"headline": "b2"}],
+        "2023-12-31": [{"headline": "z"}],
+    }
+    with tempfile.TemporaryDirectory() as data_dir:
+        _write_data(data_dir, "AAPL", "news_data", data)
+
+        for start, end in (("2024-01-01", "2024-01-05"), ("2023-01-01", "2025-01-01"),
+                           ("2024-01-06", "2024-01-08"), ("2024-01-09", "2024-01-09")):
+            expected = {k: v for k, v in data.items() if start <= k <= end and len(v) > 0}
+            actual = get_data_in_range("AAPL", start, end, "news_data", data_dir)
+            assert list(actual.items()) == list(expected.items())
+
+        assert get_data_in_range("MSFT", "2024-01-01", "2024-01-05", "news_data", data_dir) == {}
+
+    print("✅ 区间查询与逐键扫描一致")
+    return True
+
+
+def test_shared_cache_and_reload():
+    """测试文件只解析一次，修改后重新加载"""
+    from tradingagents.dataflows.finnhub_utils import get_data_in_range, get_finnhub_store
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = _write_data(data_dir, "TSLA", "insider_senti", {"2024-01-01": [{"mspr": 1}]})
+        store = get_finnhub_store()
+
+        before = store.get_statistics()
+        get_data_in_range("TSLA", "2024-01-01", "2024-12-31", "insider_senti", data_dir)
+        get_data_in_range("TSLA", "2024-01-01", "2024-01-01", "insider_senti", data_dir)
+        after = store.get_statistics()
+        assert after['misses'] - before['misses'] == 1
+        assert after['hits'] - before['hits'] == 1
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"2024-01-01": [{"mspr": 1}], "2024-02-01": [{"mspr": 2}]}, f)
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+
+        result = get_data_in_range("TSLA", "2024-01-01", "2024-12-31", "insider_senti", data_dir)
+        assert list(result) == ["2024-01-01", "2024-02-01"]
+
+    print("✅ 共享缓存与修改后重新加载正常")
+    return True
+
+
+def main():
+    print("🚀 Finnhub离线数据缓存测试")
+    print("=" * 50)
+
+    tests = [
+        ("区间查询一致性", test_range_matches_scan),
+        ("共享缓存与重新加载", test_shared_cache_and_reload),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
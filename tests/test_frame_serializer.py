@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+DataFrame缓存序列化器测试
+验证列式格式的dtype/索引往返一致，以及旧版CSV缓存的兼容加载
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _sample_frame():
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.bdate_range("2024-01-01", periods=5, name="date")
+    return pd.DataFrame({
+        "code": ["000001.SZ"] * 5,
+        "close": np.array([10.1, 10.2, 10.3, 10.4, 10.5], dtype="float32"),
+        "volume": np.array([100, 200, 300, 400, 500], dtype="int64"),
+        "board": pd.Categorical(["main"] * 5),
+    }, index=dates)
+
+
+def test_round_trip():
+    """测试各序列化器的dtype与索引往返"""
+    from tradingagents.dataflows.frame_serializer import (
+        SERIALIZERS, PYARROW_AVAILABLE, serialize_frame, deserialize_frame
+    )
+
+    frame = _sample_frame()
+    names = ["feather", "parquet", "pickle"] if PYARROW_AVAILABLE else ["pickle"]
+    for name in names:
+        file_format, payload = serialize_frame(frame, SERIALIZERS[name])
+        restored = deserialize_frame(file_format, payload)
+        assert restored.equals(frame), name
+        assert restored.dtypes.equals(frame.dtypes), name
+        assert restored.index.name == "date", name
+        print(f"✅ {name}: {len(payload)} 字节，dtype与索引一致")
+    return True
+
+
+def test_legacy_csv_entry():
+    """测试旧版CSV缓存仍可加载，新缓存使用二进制格式"""
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        frame = _sample_frame()
+
+        key = cache.save_stock_data("000001", frame, "2024-01-01", "2024-01-05", "test")
+        metadata = cache._load_metadata(key)
+        assert metadata['file_format'] != 'csv'
+        assert cache.load_stock_data(key).equals(frame)
+
+        # 模拟旧版CSV缓存条目
+        csv_path = cache.china_stock_dir / "legacy.csv"
+        frame.to_csv(csv_path, index=True)
+        cache.index.upsert("legacy", {
+            'symbol': '000001', 'data_type': 'stock_data', 'market_type': 'china',
+            'file_path': str(csv_path), 'file_format': 'csv',
+            'cached_at': metadata['cached_at'],
+        })
+        legacy = cache.load_stock_data("legacy")
+        assert list(legacy.columns) == list(frame.columns)
+        assert len(legacy) == len(frame)
+
+    print("✅ 旧版CSV缓存兼容加载")
+    return True
+
+
+def main():
+    print("🚀 DataFrame缓存序列化器测试")
+    print("=" * 50)
+
+    tests = [
+        ("dtype往返", test_round_trip),
+        ("旧版CSV兼容", test_legacy_csv_entry),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
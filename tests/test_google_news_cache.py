@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Google新闻缓存测试
+验证查询归一化后的缓存命中、封闭窗口永不过期、刷新时遇到已缓存文章即停止翻页，
+以及没有新文章的刷新也会推进缓存时间
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _article_html(link):
+    return (f'<div class="SoaBEf"><a href="{link}"></a><div class="MBeuO">{link} 标题</div>'
+            f'<div class="GI74Re">摘要</div><div class="LfVVr">1天前</div>'
+            f'<div class="NUnG9d"><span>财经网</span></div></div>')
+
+
+class FakeGoogle:
+    """按页返回模拟的Google新闻搜索结果，记录请求的页数"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def __call__(self, url, headers):
+        offset = int(url.rsplit("start=", 1)[1])
+        page = offset // 10
+        self.requests.append(page)
+        links = self.pages[page] if page < len(self.pages) else []
+        html = "".join(_article_html(link) for link in links)
+        if page + 1 < len(self.pages):
+            html += '<a id="pnnext" href="#">下一页</a>'
+        return SimpleNamespace(content=f"<html><body>{html}</body></html>".encode("utf-8"))
+
+
+def _install(tmp_dir, pages):
+    """使用临时缓存目录和模拟请求"""
+    from tradingagents.dataflows import cache_manager, googlenews_utils
+
+    cache_manager._cache_instance = cache_manager.StockDataCache(tmp_dir)
+    fake = FakeGoogle(pages)
+    googlenews_utils.make_request = fake
+    return cache_manager._cache_instance, fake
+
+
+def test_closed_window_cached():
+    """测试封闭的历史窗口缓存命中且查询归一化"""
+    from tradingagents.dataflows.googlenews_utils import get_cached_news_data
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, fake = _install(tmp_dir, [["a1", "a2"], ["a3"]])
+
+        first = get_cached_news_data("平安银行+000001", "2025-01-01", "2025-01-08")
+        assert [news["link"] for news in first] == ["a1", "a2", "a3"]
+        assert fake.requests == [0, 1]
+
+        second = get_cached_news_data("平安银行  000001", "01/01/2025", "01/08/2025")
+        assert second == first
+        assert fake.requests == [0, 1], "封闭窗口的缓存不应过期"
+
+    print("✅ 历史窗口缓存命中")
+    return True
+
+
+def test_open_window_incremental_refresh():
+    """测试包含今天的窗口过期后只抓取新文章"""
+    from tradingagents.dataflows.googlenews_utils import get_cached_news_data
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    start = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache, fake = _install(tmp_dir, [["a1", "a2"], ["a3"]])
+        get_cached_news_data("AAPL", start, today)
+
+        # 新闻缓存立即过期，模拟TTL已到
+        cache.cache_config['us_news']['ttl_hours'] = 0
+        fake.pages = [["new1", "a1"], ["a2"], ["a3"]]
+        fake.requests.clear()
+
+        refreshed = get_cached_news_data("AAPL", start, today)
+        assert fake.requests == [0], "遇到已缓存文章后应停止翻页"
+        assert [news["link"] for news in refreshed] == ["new1", "a1", "a2", "a3"]
+
+        articles, _ = cache.load_google_news("aapl", start, today)
+        assert len(articles) == 4
+
+    print("✅ 增量刷新正常")
+    return True
+
+
+def test_refresh_without_new_articles():
+    """测试过期后没有新文章的刷新仍推进缓存时间，窗口封闭后不再抓取"""
+    from tradingagents.dataflows.googlenews_utils import get_cached_news_data
+
+    end = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+    start = (datetime.now() - timedelta(days=10)).strftime("%Y-%m-%d")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache, fake = _install(tmp_dir, [["a1", "a2"]])
+        get_cached_news_data("AAPL", start, end)
+
+        # 模拟窗口仍包含当天时写入、且TTL已过的缓存
+        cache_key = cache._get_google_news_key("AAPL", start, end)
+        metadata = cache.index.get(cache_key)
+        metadata['cached_at'] = (datetime.strptime(end, "%Y-%m-%d") + timedelta(hours=12)).isoformat()
+        cache.index.upsert(cache_key, metadata)
+        assert cache.load_google_news("AAPL", start, end)[1] is False
+
+        fake.requests.clear()
+        refreshed = get_cached_news_data("AAPL", start, end)
+        assert fake.requests == [0]
+        assert [news["link"] for news in refreshed] == ["a1", "a2"]
+
+        # 刷新后缓存时间推进，窗口已封闭，永不过期
+        assert cache.load_google_news("AAPL", start, end)[1] is True
+        get_cached_news_data("AAPL", start, end)
+        assert fake.requests == [0], "刷新后的封闭窗口不应再抓取"
+
+        # 抓取失败（没有任何结果）时不覆盖已有缓存
+        metadata = cache.index.get(cache_key)
+        metadata['cached_at'] = (datetime.strptime(end, "%Y-%m-%d") + timedelta(hours=12)).isoformat()
+        cache.index.upsert(cache_key, metadata)
+        fake.pages = []
+        assert [news["link"] for news in get_cached_news_data("AAPL", start, end)] == ["a1", "a2"]
+        assert cache.load_google_news("AAPL", start, end)[1] is False
+
+    print("✅ 无新文章的刷新正常")
+    return True
+
+
+def test_ttl_by_window_end():
+    """测试TTL随窗口结束日期变化"""
+    from tradingagents.dataflows.cache_manager import StockDataCache, GOOGLE_NEWS_SETTLING_TTL_HOURS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = StockDataCache(tmp_dir)
+        assert cache._google_news_ttl_hours("2025-01-08", "2025-01-08", "us") == 1
+        assert cache._google_news_ttl_hours("2025-01-07", "2025-01-08", "us") == GOOGLE_NEWS_SETTLING_TTL_HOURS
+        assert cache._google_news_ttl_hours("2025-01-01", "2025-01-08", "china") is None
+
+    print("✅ TTL规则正常")
+    return True
+
+
+def main():
+    print("🚀 Google新闻缓存测试")
+    print("=" * 50)
+
+    tests = [
+        ("历史窗口缓存", test_closed_window_cached),
+        ("增量刷新", test_open_window_incremental_refresh),
+        ("无新文章刷新", test_refresh_without_new_articles),
+        ("TTL规则", test_ttl_by_window_end),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+共享HTTP客户端测试
+验证同一服务地址复用连接池和长连接、统一超时生效，以及OpenAI客户端按服务地址共享
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """返回客户端端口，/slow 路径延迟响应"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(0.5)
+        body = str(self.client_address[1]).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已超时断开
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_session_keep_alive():
+    """测试同一服务地址共享Session并复用TCP连接"""
+    from tradingagents.utils.http_clients import HTTPClientRegistry
+
+    server, base_url = _start_server()
+    try:
+        registry = HTTPClientRegistry()
+        session = registry.session(f"{base_url}/news")
+        assert registry.session(f"{base_url}/quotes?x=1") is session
+        assert registry.session("https://finnhub.io/api/v1") is not session
+
+        ports = {session.get(f"{base_url}/news").text for _ in range(5)}
+        print(f"📊 5次请求使用的连接数: {len(ports)}")
+        assert len(ports) == 1, "应复用同一个长连接"
+        registry.close()
+    finally:
+        server.shutdown()
+
+    print("✅ 连接复用正常")
+    return True
+
+
+def test_default_timeout():
+    """测试未传timeout时使用统一超时"""
+    import requests
+    from tradingagents.utils.http_clients import HTTPClientRegistry
+
+    server, base_url = _start_server()
+    try:
+        registry = HTTPClientRegistry(read_timeout=0.1, max_retries=0)
+        session = registry.session(base_url)
+        try:
+            session.get(f"{base_url}/slow")
+            assert False, "应触发读取超时"
+        except requests.exceptions.RequestException:
+            pass
+        # 显式传入的timeout优先
+        assert session.get(f"{base_url}/slow", timeout=5).status_code == 200
+        registry.close()
+    finally:
+        server.shutdown()
+
+    print("✅ 统一超时正常")
+    return True
+
+
+def test_openai_client_shared():
+    """测试OpenAI客户端按服务地址和API Key共享"""
+    from tradingagents.utils.http_clients import HTTPClientRegistry
+
+    registry = HTTPClientRegistry(read_timeout=60, llm_read_timeout=600)
+    client = registry.openai_client("https://api.openai.com/v1", api_key="sk-test")
+    assert registry.openai_client("https://api.openai.com/v1", api_key="sk-test") is client
+
+    other_key = registry.openai_client("https://api.openai.com/v1", api_key="sk-other")
+    assert other_key is not client
+    assert other_key._client is client._client, "同一服务地址应共用连接池"
+
+    deepseek = registry.openai_client("https://api.deepseek.com", api_key="sk-test")
+    assert deepseek._client is not client._client
+    assert registry.get_statistics() == {'sessions': 0, 'openai_clients': 3, 'connection_pools': 2}
+
+    # LLM请求使用独立的长读取超时，数据接口Session仍使用HTTP_READ_TIMEOUT
+    assert client.timeout.read == 600
+    assert client._client.timeout.read == 600
+    assert registry.session("https://api.example.com").default_timeout == (registry.connect_timeout, 60)
+    registry.close()
+
+    print("✅ OpenAI客户端共享正常")
+    return True
+
+
+def main():
+    print("🚀 共享HTTP客户端测试")
+    print("=" * 50)
+
+    tests = [
+        ("连接复用", test_session_keep_alive),
+        ("统一超时", test_default_timeout),
+        ("OpenAI客户端共享", test_openai_client_shared),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
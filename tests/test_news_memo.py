@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+新闻备忘录测试
+验证同一次分析中相同新闻查询只抓取一次、并发请求共享同一次抓取，且不同分析运行互不影响
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class CountingFetcher:
+    """模拟较慢的新闻抓取，记录实际抓取次数"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return [{'title': f'{query} 新闻'}]
+
+
+def test_single_flight():
+    """测试并发的相同请求只抓取一次"""
+    from tradingagents.dataflows.news_memo import news_memo_scope, memoized_news
+
+    fetcher = CountingFetcher()
+
+    def fetch(query):
+        return memoized_news("google_news", query, "2025-01-01", "2025-01-08", lambda: fetcher(query))
+
+    with news_memo_scope() as memo:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = [executor.submit(memo.get_or_fetch, ("google_news", "平安银行", "2025-01-01", "2025-01-08"),
+                                       lambda: fetcher("平安银行")) for _ in range(6)]
+            results = [f.result() for f in futures]
+        assert fetcher.calls == 1
+        assert all(r == results[0] for r in results)
+
+        # 不同查询或日期窗口分别抓取
+        fetch("000001 股票")
+        fetch("000001 股票")
+        assert fetcher.calls == 2
+        stats = memo.get_statistics()
+        assert stats == {'entries': 2, 'hits': 6, 'misses': 2}
+
+    # 离开分析范围后不再缓存
+    fetch("000001 股票")
+    assert fetcher.calls == 3
+
+    print("✅ 并发请求共享同一次抓取")
+    return True
+
+
+def test_failure_not_memoized():
+    """测试抓取失败不会被记住"""
+    from tradingagents.dataflows.news_memo import news_memo_scope, memoized_news
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("429 Too Many Requests")
+        return "新闻"
+
+    with news_memo_scope():
+        try:
+            memoized_news("google_news", "AAPL", "2025-01-01", "2025-01-08", flaky)
+            assert False, "首次抓取应抛出异常"
+        except ConnectionError:
+            pass
+        assert memoized_news("google_news", "AAPL", "2025-01-01", "2025-01-08", flaky) == "新闻"
+        assert memoized_news("google_news", "AAPL", "2025-01-01", "2025-01-08", flaky) == "新闻"
+    assert len(attempts) == 2
+
+    print("✅ 失败结果不被缓存")
+    return True
+
+
+def test_scope_isolation_and_tool_threads():
+    """测试不同运行各自独立，且工具线程池中的工具共享所在运行的备忘录"""
+    from langchain_core.tools import tool
+    from tradingagents.dataflows.news_memo import news_memo_scope, memoized_news
+    from tradingagents.agents.utils.tool_executor import execute_tool_calls
+
+    fetcher = CountingFetcher(delay=0.05)
+
+    @tool
+    def get_news(query: str) -> str:
+        """获取新闻"""
+        return str(memoized_news("google_news", query, "2025-01-01", "2025-01-08", lambda: fetcher(query)))
+
+    def analysis_run(_):
+        with news_memo_scope():
+            calls = [{'name': 'get_news', 'args': {'query': '贵州茅台'}, 'id': f'call_{i}'} for i in range(4)]
+            messages = execute_tool_calls(calls, [get_news])
+            assert len({m.content for m in messages}) == 1
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(analysis_run, range(3)))
+
+    print(f"📊 3次分析运行的实际抓取次数: {fetcher.calls}")
+    assert fetcher.calls == 3, "每次运行只应抓取一次"
+
+    print("✅ 运行隔离正常")
+    return True
+
+
+def main():
+    print("🚀 新闻备忘录测试")
+    print("=" * 50)
+
+    tests = [
+        ("并发去重", test_single_flight),
+        ("失败不缓存", test_failure_not_memoized),
+        ("运行隔离", test_scope_isolation_and_tool_threads),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
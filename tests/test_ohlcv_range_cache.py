@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+日线序列区间缓存测试
+验证已覆盖的子区间直接命中，只返回缺失的边缘区间，
+Tushare适配器只在请求API时经过频率限制，以及没有交易日的边缘区间也记为已覆盖
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _make_bars(start_date, end_date):
+    """生成工作日的模拟日线数据"""
+    import pandas as pd
+
+    dates = pd.bdate_range(start_date, end_date)
+    return pd.DataFrame({
+        'Open': range(len(dates)),
+        'Close': range(len(dates)),
+    }, index=dates)
+
+
+def test_subrange_hit():
+    """测试子区间完全命中"""
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        cache.save_ohlcv("AAPL", _make_bars("2023-06-01", "2024-06-30"),
+                         "2023-06-01", "2024-06-30", "yfinance")
+
+        data, missing = cache.load_ohlcv_range("AAPL", "2024-01-01", "2024-06-30", "yfinance")
+        assert missing == []
+        assert str(data.index[0].date()) == "2024-01-01"
+        assert str(data.index[-1].date()) == "2024-06-28"
+
+    print("✅ 子区间直接命中")
+    return True
+
+
+def test_missing_edges():
+    """测试只返回缺失的边缘区间，补充后覆盖范围连续"""
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        cache.save_ohlcv("000001", _make_bars("2024-01-01", "2024-03-31"),
+                         "2024-01-01", "2024-03-31", "tushare")
+
+        _, missing = cache.load_ohlcv_range("000001", "2023-12-01", "2024-04-15", "tushare")
+        print(f"📋 缺失区间: {missing}")
+        assert missing == [("2023-12-01", "2023-12-31"), ("2024-04-01", "2024-04-15")]
+
+        for edge_start, edge_end in missing:
+            cache.save_ohlcv("000001", _make_bars(edge_start, edge_end), edge_start, edge_end, "tushare")
+        data, missing = cache.load_ohlcv_range("000001", "2023-12-01", "2024-04-15", "tushare")
+        assert missing == []
+        assert not data.index.duplicated().any()
+
+        # 当天的K线未收盘，覆盖范围只到昨天
+        today = datetime.now().strftime('%Y-%m-%d')
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        cache.save_ohlcv("600000", _make_bars("2024-01-01", today), "2024-01-01", today, "tushare")
+        _, missing = cache.load_ohlcv_range("600000", "2024-01-01", today, "tushare")
+        assert missing == [(today, today)]
+        assert cache.load_ohlcv_range("600000", "2024-01-01", yesterday, "tushare")[1] == []
+
+    print("✅ 只补充缺失的边缘区间")
+    return True
+
+
+class FakeTushareProvider:
+    """按请求区间返回模拟日线数据的Tushare提供器"""
+
+    connected = True
+
+    def __init__(self, with_date=True, error=None):
+        self.with_date = with_date
+        self.error = error
+        self.requests = []
+
+    def get_stock_daily(self, symbol, start_date, end_date, raise_errors=False):
+        import pandas as pd
+
+        self.requests.append((start_date, end_date))
+        if self.error:
+            if raise_errors:
+                raise ConnectionError(self.error)
+            return pd.DataFrame()
+        dates = pd.bdate_range(start_date, end_date)
+        data = pd.DataFrame({'ts_code': f"{symbol}.SZ", 'close': range(len(dates))})
+        if self.with_date:
+            data['trade_date'] = dates.strftime('%Y%m%d')
+        return data
+
+
+def _make_adapter(cache_dir, provider, throttled):
+    from tradingagents.dataflows import tushare_adapter
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    tushare_adapter.RATE_LIMITER_AVAILABLE = True
+    tushare_adapter.wait_for_tushare_api = throttled.append
+    adapter = tushare_adapter.TushareDataAdapter.__new__(tushare_adapter.TushareDataAdapter)
+    adapter.enable_cache = True
+    adapter.cache_manager = StockDataCache(cache_dir)
+    adapter.provider = provider
+    return adapter
+
+
+def test_tushare_adapter_throttle_and_merge():
+    """测试缓存命中不消耗频率额度，缺少日期列的数据与已缓存部分合并"""
+    import pandas as pd
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        throttled = []
+        provider = FakeTushareProvider()
+        adapter = _make_adapter(cache_dir, provider, throttled)
+
+        first = adapter.get_stock_data("000001", "2024-01-01", "2024-03-31")
+        assert len(provider.requests) == 1 and len(throttled) == 1
+        assert not first.empty
+
+        adapter.get_stock_data("000001", "2024-02-01", "2024-02-29")
+        assert len(provider.requests) == 1 and len(throttled) == 1, "缓存命中不应请求API"
+
+        # 缺失边缘区间返回的数据没有日期列：仍与已缓存部分一起返回
+        adapter.provider = FakeTushareProvider(with_date=False)
+        merged = adapter.get_stock_data("000001", "2024-01-01", "2024-04-15")
+        assert len(throttled) == 2
+        edge_rows = len(pd.bdate_range("2024-04-01", "2024-04-15"))
+        assert adapter.provider.requests == [("2024-04-01", "2024-04-15")]
+        assert len(merged) == len(first) + edge_rows
+        assert merged['date'].notna().sum() == len(first)
+
+    print("✅ Tushare适配器频率限制与合并正常")
+    return True
+
+
+def test_empty_edge_recorded():
+    """测试周末等没有交易日的边缘区间记为已覆盖，请求失败则不记录"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        throttled = []
+        provider = FakeTushareProvider()
+        adapter = _make_adapter(cache_dir, provider, throttled)
+
+        # 2024-03-29是周五，03-30、03-31是周末
+        adapter.get_stock_data("000001", "2024-03-01", "2024-03-29")
+        weekend = adapter.get_stock_data("000001", "2024-03-01", "2024-03-31")
+        assert provider.requests[-1] == ("2024-03-30", "2024-03-31")
+        assert len(weekend) == len(adapter.get_stock_data("000001", "2024-03-01", "2024-03-29"))
+
+        requests_before = len(provider.requests)
+        adapter.get_stock_data("000001", "2024-03-01", "2024-03-31")
+        assert len(provider.requests) == requests_before, "空的周末区间应已记为覆盖"
+
+        # 请求失败时不扩展覆盖范围
+        adapter.provider = FakeTushareProvider(error="网络超时")
+        adapter.get_stock_data("000001", "2024-03-01", "2024-04-06")
+        adapter.get_stock_data("000001", "2024-03-01", "2024-04-06")
+        assert adapter.provider.requests == [("2024-04-01", "2024-04-06")] * 2
+        _, missing = adapter.cache_manager.load_ohlcv_range("000001", "2024-03-01", "2024-04-06", "tushare")
+        assert missing == [("2024-04-01", "2024-04-06")]
+
+        # 首次请求的整个区间都没有交易日时同样记为已覆盖
+        adapter.provider = FakeTushareProvider()
+        adapter.get_stock_data("600000", "2024-03-30", "2024-03-31")
+        adapter.get_stock_data("600000", "2024-03-30", "2024-03-31")
+        assert adapter.provider.requests == [("2024-03-30", "2024-03-31")]
+
+    print("✅ 空边缘区间记为已覆盖")
+    return True
+
+
+def main():
+    print("🚀 日线序列区间缓存测试")
+    print("=" * 50)
+
+    tests = [
+        ("子区间命中", test_subrange_hit),
+        ("边缘区间补充", test_missing_edges),
+        ("Tushare适配器", test_tushare_adapter_throttle_and_merge),
+        ("空边缘区间", test_empty_edge_recorded),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
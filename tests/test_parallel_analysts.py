@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+并行分析师测试
+用桩分析师节点验证各分支在独立子图中完成工具循环、四份报告都到达汇合节点，
+且子图沿用父图的运行配置
+"""
+
+import os
+import sys
+import threading
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _make_stub_analyst(analyst_type, report_key, seen_configs, lock):
+    """第一次调用请求工具，拿到工具结果后写出报告"""
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    def analyst_node(state, config):
+        with lock:
+            seen_configs.append((analyst_type, config.get("configurable", {}).get("run_marker")))
+
+        tool_results = [m for m in state["messages"] if isinstance(m, ToolMessage)]
+        if not tool_results:
+            call = {"name": "lookup", "args": {"topic": analyst_type}, "id": f"call_{analyst_type}"}
+            return {"messages": [AIMessage(content="", tool_calls=[call])]}
+        return {
+            "messages": [AIMessage(content="done")],
+            report_key: f"{analyst_type}: {tool_results[-1].content}",
+        }
+
+    return analyst_node
+
+
+def _make_setup():
+    from langchain_core.tools import tool
+    from langgraph.prebuilt import ToolNode
+    from tradingagents.graph.setup import GraphSetup
+    from tradingagents.graph.conditional_logic import ConditionalLogic
+
+    @tool
+    def lookup(topic: str) -> str:
+        """查询资料"""
+        return f"{topic} 数据"
+
+    setup = GraphSetup.__new__(GraphSetup)
+    setup.conditional_logic = ConditionalLogic()
+    setup.config = {"max_recur_limit": 20}
+    return setup, ToolNode([lookup])
+
+
+def test_reports_reach_join():
+    """测试四个分析师分支的报告全部到达汇合节点，并沿用父图配置"""
+    from langgraph.graph import StateGraph, START, END
+    from tradingagents.agents.utils.agent_states import AgentState
+    from tradingagents.graph.setup import ANALYST_REPORT_KEYS
+
+    setup, tool_node = _make_setup()
+    seen_configs, lock = [], threading.Lock()
+    joined = {}
+
+    workflow = StateGraph(AgentState)
+    analyst_names = []
+    for analyst_type, report_key in ANALYST_REPORT_KEYS.items():
+        node = _make_stub_analyst(analyst_type, report_key, seen_configs, lock)
+        subgraph = setup._build_analyst_subgraph(analyst_type, node, tool_node)
+        name = f"{analyst_type.capitalize()} Analyst"
+        workflow.add_node(name, setup._create_analyst_branch(analyst_type, subgraph))
+        workflow.add_edge(START, name)
+        analyst_names.append(name)
+
+    def join(state):
+        joined.update({key: state.get(key) for key in ANALYST_REPORT_KEYS.values()})
+        return {}
+
+    workflow.add_node("Join", join)
+    workflow.add_edge(analyst_names, "Join")
+    workflow.add_edge("Join", END)
+    graph = workflow.compile()
+
+    final = graph.invoke(
+        {"messages": [("human", "000001")], "company_of_interest": "000001", "trade_date": "2025-01-08"},
+        config={"configurable": {"run_marker": "run-42"}},
+    )
+
+    print(f"📊 汇合节点收到的报告: {joined}")
+    for analyst_type, report_key in ANALYST_REPORT_KEYS.items():
+        assert joined[report_key] == f"{analyst_type}: {analyst_type} 数据"
+        assert final[report_key] == joined[report_key]
+
+    # 每个分析师调用两次（请求工具、写报告），都能看到父图的配置
+    assert len(seen_configs) == 8
+    assert all(marker == "run-42" for _, marker in seen_configs)
+    # 分支的私有消息不回写父图
+    assert len(final["messages"]) == 1
+
+    print("✅ 报告全部到达汇合节点")
+    return True
+
+
+def main():
+    print("🚀 并行分析师测试")
+    print("=" * 50)
+
+    tests = [
+        ("分支汇合", test_reports_reach_join),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+持久化记忆测试
+验证记忆在重启后保留、内容哈希ID在并发写入时不冲突、启动预热不重新嵌入，
+以及切换嵌入模型或嵌入服务后不会沿用旧集合
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _make_memory(persist_path, name, cache=None, embedding="test-embedding", dimensions=3, base_url=None):
+    """构造一个使用持久化集合、但不连接真实嵌入服务的记忆实例"""
+    from tradingagents.agents.utils.memory import (
+        FinancialSituationMemory, ChromaDBManager, EmbeddingCache
+    )
+
+    memory = FinancialSituationMemory.__new__(FinancialSituationMemory)
+    memory.llm_provider = "openai"
+    memory.embedding = embedding
+    memory.client = SimpleNamespace(base_url=base_url) if base_url else object()
+    memory.embedding_cache = cache or EmbeddingCache(max_entries=64)
+    memory.chroma_manager = ChromaDBManager(persist_path)
+    memory.situation_collection = memory.chroma_manager.get_or_create_collection(memory.collection_name(name))
+    memory.calls = []
+
+    def fake_batch(texts):
+        memory.calls.append(list(texts))
+        return [[float(len(t)), 1.0, 0.5] + [0.0] * (dimensions - 3) for t in texts]
+
+    memory._embed_batch = fake_batch
+    return memory
+
+
+def _restart(persist_path):
+    """模拟进程重启：丢弃该路径的管理器实例"""
+    from tradingagents.agents.utils.memory import ChromaDBManager
+    ChromaDBManager._instances.pop(os.path.abspath(persist_path), None)
+
+
+def test_persist_across_restart():
+    """测试记忆在重启后仍然可以查询"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = _make_memory(tmp_dir, "bull_memory")
+        memory.add_situations([
+            ("高通胀叠加加息", "关注防御性板块"),
+            ("科技股波动", "降低高估值成长股仓位"),
+        ])
+
+        _restart(tmp_dir)
+        reopened = _make_memory(tmp_dir, "bull_memory")
+        assert reopened.situation_collection.count() == 2
+        matches = reopened.get_memories("高通胀叠加加息", n_matches=1)
+        assert matches[0]["recommendation"] == "关注防御性板块"
+
+    print("✅ 记忆重启后保留")
+    return True
+
+
+def test_idempotent_and_concurrent_ids():
+    """测试重复写入幂等、并发写入不冲突"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = _make_memory(tmp_dir, "trader_memory")
+        memory.add_situations([("情景A", "建议A"), ("情景A", "建议A")])
+        memory.add_situations([("情景A", "建议A")])
+        assert memory.situation_collection.count() == 1
+        assert memory.calls == [["情景A"]], "已存储的记忆不应重新嵌入"
+
+        def writer(worker):
+            memory.add_situations([(f"情景{worker}-{i}", f"建议{worker}-{i}") for i in range(5)])
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert memory.situation_collection.count() == 21
+
+    print("✅ 内容哈希ID正常")
+    return True
+
+
+def test_warm_up_without_reembedding():
+    """测试启动预热后已存储的情景不再请求嵌入"""
+    from tradingagents.agents.utils.memory import EmbeddingCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = _make_memory(tmp_dir, "risk_manager_memory")
+        memory.add_situations([("市场轮动", "再平衡组合"), ("美元走强", "对冲汇率风险")])
+
+        _restart(tmp_dir)
+        reopened = _make_memory(tmp_dir, "risk_manager_memory", cache=EmbeddingCache(max_entries=64))
+        assert reopened.warm_up() == 2
+        assert reopened.get_embedding("美元走强") == [4.0, 1.0, 0.5]
+        reopened.get_memories("市场轮动")
+        assert reopened.calls == []
+
+    print("✅ 启动预热正常")
+    return True
+
+
+def test_switch_embedding_model():
+    """测试切换嵌入模型后使用独立的集合，查询和写入不报维度不匹配"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = _make_memory(tmp_dir, "trader_memory")
+        memory.add_situations([("高通胀叠加加息", "关注防御性板块")])
+
+        _restart(tmp_dir)
+        switched = _make_memory(tmp_dir, "trader_memory", embedding="other-embedding", dimensions=8)
+        endpoint_hash = hashlib.sha256(b"").hexdigest()[:8]
+        assert switched.situation_collection.name == f"trader_memory__other-embedding__{endpoint_hash}"
+        assert switched.situation_collection.count() == 0
+        switched.add_situations([("科技股波动", "降低高估值成长股仓位")])
+        matches = switched.get_memories("科技股波动", n_matches=1)
+        assert matches[0]["recommendation"] == "降低高估值成长股仓位"
+
+        # 切换回原模型仍能读到原来的记忆
+        _restart(tmp_dir)
+        original = _make_memory(tmp_dir, "trader_memory")
+        assert original.get_memories("高通胀叠加加息", n_matches=1)[0]["recommendation"] == "关注防御性板块"
+
+    print("✅ 切换嵌入模型正常")
+    return True
+
+
+def test_switch_embedding_endpoint():
+    """测试同名嵌入模型换到另一个服务后不加载原服务的向量"""
+    from tradingagents.agents.utils.memory import EmbeddingCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = _make_memory(tmp_dir, "bull_memory", base_url="https://api.openai.com/v1/")
+        memory.add_situations([("消费复苏", "增持消费龙头")])
+
+        _restart(tmp_dir)
+        proxied = _make_memory(tmp_dir, "bull_memory", cache=EmbeddingCache(max_entries=64),
+                               base_url="https://proxy.example.com/v1/")
+        assert proxied.situation_collection.name != memory.situation_collection.name
+        assert proxied.situation_collection.count() == 0
+        assert proxied.warm_up() == 0
+
+        # 回到原服务时预热的是原来的向量
+        _restart(tmp_dir)
+        original = _make_memory(tmp_dir, "bull_memory", cache=EmbeddingCache(max_entries=64),
+                                base_url="https://api.openai.com/v1/")
+        assert original.warm_up() == 1
+        assert original.get_memories("消费复苏", n_matches=1)[0]["recommendation"] == "增持消费龙头"
+        assert original.calls == []
+
+    print("✅ 切换嵌入服务正常")
+    return True
+
+
+def main():
+    print("🚀 持久化记忆测试")
+    print("=" * 50)
+
+    tests = [
+        ("重启后保留", test_persist_across_restart),
+        ("幂等与并发写入", test_idempotent_and_concurrent_ids),
+        ("启动预热", test_warm_up_without_reembedding),
+        ("切换嵌入模型", test_switch_embedding_model),
+        ("切换嵌入服务", test_switch_embedding_endpoint),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+进程级价格数据存储测试
+验证同一文件只读取一次、文件修改后重新加载、LRU淘汰以及区间切片结果
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _write_price_csv(path, periods=60):
+    """生成一份模拟的YFin价格文件"""
+    import pandas as pd
+
+    dates = pd.bdate_range("2024-01-01", periods=periods)
+    pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Close": range(periods),
+    }).to_csv(path, index=False)
+
+
+def test_load_once_and_invalidate():
+    """测试只读取一次，mtime变化后重新加载"""
+    from tradingagents.dataflows.price_store import PriceFrameStore
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "TEST-YFin-data-2015-01-01-2025-03-25.csv")
+        _write_price_csv(path)
+
+        store = PriceFrameStore(max_entries=2)
+        first = store.get(path)
+        assert store.get(path) is first
+        assert store.get_statistics()['misses'] == 1
+
+        time.sleep(0.01)
+        _write_price_csv(path, periods=30)
+        os.utime(path, None)
+        reloaded = store.get(path)
+        assert reloaded is not first
+        assert len(reloaded.data) == 30
+
+    print("✅ 同一文件只读取一次，修改后自动重新加载")
+    return True
+
+
+def test_lru_and_slice():
+    """测试LRU淘汰与区间切片"""
+    from tradingagents.dataflows.price_store import PriceFrameStore
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        paths = []
+        for i in range(3):
+            path = os.path.join(data_dir, f"T{i}.csv")
+            _write_price_csv(path)
+            paths.append(path)
+
+        store = PriceFrameStore(max_entries=2)
+        for path in paths:
+            store.get(path)
+        assert store.get_statistics()['entries'] == 2
+
+        frame = store.get(paths[-1])
+        data = frame.data
+        expected = data[(data["Date"] >= "2024-01-10") & (data["Date"] <= "2024-02-02")]
+        sliced = frame.slice("2024-01-10", "2024-02-02")
+        assert sliced.equals(expected)
+        # 切片是副本，修改不影响存储中的数据
+        sliced["Close"] = -1
+        assert (frame.data["Close"] >= 0).all()
+
+    print("✅ LRU淘汰与区间切片正常")
+    return True
+
+
+def main():
+    print("🚀 价格数据存储测试")
+    print("=" * 50)
+
+    tests = [
+        ("只读取一次", test_load_once_and_invalidate),
+        ("LRU与切片", test_lru_and_slice),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+第三方阻塞调用执行器测试
+验证单次调用截止时间、按数据源的并发上限，以及超时后卡住的调用不会无限占用线程
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def test_result_and_errors():
+    """测试正常返回和异常透传"""
+    from tradingagents.dataflows.provider_executor import ProviderCallExecutor
+
+    executor = ProviderCallExecutor(max_workers=2)
+    assert executor.call("akshare", lambda: "行情数据") == "行情数据"
+
+    def broken():
+        raise ValueError("接口返回格式错误")
+
+    try:
+        executor.call("akshare", broken)
+        assert False, "应透传异常"
+    except ValueError:
+        pass
+
+    stats = executor.get_statistics()['providers']['akshare']
+    assert stats['calls'] == 2 and stats['errors'] == 1 and stats['in_flight'] == 0
+
+    print("✅ 返回值与异常正常")
+    return True
+
+
+def test_deadline_and_abandoned():
+    """测试超时立即返回，卡住的调用计入abandoned并继续占用名额"""
+    from tradingagents.dataflows.provider_executor import ProviderCallExecutor, ProviderCallTimeout
+
+    executor = ProviderCallExecutor(max_workers=4, provider_limits={'baostock': 1})
+    release = threading.Event()
+
+    start = time.time()
+    try:
+        executor.call("baostock", release.wait, timeout=0.1)
+        assert False, "应超时"
+    except ProviderCallTimeout:
+        pass
+    assert time.time() - start < 0.5
+
+    stats = executor.get_statistics()['providers']['baostock']
+    assert stats['timeouts'] == 1 and stats['abandoned'] == 1
+
+    # 卡住的调用仍占用唯一名额，新调用在截止时间内拿不到名额
+    try:
+        executor.call("baostock", lambda: "数据", timeout=0.1)
+        assert False, "名额已满时应超时"
+    except ProviderCallTimeout:
+        pass
+
+    release.set()
+    time.sleep(0.05)
+    assert executor.call("baostock", lambda: "数据", timeout=1) == "数据"
+    stats = executor.get_statistics()['providers']['baostock']
+    assert stats['abandoned'] == 0 and stats['in_flight'] == 0 and stats['timeouts'] == 2
+
+    print("✅ 截止时间正常")
+    return True
+
+
+def test_provider_concurrency_cap():
+    """测试每个数据源的并发上限"""
+    from tradingagents.dataflows.provider_executor import ProviderCallExecutor
+
+    executor = ProviderCallExecutor(max_workers=8, provider_limits={'akshare': 2})
+    lock = threading.Lock()
+    active = {'now': 0, 'max': 0}
+
+    def fetch():
+        with lock:
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+        time.sleep(0.05)
+        with lock:
+            active['now'] -= 1
+        return True
+
+    with ThreadPoolExecutor(max_workers=6) as callers:
+        results = list(callers.map(lambda _: executor.call("akshare", fetch, timeout=5), range(6)))
+
+    stats = executor.get_statistics()
+    print(f"📊 最大并发: {active['max']}, 最大排队: {stats['providers']['akshare']['max_waiting']}")
+    assert all(results)
+    assert active['max'] == 2
+    assert stats['providers']['akshare']['max_waiting'] > 2
+    assert stats['queue_depth'] == 0
+
+    print("✅ 并发上限正常")
+    return True
+
+
+def main():
+    print("🚀 第三方阻塞调用执行器测试")
+    print("=" * 50)
+
+    tests = [
+        ("返回值与异常", test_result_and_errors),
+        ("截止时间", test_deadline_and_abandoned),
+        ("并发上限", test_provider_concurrency_cap),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
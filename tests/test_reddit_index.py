@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Reddit语料索引测试
+验证索引范围查询与逐日全量扫描结果一致、公司名匹配器结果不变，且文件变更后自动重建
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _write_corpus(base_path):
+    """生成两个分类、每个分类两个subreddit文件的测试语料"""
+    start = datetime(2024, 1, 1)
+    titles = ["Apple earnings beat", "Tesla recall", "Nvidia and Apple partner", "Market wrap", ""]
+    for category in ("global_news", "company_news"):
+        os.makedirs(os.path.join(base_path, category))
+        for sub in ("stocks", "investing"):
+            with open(os.path.join(base_path, category, f"{sub}.jsonl"), "w", encoding="utf-8") as f:
+                for i in range(40):
+                    post = {
+                        "created_utc": (start + timedelta(hours=7 * i)).timestamp(),
+                        "title": titles[i % len(titles)],
+                        "selftext": "apple" if i % 7 == 0 else "",
+                        "url": f"https://reddit.com/{sub}/{i}",
+                        "ups": (i * 37) % 11,
+                    }
+                    f.write(json.dumps(post) + "\n")
+                    if i % 9 == 0:
+                        f.write("\n")
+
+
+def _scan_category(category, date, max_limit, query, base_path):
+    """索引化之前的逐行扫描实现，作为对照"""
+    from tradingagents.dataflows.reddit_utils import ticker_to_company
+
+    files = os.listdir(os.path.join(base_path, category))
+    limit = max_limit // len(files)
+    result = []
+    for data_file in files:
+        if not data_file.endswith(".jsonl"):
+            continue
+        posts = []
+        with open(os.path.join(base_path, category, data_file), "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                parsed = json.loads(line)
+                post_date = datetime.utcfromtimestamp(parsed["created_utc"]).strftime("%Y-%m-%d")
+                if post_date != date:
+                    continue
+                if "company" in category and query:
+                    company = ticker_to_company[query]
+                    terms = company.split(" OR ") if "OR" in company else [company]
+                    terms.append(query)
+                    if not any(re.search(t, parsed["title"], re.IGNORECASE)
+                               or re.search(t, parsed["selftext"], re.IGNORECASE) for t in terms):
+                        continue
+                posts.append({"title": parsed["title"], "content": parsed["selftext"],
+                              "url": parsed["url"], "upvotes": parsed["ups"], "posted_date": post_date})
+        posts.sort(key=lambda x: x["upvotes"], reverse=True)
+        result.extend(posts[:limit])
+    return result
+
+
+def test_range_matches_daily_scan():
+    """测试范围查询与逐日扫描结果一致"""
+    from tradingagents.dataflows.reddit_utils import fetch_top_from_category_range
+
+    with tempfile.TemporaryDirectory() as base_path:
+        _write_corpus(base_path)
+        days = ["2024-01-0%d" % d for d in range(1, 9)]
+
+        for category, query in (("global_news", None), ("company_news", "AAPL"), ("company_news", "NVDA")):
+            expected = []
+            for day in days:
+                expected.extend(_scan_category(category, day, 6, query, base_path))
+            actual = fetch_top_from_category_range(category, days[0], days[-1], 6, query, data_path=base_path)
+            print(f"📊 {category} {query or ''}: {len(actual)} 条")
+            assert actual == expected
+
+    print("✅ 范围查询结果与逐日扫描一致")
+    return True
+
+
+def test_company_matcher():
+    """测试预编译的公司名匹配器与逐个re.search结果一致"""
+    from tradingagents.dataflows.reddit_utils import CompanyTermMatcher, ticker_to_company
+
+    matcher = CompanyTermMatcher()
+    samples = [
+        ("Nvidia beats estimates", ""),
+        ("JP Morgan upgrades", "also mentions Square and Snap Inc."),
+        ("Nothing here", "just some words"),
+        ("", "TSMC and Taiwan Semiconductor Manufacturing Company"),
+    ]
+    for title, selftext in samples:
+        expected = []
+        for ticker, company in ticker_to_company.items():
+            terms = company.split(" OR ") if "OR" in company else [company]
+            terms.append(ticker)
+            if any(re.search(t, title, re.IGNORECASE) or re.search(t, selftext, re.IGNORECASE)
+                   for t in terms):
+                expected.append(ticker)
+        assert matcher.tag(title, selftext) == expected
+        for ticker in ticker_to_company:
+            assert matcher.mentions(ticker, title, selftext) == (ticker in expected)
+
+    # 重叠的词（"Nvidia"中的"v"）不能互相遮挡
+    assert {"NVDA", "V"} <= set(matcher.tag("Nvidia", ""))
+    assert matcher.version == CompanyTermMatcher(dict(ticker_to_company)).version
+    assert matcher.version != CompanyTermMatcher({"AAPL": "Apple"}).version
+
+    print("✅ 预编译匹配器与逐个搜索结果一致")
+    return True
+
+
+def test_refresh_on_change():
+    """测试语料文件修改后索引自动更新"""
+    from tradingagents.dataflows.reddit_utils import fetch_top_from_category, get_reddit_index
+
+    with tempfile.TemporaryDirectory() as base_path:
+        _write_corpus(base_path)
+        before = fetch_top_from_category("global_news", "2024-01-02", 10, data_path=base_path)
+        assert get_reddit_index(base_path).refresh("global_news") == 0
+
+        with open(os.path.join(base_path, "global_news", "stocks.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"created_utc": datetime(2024, 1, 2, 12).timestamp(), "title": "New post",
+                                "selftext": "", "url": "u", "ups": 999}) + "\n")
+
+        after = fetch_top_from_category("global_news", "2024-01-02", 10, data_path=base_path)
+        assert not any(p["title"] == "New post" for p in before)
+        assert any(p["title"] == "New post" for p in after)
+
+    print("✅ 文件变更后索引自动更新")
+    return True
+
+
+def main():
+    print("🚀 Reddit语料索引测试")
+    print("=" * 50)
+
+    tests = [
+        ("范围查询一致性", test_range_matches_daily_scan),
+        ("公司名匹配器", test_company_matcher),
+        ("索引增量更新", test_refresh_on_change),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
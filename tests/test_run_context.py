@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+可重入分析运行测试
+验证 TradingAgentsGraph.run 不修改图实例状态、多线程共享同一个图，以及追加写入的状态日志
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class FakeCompiledGraph:
+    """模拟已编译的LangGraph：根据初始状态生成最终状态"""
+
+    def invoke(self, init_state, **kwargs):
+        time.sleep(0.05)
+        ticker = init_state["company_of_interest"]
+        report = f"{ticker} 报告"
+        return {
+            **init_state,
+            "market_report": report,
+            "sentiment_report": report,
+            "news_report": report,
+            "fundamentals_report": report,
+            "investment_debate_state": {
+                "bull_history": "", "bear_history": "", "history": "",
+                "current_response": "", "judge_decision": "",
+            },
+            "trader_investment_plan": "",
+            "risk_debate_state": {
+                "risky_history": "", "safe_history": "", "neutral_history": "",
+                "history": "", "judge_decision": "",
+            },
+            "investment_plan": "",
+            "final_trade_decision": f"买入 {ticker}",
+        }
+
+
+class FakeSignalProcessor:
+    def process_signal(self, full_signal, stock_symbol=None):
+        return {"action": "买入", "reasoning": full_signal}
+
+
+def _make_graph(log_dir):
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
+    from tradingagents.graph.propagation import Propagator
+    from tradingagents.graph.run_context import StateLog
+
+    graph = TradingAgentsGraph.__new__(TradingAgentsGraph)
+    graph.debug = False
+    graph.graph = FakeCompiledGraph()
+    graph.propagator = Propagator()
+    graph.signal_processor = FakeSignalProcessor()
+    graph.state_log = StateLog(log_dir)
+    graph.curr_state = None
+    graph.ticker = None
+    return graph
+
+
+def test_concurrent_runs():
+    """测试同一个图实例并发运行多个股票"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        graph = _make_graph(tmp_dir)
+        tickers = ["AAPL", "NVDA", "000001", "0700.HK"]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            runs = list(executor.map(lambda t: graph.run(t, "2025-01-06"), tickers))
+
+        for ticker, run in zip(tickers, runs):
+            assert run.ticker == ticker
+            assert run.final_state["market_report"] == f"{ticker} 报告"
+            assert run.decision["reasoning"] == f"买入 {ticker}"
+            assert run.duration is not None and os.path.exists(run.log_path)
+        assert len({run.run_id for run in runs}) == len(tickers)
+        assert graph.curr_state is None, "run() 不应修改图实例状态"
+
+        # propagate 保持原有返回值，并记录最近一次运行
+        state, decision = graph.propagate("AAPL", "2025-01-07")
+        assert graph.ticker == "AAPL" and graph.curr_state is state
+        assert decision["action"] == "买入"
+
+    print("✅ 并发运行正常")
+    return True
+
+
+def test_append_only_state_log():
+    """测试状态日志逐行追加，同一日期以最近一次运行为准"""
+    from tradingagents.graph.run_context import StateLog, RunContext
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log = StateLog(tmp_dir)
+
+        def append(i):
+            log.append(RunContext(ticker="AAPL", trade_date=f"2025-01-{i % 5 + 1:02d}"), {"n": i})
+
+        threads = [threading.Thread(target=append, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(log.path_for("AAPL"), encoding="utf-8") as f:
+            assert len(f.readlines()) == 20
+
+        log.append(RunContext(ticker="AAPL", trade_date="2025-01-01"), {"n": "latest"})
+        states = log.read("AAPL")
+        assert len(states) == 5
+        assert states["2025-01-01"] == {"n": "latest"}
+
+    print("✅ 状态日志追加写入正常")
+    return True
+
+
+def main():
+    print("🚀 可重入分析运行测试")
+    print("=" * 50)
+
+    tests = [
+        ("并发运行", test_concurrent_runs),
+        ("追加写入状态日志", test_append_only_state_log),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+SimFin财报存储测试
+验证索引查找与逐次读取CSV筛选的结果一致，且预处理文件可复用
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _write_statements(csv_path):
+    """生成打乱顺序的测试财报CSV（分号分隔）"""
+    import pandas as pd
+
+    rows = []
+    for i, ticker in enumerate(["AAPL", "MSFT", "NVDA"] * 4):
+        year = 2019 + i // 3
+        rows.append({
+            "Ticker": ticker,
+            "SimFinId": 100 + i,
+            "Currency": "USD",
+            "Fiscal Year": year,
+            "Report Date": f"{year}-09-30",
+            "Publish Date": f"{year}-11-0{1 + i % 3}",
+            "Total Assets": 1000.5 * (i + 1),
+        })
+    # 同一天发布两行，应返回文件中靠前的一行
+    rows.append(dict(rows[0], **{"SimFinId": 999, "Total Assets": 1.0}))
+    pd.DataFrame(rows[::-1]).to_csv(csv_path, sep=";", index=False)
+
+
+def _legacy_latest(csv_path, ticker, curr_date):
+    """原实现：每次读取整个CSV并筛选"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, sep=";")
+    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
+    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
+    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
+    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    if filtered_df.empty:
+        return None
+    return filtered_df.loc[filtered_df["Publish Date"].idxmax()]
+
+
+def test_latest_matches_legacy():
+    """测试最新财报查找与原实现一致"""
+    from tradingagents.dataflows.simfin_store import SimFinStore
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        csv_path = os.path.join(data_dir, "us-balance-annual.csv")
+        _write_statements(csv_path)
+        store = SimFinStore()
+
+        for ticker in ("AAPL", "MSFT", "NVDA", "TSLA"):
+            for curr_date in ("2018-01-01", "2019-11-01", "2020-06-30", "2023-12-31"):
+                expected = _legacy_latest(csv_path, ticker, curr_date)
+                actual = store.latest_statement(csv_path, ticker, curr_date)
+                if expected is None:
+                    assert actual is None
+                else:
+                    assert str(actual.drop("SimFinId")) == str(expected.drop("SimFinId"))
+
+    print("✅ 最新财报查找与原实现一致")
+    return True
+
+
+def test_prepared_file_reused():
+    """测试列式预处理文件在新进程（新存储实例）中复用，CSV更新后重建"""
+    from tradingagents.dataflows.simfin_store import SimFinStore
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        csv_path = os.path.join(data_dir, "us-income-quarterly.csv")
+        _write_statements(csv_path)
+        SimFinStore().get_table(csv_path)
+
+        prepared = [name for name in os.listdir(data_dir) if name != "us-income-quarterly.csv"]
+        print(f"📊 预处理文件: {prepared}")
+        assert len(prepared) == 1
+
+        store = SimFinStore()
+        assert store._load_prepared(os.path.abspath(csv_path), os.stat(csv_path).st_mtime_ns) is not None
+        row = store.latest_statement(csv_path, "NVDA", "2030-01-01")
+        assert row["Fiscal Year"] == 2022
+
+    print("✅ 预处理文件复用正常")
+    return True
+
+
+def main():
+    print("🚀 SimFin财报存储测试")
+    print("=" * 50)
+
+    tests = [
+        ("最新财报查找", test_latest_matches_legacy),
+        ("预处理文件复用", test_prepared_file_reused),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+A股行情结构化结果测试
+验证DataFrame结果的渲染、缓存往返，以及基本面报告直接读取DataFrame
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _tushare_frame():
+    return pd.DataFrame({
+        'trade_date': ['20250102', '20250103', '20250106'],
+        'open': [11.0, 11.2, 11.5],
+        'high': [11.4, 11.8, 12.1],
+        'low': [10.9, 11.1, 11.3],
+        'close': [11.2, 11.5, 12.0],
+        'vol': [1200000.0, 980000.0, 1500000.0],
+    })
+
+
+def test_render_report():
+    """测试Tushare结果渲染为报告文本"""
+    from tradingagents.dataflows.stock_data_result import StockDataResult
+
+    result = StockDataResult.from_frame('000001', 'tushare', _tushare_frame(),
+                                        '2025-01-01', '2025-01-06', stock_name='平安银行')
+    assert result.ok
+    assert result.latest_close() == 12.0
+    assert round(result.change_pct(), 2) == 4.35
+
+    text = result.render()
+    assert "- 股票名称: 平安银行" in text
+    assert "- 当前价格: ¥12.00" in text
+    assert "- 涨跌幅: +4.35%" in text
+    assert "- 成交量: 150.0万手" in text
+    assert "- 期间最高: ¥12.10" in text
+    assert "- 期间最低: ¥10.90" in text
+
+    print("✅ 报告渲染正常")
+    return True
+
+
+def test_failures():
+    """测试空数据和错误文本"""
+    from tradingagents.dataflows.stock_data_result import StockDataResult, STATUS_EMPTY
+
+    empty = StockDataResult.from_frame('000001', 'akshare', pd.DataFrame())
+    assert not empty.ok
+    assert empty.status == STATUS_EMPTY
+    assert empty.render() == "❌ 未能获取000001的股票数据"
+
+    assert not StockDataResult.from_text('000001', 'tdx', "❌ TDX连接失败").ok
+    assert StockDataResult.from_text('000001', 'tdx', "000001 行情").render() == "000001 行情"
+
+    print("✅ 失败结果正常")
+    return True
+
+
+def test_cache_round_trip():
+    """测试缓存DataFrame时元数据随attrs保存"""
+    from tradingagents.dataflows.stock_data_result import StockDataResult
+    from tradingagents.dataflows.frame_serializer import SERIALIZERS
+
+    result = StockDataResult.from_frame('000001', 'tushare', _tushare_frame(),
+                                        '2025-01-01', '2025-01-06', stock_name='平安银行')
+    for name, serializer in SERIALIZERS.items():
+        cached = serializer.loads(serializer.dumps(result.to_frame()))
+        restored = StockDataResult.from_cache(cached, '000001')
+        assert restored.source == 'tushare', name
+        assert restored.render() == result.render(), name
+
+    stale = StockDataResult.from_cache(result.to_frame(), '000001')
+    stale.stale = True
+    assert stale.render().endswith("⚠️ 注意: 使用的是过期缓存数据")
+
+    print("✅ 缓存往返正常")
+    return True
+
+
+def test_fundamentals_from_frame():
+    """测试基本面报告直接从DataFrame读取行情，与解析文本的结果一致"""
+    from tradingagents.dataflows.stock_data_result import StockDataResult
+    from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+    provider = OptimizedChinaDataProvider.__new__(OptimizedChinaDataProvider)
+    result = StockDataResult.from_frame('000001', 'tushare', _tushare_frame(),
+                                        '2025-01-01', '2025-01-06', stock_name='平安银行')
+
+    from_frame = provider._generate_fundamentals_report('000001', result)
+    from_text = provider._generate_fundamentals_report('000001', result.render())
+    assert "- **当前股价**: ¥12.00" in from_frame
+    assert "- **涨跌幅**: +4.35%" in from_frame
+    assert "- **成交量**: 150.0万手" in from_frame
+    assert from_frame == from_text
+
+    print("✅ 基本面报告正常")
+    return True
+
+
+def main():
+    print("🚀 A股行情结构化结果测试")
+    print("=" * 50)
+
+    tests = [
+        ("报告渲染", test_render_report),
+        ("失败结果", test_failures),
+        ("缓存往返", test_cache_round_trip),
+        ("基本面报告", test_fundamentals_from_frame),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
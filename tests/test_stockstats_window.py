@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试技术指标窗口引擎
+验证一次加载+一次计算的窗口结果与逐日重新计算完全一致
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _write_price_csv(data_dir, symbol):
+    """生成一份模拟的YFin价格文件"""
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.bdate_range("2024-01-01", "2024-06-28")
+    rng = np.random.default_rng(42)
+    close = 100 + rng.normal(0, 1, len(dates)).cumsum()
+    data = pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Open": close + rng.normal(0, 0.5, len(dates)),
+        "High": close + 1,
+        "Low": close - 1,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 2_000_000, len(dates)),
+    })
+    data.to_csv(
+        os.path.join(data_dir, f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv"),
+        index=False,
+    )
+    return data
+
+
+def test_window_matches_per_day():
+    """测试窗口引擎与逐日重新计算的结果一致"""
+    print("🧪 测试技术指标窗口引擎...")
+
+    import pandas as pd
+    from stockstats import wrap
+    from tradingagents.dataflows.stockstats_utils import StockstatsUtils, NOT_TRADING_DAY
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        raw = _write_price_csv(data_dir, "TEST")
+        date_strs = raw["Date"].tolist()
+        dates = ["2024-06-28", "2024-06-27", "2024-06-22", "2024-03-15"]
+        indicators = ["close_10_ema", "rsi", "macd"]
+
+        window = StockstatsUtils.get_stock_stats_window(
+            "TEST", indicators, dates, data_dir, online=False
+        )
+
+        for indicator in indicators:
+            for date in dates:
+                if date not in date_strs:
+                    continue
+                # 逐日方式：重新读取文件并完整计算一次指标
+                df = wrap(pd.read_csv(os.path.join(
+                    data_dir, "TEST-YFin-data-2015-01-01-2025-03-25.csv"
+                )))
+                expected = df[indicator].values[date_strs.index(date)]
+                assert str(window[indicator][date]) == str(expected), (indicator, date)
+
+        # 周六不是交易日
+        assert window["rsi"]["2024-06-22"] == NOT_TRADING_DAY
+
+    print("✅ 窗口引擎结果与逐日计算一致")
+    return True
+
+
+def main():
+    print("🚀 技术指标窗口引擎测试")
+    print("=" * 50)
+    try:
+        result = test_window_matches_per_day()
+    except Exception as e:
+        print(f"❌ 测试执行失败: {e}")
+        result = False
+    print("🎉 测试通过" if result else "⚠️ 测试失败")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+通达信批量行情测试
+验证市场概览、股票搜索和批量实时数据只发起一次行情请求，超过协议上限时自动分批
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class FakeTdxApi:
+    """模拟pytdx行情接口，记录每次get_security_quotes的请求"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_security_quotes(self, pairs):
+        self.requests.append(list(pairs))
+        return [{'market': market, 'code': code, 'price': 11.0, 'last_close': 10.0, 'vol': 1000}
+                for market, code in pairs]
+
+
+def _make_provider():
+    from tradingagents.dataflows import tdx_utils
+
+    provider = tdx_utils.TongDaXinDataProvider.__new__(tdx_utils.TongDaXinDataProvider)
+    provider.api = FakeTdxApi()
+    provider.exapi = None
+    provider.connected = True
+    provider._get_stock_name = lambda code: f'股票{code}'
+    return provider
+
+
+def test_real_time_data_many():
+    """测试批量实时数据一次请求，并按协议上限分批"""
+    from tradingagents.dataflows.tdx_utils import TDX_MAX_QUOTES_PER_REQUEST
+
+    provider = _make_provider()
+    data = provider.get_real_time_data_many(['000001', '600519', '300750', '000001'])
+    assert len(provider.api.requests) == 1
+    assert provider.api.requests[0] == [(0, '000001'), (1, '600519'), (0, '300750')]
+    assert set(data) == {'000001', '600519', '300750'}
+    assert abs(data['600519']['change_percent'] - 10.0) < 1e-9
+
+    # 单只股票接口保持原有返回格式
+    assert provider.get_real_time_data('000001')['name'] == '股票000001'
+
+    provider.api.requests.clear()
+    codes = [f"{i:06d}" for i in range(TDX_MAX_QUOTES_PER_REQUEST + 5)]
+    data = provider.get_real_time_data_many(codes)
+    assert [len(r) for r in provider.api.requests] == [TDX_MAX_QUOTES_PER_REQUEST, 5]
+    assert len(data) == len(codes)
+
+    print("✅ 批量实时数据正常")
+    return True
+
+
+def test_overview_and_search_single_call():
+    """测试市场概览和搜索只发起一次行情请求"""
+    provider = _make_provider()
+
+    overview = provider.get_market_overview()
+    assert len(provider.api.requests) == 1
+    assert set(overview) == {'上证指数', '深证成指', '创业板指', '科创50'}
+    # 上证指数(1, 000001)与平安银行(0, 000001)按市场区分
+    assert (1, '000001') in provider.api.requests[0]
+
+    provider.api.requests.clear()
+    results = provider.search_stocks('银行')
+    assert len(provider.api.requests) == 1
+    assert {r['name'] for r in results} == {'平安银行', '招商银行', '工商银行'}
+
+    print("✅ 概览与搜索批量请求正常")
+    return True
+
+
+def main():
+    print("🚀 通达信批量行情测试")
+    print("=" * 50)
+
+    tests = [
+        ("批量实时数据", test_real_time_data_many),
+        ("概览与搜索", test_overview_and_search_single_call),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
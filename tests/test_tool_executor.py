@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+分析师工具调用执行器测试
+验证同一轮工具调用并发执行、结果按原顺序返回、失败/超时/未知工具的处理，
+以及超时从开始执行时计算、线程池被卡住的工具占满时排队调用不会无限等待
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+class FakeTool:
+    """模拟LangChain工具"""
+
+    def __init__(self, name, delay=0.0, error=None, block=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.block = block
+
+    def invoke(self, args):
+        if self.block is not None:
+            self.block.wait()
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return f"{self.name}:{args.get('ticker')}"
+
+
+def test_concurrent_and_ordered():
+    """测试并发执行且结果按调用顺序返回"""
+    from tradingagents.agents.utils.tool_executor import execute_tool_calls
+
+    tools = [FakeTool("get_stock_data", 0.3), FakeTool("get_indicators", 0.1), FakeTool("get_news", 0.2)]
+    tool_calls = [
+        {"name": "get_stock_data", "args": {"ticker": "AAPL"}, "id": "call_1"},
+        {"name": "get_indicators", "args": {"ticker": "AAPL"}, "id": "call_2"},
+        {"name": "get_news", "args": {"ticker": "AAPL"}, "id": "call_3"},
+    ]
+
+    start = time.time()
+    messages = execute_tool_calls(tool_calls, tools)
+    elapsed = time.time() - start
+
+    print(f"📊 3个工具耗时: {elapsed:.2f}秒")
+    assert [m.tool_call_id for m in messages] == ["call_1", "call_2", "call_3"]
+    assert [m.content for m in messages] == ["get_stock_data:AAPL", "get_indicators:AAPL", "get_news:AAPL"]
+    assert elapsed < 0.55, "工具调用应并发执行"
+
+    print("✅ 并发执行且顺序正确")
+    return True
+
+
+def test_errors_and_timeout():
+    """测试失败、超时和未知工具"""
+    from tradingagents.agents.utils.tool_executor import execute_tool_calls
+
+    tools = [FakeTool("broken", error="接口异常"), FakeTool("slow", 1.0)]
+    tool_calls = [
+        {"name": "broken", "args": {}, "id": "a"},
+        {"name": "missing", "args": {}, "id": "b"},
+        {"name": "slow", "args": {}, "id": "c"},
+    ]
+
+    messages = execute_tool_calls(tool_calls, tools, timeout=0.2)
+    assert messages[0].content == "工具执行失败: 接口异常"
+    assert messages[1].content == "未找到工具: missing"
+    assert messages[2].content.startswith("工具执行超时")
+
+    print("✅ 失败/超时/未知工具处理正常")
+    return True
+
+
+def _use_small_pool(max_workers):
+    """替换为小线程池，返回恢复原线程池的函数"""
+    from tradingagents.agents.utils import tool_executor
+
+    original = (tool_executor._executor, tool_executor.TOOL_CALL_MAX_WORKERS)
+    tool_executor._executor = ThreadPoolExecutor(max_workers=max_workers)
+    tool_executor.TOOL_CALL_MAX_WORKERS = max_workers
+
+    def restore():
+        tool_executor._executor.shutdown(wait=False)
+        tool_executor._executor, tool_executor.TOOL_CALL_MAX_WORKERS = original
+
+    return restore
+
+
+def test_deadline_from_start():
+    """测试排队时间不计入工具的执行超时"""
+    from tradingagents.agents.utils.tool_executor import execute_tool_calls
+
+    restore = _use_small_pool(1)
+    try:
+        tools = [FakeTool("get_stock_data", 0.15), FakeTool("get_news", 0.15)]
+        tool_calls = [
+            {"name": "get_stock_data", "args": {"ticker": "AAPL"}, "id": "a"},
+            {"name": "get_news", "args": {"ticker": "AAPL"}, "id": "b"},
+        ]
+        messages = execute_tool_calls(tool_calls, tools, timeout=0.25)
+        assert [m.content for m in messages] == ["get_stock_data:AAPL", "get_news:AAPL"]
+    finally:
+        restore()
+
+    print("✅ 超时从开始执行时计算")
+    return True
+
+
+def test_saturation_statistics():
+    """测试卡住的工具计入abandoned，线程池占满时排队调用按时返回"""
+    from tradingagents.agents.utils.tool_executor import execute_tool_calls, get_tool_call_statistics
+
+    restore = _use_small_pool(2)
+    release = threading.Event()
+    try:
+        before = get_tool_call_statistics()
+        hung = [FakeTool(f"hung_{i}", block=release) for i in range(2)]
+        calls = [{"name": f"hung_{i}", "args": {}, "id": f"h{i}"} for i in range(2)]
+        messages = execute_tool_calls(calls, hung, timeout=0.1)
+        assert all(m.content.startswith("工具执行超时") for m in messages)
+
+        stats = get_tool_call_statistics()
+        assert stats['abandoned'] == before['abandoned'] + 2
+        assert stats['timeouts'] == before['timeouts'] + 2
+
+        # 两个工作线程都被卡住，新调用排队超时而不是无限等待
+        start = time.time()
+        messages = execute_tool_calls([{"name": "quick", "args": {"ticker": "AAPL"}, "id": "q"}],
+                                      [FakeTool("quick")], timeout=0.1)
+        assert time.time() - start < 0.5
+        assert "排队" in messages[0].content
+        stats = get_tool_call_statistics()
+        print(f"📊 线程池统计: {stats}")
+        assert stats['queue_timeouts'] == before['queue_timeouts'] + 1
+        assert stats['queued'] == before['queued']
+
+        # 卡住的工具返回后释放线程
+        release.set()
+        time.sleep(0.1)
+        assert get_tool_call_statistics()['abandoned'] == before['abandoned']
+        messages = execute_tool_calls([{"name": "quick", "args": {"ticker": "AAPL"}, "id": "q"}],
+                                      [FakeTool("quick")], timeout=0.5)
+        assert messages[0].content == "quick:AAPL"
+    finally:
+        release.set()
+        restore()
+
+    print("✅ 线程池饱和统计正常")
+    return True
+
+
+def main():
+    print("🚀 分析师工具调用执行器测试")
+    print("=" * 50)
+
+    tests = [
+        ("并发执行与顺序", test_concurrent_and_ordered),
+        ("失败与超时", test_errors_and_timeout),
+        ("从开始执行计时", test_deadline_from_start),
+        ("线程池饱和", test_saturation_statistics),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Token使用记录账本测试
+验证批量落盘与重新加载、压缩、旧版usage.json迁移、统计窗口，
+以及多个进程共用同一账本时统计能看到彼此的记录且压缩不丢失追加的行
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+
+def _record(provider="deepseek", cost=0.01, session_id="s1", timestamp=None, index=0):
+    return {
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "provider": provider,
+        "model_name": "deepseek-chat",
+        "input_tokens": 100,
+        "output_tokens": 50,
+        "cost": cost,
+        "session_id": session_id,
+        "analysis_type": f"stock_analysis_{index}",
+    }
+
+
+def _file_lines(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_append_flush_reload():
+    """测试追加记录批量落盘，重新打开后聚合一致"""
+    from tradingagents.config.usage_ledger import UsageLedger
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger_file = Path(tmp_dir) / "usage.jsonl"
+        ledger = UsageLedger(ledger_file, flush_interval=60)
+        for i in range(5):
+            ledger.append(_record(cost=0.1, index=i))
+
+        # 未落盘时统计已包含缓冲区中的记录
+        assert ledger.get_statistics(1)["total_requests"] == 5
+        assert not ledger_file.exists()
+
+        ledger.flush()
+        assert len(_file_lines(ledger_file)) == 5
+        assert len(ledger.load_records()) == 5
+
+        reopened = UsageLedger(ledger_file, flush_interval=60)
+        stats = reopened.get_statistics(1)
+        assert stats["total_requests"] == 5
+        assert abs(stats["total_cost"] - 0.5) < 1e-9
+        assert abs(reopened.get_session_cost("s1") - 0.5) < 1e-9
+        ledger.close()
+        reopened.close()
+
+    print("✅ 落盘与重新加载正常")
+    return True
+
+
+def test_compaction():
+    """测试超出保留上限20%后压缩为最近max_records条"""
+    from tradingagents.config.usage_ledger import UsageLedger
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger_file = Path(tmp_dir) / "usage.jsonl"
+        ledger = UsageLedger(ledger_file, flush_interval=60, max_records=10)
+        for i in range(13):
+            ledger.append(_record(index=i))
+        ledger.flush()
+
+        lines = _file_lines(ledger_file)
+        assert len(lines) == 10
+        assert lines[-1]["analysis_type"] == "stock_analysis_12"
+        assert ledger.get_statistics(1)["total_requests"] == 10
+        ledger.close()
+
+    print("✅ 账本压缩正常")
+    return True
+
+
+def test_legacy_migration():
+    """测试旧版usage.json迁移到JSONL账本"""
+    from tradingagents.config.usage_ledger import UsageLedger
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_file = Path(tmp_dir) / "usage.json"
+        legacy_file.write_text(json.dumps([_record(provider="dashscope", cost=0.2, index=i) for i in range(3)]),
+                               encoding='utf-8')
+        ledger_file = Path(tmp_dir) / "usage.jsonl"
+
+        ledger = UsageLedger(ledger_file, legacy_file=legacy_file, flush_interval=60)
+        assert not legacy_file.exists()
+        assert (Path(tmp_dir) / "usage.json.migrated").exists()
+        assert len(_file_lines(ledger_file)) == 3
+        assert ledger.get_statistics(1)["provider_stats"]["dashscope"]["requests"] == 3
+        ledger.close()
+
+    print("✅ 旧版记录迁移正常")
+    return True
+
+
+def test_stats_window_matches_load_records():
+    """测试统计与按时间读取记录使用同一个整点对齐的窗口"""
+    from tradingagents.config.usage_ledger import UsageLedger, window_start
+
+    now = datetime.now()
+    start = window_start(1)
+    assert start.endswith(":00:00")
+
+    # 窗口起点所在小时内、起点之前的小时、以及窗口内的记录
+    start_hour = datetime.fromisoformat(start)
+    records = [
+        _record(timestamp=(start_hour + timedelta(minutes=30)).isoformat(), index=0),
+        _record(timestamp=(start_hour - timedelta(minutes=30)).isoformat(), index=1),
+        _record(timestamp=now.isoformat(), index=2),
+        _record(timestamp=(now - timedelta(days=3)).isoformat(), index=3),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger = UsageLedger(Path(tmp_dir) / "usage.jsonl", flush_interval=60)
+        ledger.replace_all(records)
+
+        loaded = ledger.load_records(start)
+        stats = ledger.get_statistics(1)
+        daily = ledger.get_daily_statistics(1)
+        print(f"📊 窗口起点 {start}: 记录 {len(loaded)} 条, 统计 {stats['total_requests']} 次")
+        assert sorted(r["analysis_type"] for r in loaded) == ["stock_analysis_0", "stock_analysis_2"]
+        assert stats["total_requests"] == len(loaded)
+        assert sum(day["requests"] for day in daily) == len(loaded)
+        ledger.close()
+
+    print("✅ 统计窗口一致")
+    return True
+
+
+def test_cross_process_stats():
+    """测试统计能看到其他进程（独立的账本实例）追加和压缩后的记录"""
+    from tradingagents.config.usage_ledger import UsageLedger
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger_file = Path(tmp_dir) / "usage.jsonl"
+        web = UsageLedger(ledger_file, flush_interval=60, max_records=10)
+        cli = UsageLedger(ledger_file, flush_interval=60, max_records=10)
+
+        for i in range(4):
+            cli.append(_record(session_id="cli", index=i))
+        cli.flush()
+        assert web.get_statistics(1)["total_requests"] == 4
+        assert abs(web.get_session_cost("cli") - 0.04) < 1e-9
+
+        # 其他进程压缩替换了账本文件
+        for i in range(9):
+            cli.append(_record(session_id="cli", index=4 + i))
+        cli.flush()
+        assert len(_file_lines(ledger_file)) == 10
+        assert web.get_statistics(1)["total_requests"] == 10
+
+        web.append(_record(session_id="web"))
+        web.flush()
+        assert cli.get_statistics(1)["total_requests"] == 11
+        assert web.get_statistics(1)["total_requests"] == 11
+        web.close()
+        cli.close()
+
+    print("✅ 跨进程统计正常")
+    return True
+
+
+def test_concurrent_writers_keep_lines():
+    """测试多个实例并发追加并频繁压缩时不丢失记录"""
+    from tradingagents.config.usage_ledger import UsageLedger
+
+    writers_count, per_writer, max_records = 3, 60, 50
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger_file = Path(tmp_dir) / "usage.jsonl"
+        ledgers = [UsageLedger(ledger_file, flush_interval=60, batch_size=1000, max_records=max_records)
+                   for _ in range(writers_count)]
+
+        # 每轮所有写入者各追加一条后才进入下一轮，最后一轮的记录一定在最新的行中
+        barrier = threading.Barrier(writers_count)
+
+        def write(n):
+            for i in range(per_writer):
+                ledgers[n].append(_record(session_id=f"w{n}", index=i))
+                ledgers[n].flush()
+                barrier.wait()
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(writers_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = _file_lines(ledger_file)
+        print(f"📊 账本剩余 {len(lines)} 行")
+        assert max_records <= len(lines) <= max_records * 1.2
+
+        # 每个写入者保留的是连续的最近记录，且压缩只丢弃全局最旧的记录
+        first_kept = []
+        for n in range(writers_count):
+            indexes = [int(r["analysis_type"].rsplit("_", 1)[1]) for r in lines if r["session_id"] == f"w{n}"]
+            assert indexes and indexes[-1] == per_writer - 1
+            assert indexes == list(range(indexes[0], per_writer)), f"w{n} 的记录不连续"
+            first_kept.append(indexes[0])
+        assert max(first_kept) - min(first_kept) <= 1, "压缩应只丢弃最旧的轮次"
+
+        for ledger in ledgers:
+            assert ledger.get_statistics(1)["total_requests"] == len(lines)
+            ledger.close()
+
+    print("✅ 并发写入不丢行")
+    return True
+
+
+def main():
+    print("🚀 Token使用记录账本测试")
+    print("=" * 50)
+
+    tests = [
+        ("落盘与重新加载", test_append_flush_reload),
+        ("账本压缩", test_compaction),
+        ("旧版记录迁移", test_legacy_migration),
+        ("统计窗口", test_stats_window_matches_load_records),
+        ("跨进程统计", test_cross_process_stats),
+        ("并发写入", test_concurrent_writers_keep_lines),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"❌ 测试 '{test_name}' 执行失败: {str(e)}")
+            results.append((test_name, False))
+
+    print(f"\n{'='*20} 测试结果汇总 {'='*20}")
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} {test_name}")
+
+
+if __name__ == "__main__":
+    main()
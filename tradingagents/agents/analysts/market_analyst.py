@@ -390,49 +390,11 @@ def create_market_analyst(llm, toolkit):
 
             try:
                 # 执行工具调用
-                from langchain_core.messages import ToolMessage, HumanMessage
-
-                tool_messages = []
-                for tool_call in result.tool_calls:
-                    tool_name = tool_call.get('name')
-                    tool_args = tool_call.get('args', {})
-                    tool_id = tool_call.get('id')
-
-                    logger.debug(f"📊 [DEBUG] 执行工具: {tool_name}, 参数: {tool_args}")
-
-                    # 找到对应的工具并执行
-                    tool_result = None
-                    for tool in tools:
-                        # 安全地获取工具名称进行比较
-                        current_tool_name = None
-                        if hasattr(tool, 'name'):
-                            current_tool_name = tool.name
-                        elif hasattr(tool, '__name__'):
-                            current_tool_name = tool.__name__
-
-                        if current_tool_name == tool_name:
-                            try:
-                                if tool_name == "get_china_stock_data":
-                                    # 中国股票数据工具
-                                    tool_result = tool.invoke(tool_args)
-                                else:
-                                    # 其他工具
-                                    tool_result = tool.invoke(tool_args)
-                                logger.debug(f"📊 [DEBUG] 工具执行成功，结果长度: {len(str(tool_result))}")
-                                break
-                            except Exception as tool_error:
-                                logger.error(f"❌ [DEBUG] 工具执行失败: {tool_error}")
-                                tool_result = f"工具执行失败: {str(tool_error)}"
-
-                    if tool_result is None:
-                        tool_result = f"未找到工具: {tool_name}"
-
-                    # 创建工具消息
-                    tool_message = ToolMessage(
-                        content=str(tool_result),
-                        tool_call_id=tool_id
-                    )
-                    tool_messages.append(tool_message)
+                from langchain_core.messages import HumanMessage
+                from tradingagents.agents.utils.tool_executor import execute_tool_calls
+
+                # 同一轮的多个工具调用相互独立，并发执行，结果按原顺序返回
+                tool_messages = execute_tool_calls(result.tool_calls, tools)
 
                 # 基于工具结果生成完整分析报告
                 analysis_prompt = f"""现在请基于上述工具获取的数据，生成详细的技术分析报告。
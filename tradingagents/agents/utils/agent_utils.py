@@ -616,7 +616,7 @@ class Toolkit:
 
         try:
             # 使用统一数据源接口获取股票数据（默认Tushare，支持备用数据源）
-            from tradingagents.dataflows.interface import get_china_stock_data_unified
+            from tradingagents.dataflows.data_source_manager import get_china_stock_data_result
             logger.debug(f"📊 [DEBUG] 正在获取 {ticker} 的股票数据...")
 
             # 获取最近30天的数据用于基本面分析
@@ -624,16 +624,16 @@ class Toolkit:
             end_date = datetime.strptime(curr_date, '%Y-%m-%d')
             start_date = end_date - timedelta(days=30)
 
-            stock_data = get_china_stock_data_unified(
+            stock_data = get_china_stock_data_result(
                 ticker,
                 start_date.strftime('%Y-%m-%d'),
                 end_date.strftime('%Y-%m-%d')
             )
 
-            logger.debug(f"📊 [DEBUG] 股票数据获取完成，长度: {len(stock_data) if stock_data else 0}")
+            logger.debug(f"📊 [DEBUG] 股票数据获取完成，状态: {stock_data.status}")
 
-            if not stock_data or "获取失败" in stock_data or "❌" in stock_data:
-                return f"无法获取股票 {ticker} 的基本面数据：{stock_data}"
+            if not stock_data.ok:
+                return f"无法获取股票 {ticker} 的基本面数据：{stock_data.render()}"
 
             # 调用真正的基本面分析
             from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
@@ -759,15 +759,16 @@ class Toolkit:
                 logger.info(f"🇨🇳 [统一基本面工具] 处理A股数据...")
                 logger.info(f"🔍 [股票代码追踪] 进入A股处理分支，ticker: '{ticker}'")
 
+                stock_data = ""
                 try:
-                    # 获取股票价格数据
-                    from tradingagents.dataflows.interface import get_china_stock_data_unified
-                    logger.info(f"🔍 [股票代码追踪] 调用 get_china_stock_data_unified，传入参数: ticker='{ticker}', start_date='{start_date}', end_date='{end_date}'")
-                    stock_data = get_china_stock_data_unified(ticker, start_date, end_date)
-                    logger.info(f"🔍 [股票代码追踪] get_china_stock_data_unified 返回结果前200字符: {stock_data[:200] if stock_data else 'None'}")
-                    result_data.append(f"## A股价格数据\n{stock_data}")
+                    # 获取股票价格数据（结构化结果，基本面报告直接读取DataFrame）
+                    from tradingagents.dataflows.data_source_manager import get_china_stock_data_result
+                    logger.info(f"🔍 [股票代码追踪] 调用 get_china_stock_data_result，传入参数: ticker='{ticker}', start_date='{start_date}', end_date='{end_date}'")
+                    stock_data = get_china_stock_data_result(ticker, start_date, end_date)
+                    logger.info(f"🔍 [股票代码追踪] get_china_stock_data_result 返回状态: {stock_data.status}")
+                    result_data.append(f"## A股价格数据\n{stock_data.render()}")
                 except Exception as e:
-                    logger.error(f"🔍 [股票代码追踪] get_china_stock_data_unified 调用失败: {e}")
+                    logger.error(f"🔍 [股票代码追踪] get_china_stock_data_result 调用失败: {e}")
                     result_data.append(f"## A股价格数据\n获取失败: {e}")
 
                 try:
@@ -775,7 +776,7 @@ class Toolkit:
                     from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
                     analyzer = OptimizedChinaDataProvider()
                     logger.info(f"🔍 [股票代码追踪] 调用 OptimizedChinaDataProvider._generate_fundamentals_report，传入参数: ticker='{ticker}'")
-                    fundamentals_data = analyzer._generate_fundamentals_report(ticker, stock_data if 'stock_data' in locals() else "")
+                    fundamentals_data = analyzer._generate_fundamentals_report(ticker, stock_data)
                     logger.info(f"🔍 [股票代码追踪] _generate_fundamentals_report 返回结果前200字符: {fundamentals_data[:200] if fundamentals_data else 'None'}")
                     result_data.append(f"## A股基本面数据\n{fundamentals_data}")
                 except Exception as e:
@@ -1,11 +1,15 @@
 import chromadb
 from chromadb.config import Settings
-from openai import OpenAI
+from tradingagents.utils.http_clients import get_openai_client
 import dashscope
 from dashscope import TextEmbedding
 import os
+import json
+import hashlib
+import sqlite3
 import threading
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
@@ -13,23 +17,40 @@ logger = get_logger("agents.utils.memory")
 
 
 class ChromaDBManager:
-    """单例ChromaDB管理器，避免并发创建集合的冲突"""
+    """ChromaDB管理器，每个存储路径一个实例（None为进程内存储），避免并发创建集合的冲突"""
 
-    _instance = None
+    _instances: Dict[Optional[str], "ChromaDBManager"] = {}
     _lock = threading.Lock()
-    _collections: Dict[str, any] = {}
-    _client = None
 
-    def __new__(cls):
-        if cls._instance is None:
+    def __new__(cls, persist_path: Optional[str] = None):
+        key = os.path.abspath(persist_path) if persist_path else None
+        if key not in cls._instances:
             with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super(ChromaDBManager, cls).__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+                if key not in cls._instances:
+                    instance = super(ChromaDBManager, cls).__new__(cls)
+                    instance._initialized = False
+                    cls._instances[key] = instance
+        return cls._instances[key]
 
-    def __init__(self):
-        if not self._initialized:
+    def __init__(self, persist_path: Optional[str] = None):
+        if self._initialized:
+            return
+
+        self.persist_path = os.path.abspath(persist_path) if persist_path else None
+        self._collections: Dict[str, any] = {}
+        self._client = None
+
+        if self.persist_path:
+            try:
+                # 持久化存储：reflect_and_remember写入的记忆在进程重启后仍然可用
+                os.makedirs(self.persist_path, exist_ok=True)
+                settings = Settings(allow_reset=True, anonymized_telemetry=False)
+                self._client = chromadb.PersistentClient(path=self.persist_path, settings=settings)
+                logger.info(f"📚 [ChromaDB] 持久化存储初始化完成: {self.persist_path}")
+            except Exception as e:
+                logger.error(f"❌ [ChromaDB] 持久化存储初始化失败，使用进程内存储: {e}")
+
+        if self._client is None:
             try:
                 # 使用更兼容的ChromaDB配置
                 settings = Settings(
@@ -38,15 +59,15 @@ class ChromaDBManager:
                     is_persistent=False
                 )
                 self._client = chromadb.Client(settings)
-                self._initialized = True
                 logger.info(f"📚 [ChromaDB] 单例管理器初始化完成")
             except Exception as e:
                 logger.error(f"❌ [ChromaDB] 初始化失败: {e}")
                 # 使用最简单的配置作为备用
                 self._client = chromadb.Client()
-                self._initialized = True
                 logger.info(f"📚 [ChromaDB] 使用备用配置初始化完成")
 
+        self._initialized = True
+
     def get_or_create_collection(self, name: str):
         """线程安全地获取或创建集合"""
         with self._lock:
@@ -77,6 +98,97 @@ class ChromaDBManager:
             return collection
 
 
+class EmbeddingCache:
+    """按内容哈希缓存嵌入向量：进程内LRU + 可选的SQLite磁盘存储，所有记忆实例共享"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_path: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str, endpoint: str = "") -> str:
+        """缓存键包含嵌入服务端点：同名模型在不同服务商上生成的向量不能混用"""
+        return hashlib.sha256(f"{endpoint}\n{model}\n{text}".encode("utf-8")).hexdigest()
+
+    def enable_disk_store(self, path: str):
+        """启用磁盘存储，重复调用同一路径无副作用"""
+        with self._lock:
+            if self._db_path == path:
+                return
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                with sqlite3.connect(path) as conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding TEXT NOT NULL)"
+                    )
+                self._db_path = path
+                logger.info(f"📚 [EmbeddingCache] 启用磁盘缓存: {path}")
+            except Exception as e:
+                logger.error(f"⚠️ [EmbeddingCache] 磁盘缓存不可用: {e}")
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+            db_path = self._db_path
+
+        if db_path:
+            try:
+                with sqlite3.connect(db_path) as conn:
+                    row = conn.execute(
+                        "SELECT embedding FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                if row:
+                    embedding = json.loads(row[0])
+                    self._put_memory(key, embedding)
+                    with self._lock:
+                        self.hits += 1
+                    return embedding
+            except Exception as e:
+                logger.warning(f"⚠️ [EmbeddingCache] 读取磁盘缓存失败: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, embedding: List[float], persist: bool = True):
+        """写入缓存；persist=False时只写进程内LRU（例如从已持久化的集合预热）"""
+        self._put_memory(key, embedding)
+        db_path = self._db_path
+        if db_path and persist:
+            try:
+                with sqlite3.connect(db_path) as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                        (key, json.dumps(embedding)),
+                    )
+            except Exception as e:
+                logger.warning(f"⚠️ [EmbeddingCache] 写入磁盘缓存失败: {e}")
+
+    def _put_memory(self, key: str, embedding: List[float]):
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# 所有FinancialSituationMemory实例共享的嵌入缓存
+_embedding_cache = EmbeddingCache()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """获取进程级共享的嵌入缓存"""
+    return _embedding_cache
+
+
 class FinancialSituationMemory:
     def __init__(self, name, config):
         self.config = config
@@ -117,9 +229,9 @@ class FinancialSituationMemory:
                 self.embedding = "text-embedding-3-small"
                 openai_key = os.getenv('OPENAI_API_KEY')
                 if openai_key:
-                    self.client = OpenAI(
-                        api_key=openai_key,
-                        base_url=config.get("backend_url", "https://api.openai.com/v1")
+                    self.client = get_openai_client(
+                        config.get("backend_url", "https://api.openai.com/v1"),
+                        api_key=openai_key
                     )
                     logger.warning(f"⚠️ DeepSeek回退到OpenAI嵌入服务")
                 else:
@@ -127,9 +239,9 @@ class FinancialSituationMemory:
                     deepseek_key = os.getenv('DEEPSEEK_API_KEY')
                     if deepseek_key:
                         try:
-                            self.client = OpenAI(
-                                api_key=deepseek_key,
-                                base_url="https://api.deepseek.com"
+                            self.client = get_openai_client(
+                                "https://api.deepseek.com",
+                                api_key=deepseek_key
                             )
                             logger.info(f"💡 DeepSeek使用自己的嵌入服务")
                         except Exception as e:
@@ -151,79 +263,185 @@ class FinancialSituationMemory:
                 logger.info(f"💡 Google AI使用阿里百炼嵌入服务")
             else:
                 self.embedding = "text-embedding-3-small"
-                self.client = OpenAI(base_url=config["backend_url"])
+                self.client = get_openai_client(config["backend_url"])
                 logger.warning(f"⚠️ Google AI回退到OpenAI嵌入服务")
         elif config["backend_url"] == "http://localhost:11434/v1":
             self.embedding = "nomic-embed-text"
-            self.client = OpenAI(base_url=config["backend_url"])
+            self.client = get_openai_client(config["backend_url"])
         else:
             self.embedding = "text-embedding-3-small"
-            self.client = OpenAI(base_url=config["backend_url"])
-
-        # 使用单例ChromaDB管理器
-        self.chroma_manager = ChromaDBManager()
-        self.situation_collection = self.chroma_manager.get_or_create_collection(name)
-
-    def get_embedding(self, text):
-        """Get embedding for a text using the configured provider"""
-
-        if (self.llm_provider == "dashscope" or
-            self.llm_provider == "alibaba" or
-            (self.llm_provider == "google" and self.client is None) or
-            (self.llm_provider == "deepseek" and self.client is None)):
-            # 使用阿里百炼的嵌入模型
-            try:
-                response = TextEmbedding.call(
-                    model=self.embedding,
-                    input=text
-                )
-                if response.status_code == 200:
-                    return response.output['embeddings'][0]['embedding']
-                else:
-                    raise Exception(f"DashScope embedding error: {response.code} - {response.message}")
-            except Exception as e:
-                raise Exception(f"Error getting DashScope embedding: {str(e)}")
+            self.client = get_openai_client(config["backend_url"])
+
+        # 共享嵌入缓存，可选的磁盘存储路径来自配置
+        self.embedding_cache = get_embedding_cache()
+        if config.get("embedding_cache_path"):
+            self.embedding_cache.enable_disk_store(config["embedding_cache_path"])
+
+        # 按存储路径共享的ChromaDB管理器，memory_persist_path为None时使用进程内存储
+        self.chroma_manager = ChromaDBManager(config.get("memory_persist_path"))
+        self.situation_collection = self.chroma_manager.get_or_create_collection(self.collection_name(name))
+
+        # 持久化集合启动时预热：读取已存储的嵌入，不重新请求嵌入服务
+        if self.chroma_manager.persist_path and config.get("memory_warm_up", True):
+            self.warm_up()
+
+    def collection_name(self, name):
+        """
+        记忆集合名称：持久化集合按嵌入模型和嵌入服务区分
+
+        切换嵌入模型后向量维度可能不同，沿用旧集合会在查询和写入时报维度不匹配；
+        同名模型在不同服务上的向量也不通用，与EmbeddingCache的键一样带上服务标识
+        """
+        if self.chroma_manager.persist_path:
+            endpoint_hash = hashlib.sha256(self.embedding_endpoint().encode('utf-8')).hexdigest()[:8]
+            return f"{name}__{self.embedding}__{endpoint_hash}"
+        return name
+
+    def embedding_endpoint(self):
+        """当前嵌入服务的标识：阿里百炼或OpenAI兼容客户端的base_url"""
+        if self._uses_dashscope():
+            return "dashscope"
+        return str(getattr(self.client, "base_url", "") or "")
+
+    def _uses_dashscope(self):
+        return (self.llm_provider == "dashscope" or
+                self.llm_provider == "alibaba" or
+                (self.llm_provider == "google" and self.client is None) or
+                (self.llm_provider == "deepseek" and self.client is None))
+
+    def _embed_batch(self, texts):
+        """Request embeddings for a batch of texts from the configured provider"""
+
+        if self._uses_dashscope():
+            # 使用阿里百炼的嵌入模型，text-embedding-v3单次最多10条
+            embeddings = []
+            for start in range(0, len(texts), 10):
+                chunk = texts[start:start + 10]
+                try:
+                    response = TextEmbedding.call(
+                        model=self.embedding,
+                        input=chunk if len(chunk) > 1 else chunk[0]
+                    )
+                    if response.status_code == 200:
+                        items = sorted(response.output['embeddings'], key=lambda x: x.get('text_index', 0))
+                        embeddings.extend(item['embedding'] for item in items)
+                    else:
+                        raise Exception(f"DashScope embedding error: {response.code} - {response.message}")
+                except Exception as e:
+                    raise Exception(f"Error getting DashScope embedding: {str(e)}")
+            return embeddings
         else:
             # 使用OpenAI兼容的嵌入模型
             if self.client is None:
                 raise Exception("嵌入客户端未初始化，请检查配置")
-            elif self.client == "DISABLED":
-                # 内存功能已禁用，返回空向量
-                logger.warning(f"⚠️ 内存功能已禁用，返回空向量")
-                return [0.0] * 1024  # 返回1024维的零向量
 
-            response = self.client.embeddings.create(
-                model=self.embedding, input=text
-            )
-            return response.data[0].embedding
+            embeddings = []
+            for start in range(0, len(texts), 100):
+                chunk = texts[start:start + 100]
+                response = self.client.embeddings.create(
+                    model=self.embedding, input=chunk
+                )
+                items = sorted(response.data, key=lambda x: x.index)
+                embeddings.extend(item.embedding for item in items)
+            return embeddings
+
+    def get_embeddings(self, texts):
+        """Get embeddings for several texts, hitting the shared cache first and batching the misses"""
+
+        if self.client == "DISABLED":
+            # 内存功能已禁用，返回空向量
+            logger.warning(f"⚠️ 内存功能已禁用，返回空向量")
+            return [[0.0] * 1024 for _ in texts]  # 返回1024维的零向量
+
+        endpoint = self.embedding_endpoint()
+        keys = [EmbeddingCache.make_key(self.embedding, text, endpoint) for text in texts]
+        results = [self.embedding_cache.get(key) for key in keys]
+
+        # 同一批次中重复的文本只请求一次
+        missing = {}
+        for key, text, embedding in zip(keys, texts, results):
+            if embedding is None and key not in missing:
+                missing[key] = text
+
+        if missing:
+            fetched = self._embed_batch(list(missing.values()))
+            fetched_by_key = dict(zip(missing.keys(), fetched))
+            for key, embedding in fetched_by_key.items():
+                self.embedding_cache.put(key, embedding)
+            results = [fetched_by_key.get(key, embedding) for key, embedding in zip(keys, results)]
+
+        return results
+
+    def get_embedding(self, text):
+        """Get embedding for a text using the configured provider"""
+        return self.get_embeddings([text])[0]
+
+    @staticmethod
+    def situation_id(situation, recommendation):
+        """按内容生成记忆ID：不依赖count()，并发写入不会冲突，重复写入同一条记忆是幂等的"""
+        return hashlib.sha256(f"{situation}\n{recommendation}".encode("utf-8")).hexdigest()
 
     def add_situations(self, situations_and_advice):
         """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
 
-        situations = []
-        advice = []
-        ids = []
-        embeddings = []
+        entries = OrderedDict()
+        for situation, recommendation in situations_and_advice:
+            entries.setdefault(self.situation_id(situation, recommendation), (situation, recommendation))
+        if not entries:
+            return
+
+        # 已存储的记忆不再重新嵌入
+        existing = set(self.situation_collection.get(ids=list(entries), include=[])["ids"])
+        ids = [situation_id for situation_id in entries if situation_id not in existing]
+        if not ids:
+            logger.debug(f"📚 [记忆] {len(entries)}条记忆均已存在，跳过写入")
+            return
 
-        offset = self.situation_collection.count()
+        situations = [entries[situation_id][0] for situation_id in ids]
+        advice = [entries[situation_id][1] for situation_id in ids]
 
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
-            situations.append(situation)
-            advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
+        # 一次批量请求所有情景的嵌入
+        embeddings = self.get_embeddings(situations)
 
-        self.situation_collection.add(
+        self.situation_collection.upsert(
             documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
+            metadatas=[{"recommendation": rec, "embedding_model": self.embedding} for rec in advice],
             embeddings=embeddings,
             ids=ids,
         )
 
-    def get_memories(self, current_situation, n_matches=1):
-        """Find matching recommendations using embeddings"""
-        query_embedding = self.get_embedding(current_situation)
-
+    def warm_up(self, batch_size=256):
+        """
+        用集合中已存储的嵌入预热共享嵌入缓存，并加载集合索引
+
+        持久化集合按嵌入模型区分，其中的嵌入都由当前模型生成；
+        数量不超过嵌入缓存容量（取最新写入的部分）
+
+        Returns:
+            预热的记录数
+        """
+        try:
+            total = self.situation_collection.count()
+            limit = min(total, self.embedding_cache.max_entries)
+            loaded = 0
+            endpoint = self.embedding_endpoint()
+            for offset in range(total - limit, total, batch_size):
+                batch = self.situation_collection.get(
+                    offset=offset,
+                    limit=min(batch_size, total - offset),
+                    include=["documents", "embeddings"],
+                )
+                for document, embedding in zip(batch["documents"], batch["embeddings"]):
+                    key = EmbeddingCache.make_key(self.embedding, document, endpoint)
+                    self.embedding_cache.put(key, [float(x) for x in embedding], persist=False)
+                    loaded += 1
+            logger.info(f"📚 [记忆] 集合预热完成: {total}条记忆，预热{loaded}条嵌入")
+            return loaded
+        except Exception as e:
+            logger.warning(f"⚠️ [记忆] 集合预热失败: {e}")
+            return 0
+
+    def _query(self, query_embedding, n_matches):
         results = self.situation_collection.query(
             query_embeddings=[query_embedding],
             n_results=n_matches,
@@ -242,6 +460,10 @@ class FinancialSituationMemory:
 
         return matched_results
 
+    def get_memories(self, current_situation, n_matches=1):
+        """Find matching recommendations using embeddings"""
+        query_embedding = self.get_embedding(current_situation)
+        return self._query(query_embedding, n_matches)
 
 if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+分析师工具调用执行器
+同一条AIMessage中的多个工具调用相互独立（行情、指标、新闻等），
+在有界线程池中并发执行，ToolMessage按原调用顺序返回。
+超时从工具开始执行时计算；Python线程无法被强制终止，超时后仍在运行的工具会继续占用工作线程，
+计入abandoned统计，线程池被占满时排队的调用同样有截止时间
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import ToolMessage
+
+from tradingagents.utils.tool_logging import log_tool_timing
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 所有分析师共用的线程池大小和单个工具的超时时间（秒）
+TOOL_CALL_MAX_WORKERS = int(os.getenv("TOOL_CALL_MAX_WORKERS", 8))
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", 120))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# 线程池的调用与饱和统计；abandoned为已超时但仍占用工作线程的调用数
+_stats: Dict[str, int] = {
+    'calls': 0, 'timeouts': 0, 'queue_timeouts': 0,
+    'queued': 0, 'max_queued': 0, 'running': 0, 'abandoned': 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=TOOL_CALL_MAX_WORKERS, thread_name_prefix="tool_call"
+                )
+    return _executor
+
+
+def _tool_name(tool: Any) -> Optional[str]:
+    if hasattr(tool, 'name'):
+        return tool.name
+    return getattr(tool, '__name__', None)
+
+
+def get_tool_call_statistics() -> Dict[str, int]:
+    """工具线程池的调用、超时、排队统计"""
+    with _stats_lock:
+        return dict(_stats, max_workers=TOOL_CALL_MAX_WORKERS)
+
+
+def _invoke_tool(tool: Any, tool_name: str, tool_args: Dict) -> str:
+    start_time = time.time()
+    try:
+        result = tool.invoke(tool_args)
+        log_tool_timing(tool_name, time.time() - start_time, 'success')
+        return str(result)
+    except Exception as e:
+        log_tool_timing(tool_name, time.time() - start_time, 'error', error=str(e))
+        return f"工具执行失败: {str(e)}"
+
+
+class _ToolCall:
+    """提交到线程池的一次工具调用，记录开始执行的时间"""
+
+    def __init__(self, tool: Any, tool_name: str, tool_args: Dict):
+        self.tool = tool
+        self.tool_name = tool_name
+        self.tool_args = tool_args
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.started = threading.Event()
+        self.finished = False
+        self.abandoned = False
+
+    def run(self) -> str:
+        with _stats_lock:
+            _stats['queued'] -= 1
+            _stats['running'] += 1
+        self.started_at = time.monotonic()
+        self.started.set()
+        try:
+            return _invoke_tool(self.tool, self.tool_name, self.tool_args)
+        finally:
+            with _stats_lock:
+                self.finished = True
+                _stats['running'] -= 1
+                if self.abandoned:
+                    _stats['abandoned'] -= 1
+
+
+def _submit(call: _ToolCall) -> Future:
+    with _stats_lock:
+        _stats['calls'] += 1
+        _stats['queued'] += 1
+        _stats['max_queued'] = max(_stats['max_queued'], _stats['queued'])
+    # 复制调用方上下文，使工具能看到本次分析运行的新闻备忘录等上下文变量
+    context = contextvars.copy_context()
+    return _get_executor().submit(context.run, call.run)
+
+
+def _wait_for_call(call: _ToolCall, future: Future, timeout: float) -> str:
+    """等待一次工具调用：排队和执行各自最多等待timeout秒"""
+    if not call.started.wait(max(0.0, call.submitted_at + timeout - time.monotonic())):
+        if future.cancel():
+            with _stats_lock:
+                _stats['queued'] -= 1
+                _stats['queue_timeouts'] += 1
+                abandoned = _stats['abandoned']
+            log_tool_timing(call.tool_name, time.monotonic() - call.submitted_at, 'timeout', error="排队超时")
+            logger.warning(f"⏱️ [工具调用] 线程池已满（{abandoned}个超时工具仍占用线程），"
+                           f"{call.tool_name} 排队超过{timeout:g}秒未开始执行")
+            return f"工具执行超时: {call.tool_name} 排队超过{timeout:g}秒未开始执行"
+        # 取消失败说明刚开始执行
+        call.started.wait()
+
+    try:
+        return future.result(timeout=max(0.0, call.started_at + timeout - time.monotonic()))
+    except FutureTimeoutError:
+        with _stats_lock:
+            _stats['timeouts'] += 1
+            if not call.finished:
+                call.abandoned = True
+                _stats['abandoned'] += 1
+            abandoned = _stats['abandoned']
+        log_tool_timing(call.tool_name, time.monotonic() - call.started_at, 'timeout', error=f"超过{timeout:g}秒")
+        logger.warning(f"⏱️ [工具调用] {call.tool_name} 执行超过{timeout:g}秒未返回，"
+                       f"当前{abandoned}/{TOOL_CALL_MAX_WORKERS}个工作线程被超时工具占用")
+        return f"工具执行超时: {call.tool_name} 超过{timeout:g}秒未返回"
+
+
+def execute_tool_calls(tool_calls: Sequence[Dict], tools: Sequence[Any],
+                       timeout: float = None) -> List[ToolMessage]:
+    """
+    并发执行一轮工具调用
+
+    Args:
+        tool_calls: AIMessage.tool_calls
+        tools: 分析师绑定的工具列表
+        timeout: 单个工具的超时时间（秒），从工具开始执行时计算；None时使用 TOOL_CALL_TIMEOUT。
+            线程池已满时，排队等待同样最多timeout秒
+
+    Returns:
+        与 tool_calls 顺序一致的 ToolMessage 列表；失败、超时或找不到的工具以错误文本作为内容
+    """
+    timeout = TOOL_CALL_TIMEOUT if timeout is None else timeout
+    tools_by_name = {}
+    for tool in tools:
+        tools_by_name.setdefault(_tool_name(tool), tool)
+
+    started = time.time()
+    submitted = []
+    for tool_call in tool_calls:
+        tool_name = tool_call.get('name')
+        tool = tools_by_name.get(tool_name)
+        logger.debug(f"📊 [DEBUG] 执行工具: {tool_name}, 参数: {tool_call.get('args', {})}")
+        if tool is None:
+            submitted.append(None)
+        else:
+            call = _ToolCall(tool, tool_name, tool_call.get('args', {}))
+            submitted.append((call, _submit(call)))
+
+    tool_messages = []
+    for tool_call, entry in zip(tool_calls, submitted):
+        tool_name = tool_call.get('name')
+        if entry is None:
+            log_tool_timing(tool_name, 0.0, 'not_found', error="未找到工具")
+            content = f"未找到工具: {tool_name}"
+        else:
+            content = _wait_for_call(*entry, timeout)
+
+        tool_messages.append(ToolMessage(content=content, tool_call_id=tool_call.get('id')))
+
+    logger.info(f"🔧 [工具调用] 本轮 {len(tool_calls)} 个工具调用完成，耗时 {time.time() - started:.2f}s")
+    return tool_messages
@@ -19,6 +19,8 @@ from tradingagents.utils.logging_init import get_logger
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .usage_ledger import UsageLedger, window_start
+
 # try:  # MongoDB已禁用
 #     from .mongodb_storage import MongoDBStorage
 #     MONGODB_AVAILABLE = True
@@ -73,9 +75,16 @@ class ConfigManager:
 
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
-        self.usage_file = self.config_dir / "usage.json"
+        self.usage_file = self.config_dir / "usage.jsonl"
+        self.legacy_usage_file = self.config_dir / "usage.json"
         self.settings_file = self.config_dir / "settings.json"
 
+        # 按文件mtime缓存的定价与设置，避免每次记录token都重新读盘
+        self._pricing_cache = None
+        self._pricing_mtime = None
+        self._settings_cache = None
+        self._settings_mtime = None
+
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
 
@@ -85,6 +94,15 @@ class ConfigManager:
 
         self._init_default_configs()
 
+        settings = self.load_settings()
+        self.usage_ledger = UsageLedger(
+            self.usage_file,
+            legacy_file=self.legacy_usage_file,
+            flush_interval=settings.get("usage_flush_interval", 2.0),
+            fsync=settings.get("usage_fsync", False),
+            max_records=settings.get("max_usage_records", 10000),
+        )
+
     def _load_env_file(self):
         """加载.env文件（保持向后兼容）"""
         # 尝试从项目根目录加载.env文件
@@ -234,6 +252,8 @@ class ConfigManager:
                 "currency_preference": "CNY",
                 "auto_save_usage": True,
                 "max_usage_records": 10000,
+                "usage_flush_interval": 2.0,  # 使用记录后台落盘间隔（秒）
+                "usage_fsync": False,  # 每批使用记录写入后是否fsync
                 "data_dir": default_data_dir,  # 数据目录配置
                 "cache_dir": os.path.join(default_data_dir, "cache"),  # 缓存目录
                 "results_dir": os.path.join(os.path.expanduser("~"), "Documents", "TradingAgents", "results"),  # 结果目录
@@ -272,11 +292,15 @@ class ConfigManager:
             logger.error(f"保存模型配置失败: {e}")
     
     def load_pricing(self) -> List[PricingConfig]:
-        """加载定价配置"""
+        """加载定价配置（文件未修改时直接返回缓存）"""
         try:
-            with open(self.pricing_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return [PricingConfig(**item) for item in data]
+            mtime = self.pricing_file.stat().st_mtime
+            if self._pricing_cache is None or mtime != self._pricing_mtime:
+                with open(self.pricing_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._pricing_cache = [PricingConfig(**item) for item in data]
+                self._pricing_mtime = mtime
+            return list(self._pricing_cache)
         except Exception as e:
             logger.error(f"加载定价配置失败: {e}")
             return []
@@ -290,26 +314,22 @@ class ConfigManager:
         except Exception as e:
             logger.error(f"保存定价配置失败: {e}")
     
-    def load_usage_records(self) -> List[UsageRecord]:
-        """加载使用记录"""
-        try:
-            if not self.usage_file.exists():
-                return []
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [UsageRecord(**item) for item in data]
-        except Exception as e:
-            logger.error(f"加载使用记录失败: {e}")
-            return []
+    def load_usage_records(self, days: Optional[int] = None) -> List[UsageRecord]:
+        """加载使用记录，指定days时只加载最近N天的记录"""
+        # 与统计方法使用同一个整点对齐的窗口起点
+        since = window_start(days) if days is not None else None
+
+        records = []
+        for item in self.usage_ledger.load_records(since):
+            try:
+                records.append(UsageRecord(**item))
+            except TypeError:
+                continue
+        return records
     
     def save_usage_records(self, records: List[UsageRecord]):
-        """保存使用记录"""
-        try:
-            data = [asdict(record) for record in records]
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"保存使用记录失败: {e}")
+        """整体替换使用记录（如清空记录）"""
+        self.usage_ledger.replace_all([asdict(record) for record in records])
     
     def add_usage_record(self, provider: str, model_name: str, input_tokens: int,
                         output_tokens: int, session_id: str, analysis_type: str = "stock_analysis"):
@@ -335,19 +355,10 @@ class ConfigManager:
         #         return record
         #     else:
         #         logger.error(f"⚠️ MongoDB保存失败，回退到JSON文件存储")
-        logger.info("ℹ️ MongoDB已禁用，直接使用JSON文件存储")
-        
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
-        
-        # 限制记录数量
-        settings = self.load_settings()
-        max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
+        logger.debug("ℹ️ MongoDB已禁用，使用本地JSONL账本存储")
         
-        self.save_usage_records(records)
+        # 追加到账本，由后台线程批量落盘，超出max_usage_records时自动压缩
+        self.usage_ledger.append(asdict(record))
         return record
     
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
@@ -372,8 +383,12 @@ class ConfigManager:
     def load_settings(self) -> Dict[str, Any]:
         """加载设置，合并.env中的配置"""
         try:
-            with open(self.settings_file, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
+            mtime = self.settings_file.stat().st_mtime
+            if self._settings_cache is None or mtime != self._settings_mtime:
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    self._settings_cache = json.load(f)
+                self._settings_mtime = mtime
+            settings = dict(self._settings_cache)
         except Exception as e:
             logger.error(f"加载设置失败: {e}")
             settings = {}
@@ -452,54 +467,14 @@ class ConfigManager:
         #             return stats
         #     except Exception as e:
         #         logger.error(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
-        logger.info("ℹ️ MongoDB已禁用，直接使用JSON文件统计")
+        logger.debug("ℹ️ MongoDB已禁用，使用本地账本的增量聚合统计")
         
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
-        
-        return {
-            "period_days": days,
-            "total_cost": round(total_cost, 4),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
-            "provider_stats": provider_stats,
-            "records_count": len(recent_records)
-        }
+        # 账本在写入时按小时增量聚合，这里只需合并最近N天的小时桶
+        return self.usage_ledger.get_statistics(days)
+    
+    def get_daily_usage(self, days: int = 30) -> List[Dict[str, Any]]:
+        """获取最近N天按日期汇总的成本与Token使用量"""
+        return self.usage_ledger.get_daily_statistics(days)
     
     def get_data_dir(self) -> str:
         """获取数据目录路径"""
@@ -595,9 +570,7 @@ class TokenTracker:
 
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
-        records = self.config_manager.load_usage_records()
-        session_cost = sum(record.cost for record in records if record.session_id == session_id)
-        return session_cost
+        return self.config_manager.usage_ledger.get_session_cost(session_id)
 
     def estimate_cost(self, provider: str, model_name: str, estimated_input_tokens: int,
                      estimated_output_tokens: int) -> float:
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Token使用记录账本
+以追加写入的JSONL文件保存使用记录，后台线程批量落盘，
+并在内存中维护按小时/会话的增量聚合，统计时无需重新扫描全部记录。
+CLI、Web等多个进程可共用同一账本：写入和压缩持有跨进程文件锁，
+统计前按上次读到的字节位置并入其他进程追加的记录
+"""
+
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {"cost": 0.0, "input_tokens": 0, "output_tokens": 0, "requests": 0}
+
+
+def window_start(days: int) -> str:
+    """
+    最近N天统计窗口的起点（对齐到整点的ISO时间戳）
+
+    聚合按小时分桶，load_records 和各统计方法都使用这个起点，保证两者覆盖同一批记录
+    """
+    start = (datetime.now() - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+    return start.isoformat()
+
+
+class UsageLedger:
+    """追加写入的使用记录账本"""
+
+    def __init__(self, ledger_file: Path, legacy_file: Optional[Path] = None,
+                 flush_interval: float = 2.0, batch_size: int = 100,
+                 fsync: bool = False, max_records: int = 10000):
+        """
+        初始化账本
+
+        Args:
+            ledger_file: JSONL账本文件路径
+            legacy_file: 旧版usage.json路径，存在时首次启动自动迁移
+            flush_interval: 后台落盘间隔（秒）
+            batch_size: 缓冲区达到该条数时立即唤醒落盘
+            fsync: 每批写入后是否调用os.fsync
+            max_records: 保留的最大记录数，超出一定比例后压缩账本
+        """
+        self.ledger_file = Path(ledger_file)
+        self.lock_file = self.ledger_file.with_name(self.ledger_file.name + '.lock')
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.max_records = max_records
+
+        self._lock = threading.Lock()        # 保护缓冲区与聚合
+        self._file_lock = threading.Lock()   # 保护账本文件读写位置，跨进程时另加文件锁
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        # 增量聚合：小时 -> 供应商 -> 统计；会话 -> 成本
+        self._hourly: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._session_cost: Dict[str, float] = {}
+        self._line_count = 0
+        # 已并入聚合的账本文件标识 (st_dev, st_ino) 与字节位置
+        self._file_key: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+        if legacy_file is not None:
+            self._migrate_legacy(Path(legacy_file))
+        self._refresh()
+
+        atexit.register(self.close)
+
+    # ---------- 写入 ----------
+
+    def append(self, record: Dict[str, Any]):
+        """追加一条记录（只写入内存缓冲区，由后台线程落盘）"""
+        with self._lock:
+            self._buffer.append(record)
+            self._aggregate(record)
+            should_wake = len(self._buffer) >= self.batch_size
+        self._ensure_flusher()
+        if should_wake:
+            self._flush_event.set()
+
+    def flush(self):
+        """将缓冲区中的记录写入账本"""
+        with self._file_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+            try:
+                with self._interprocess_lock():
+                    # 先并入其他进程已追加的记录，写入后读取位置正好是文件末尾
+                    self._catch_up_locked()
+                    with self._lock:
+                        pending, self._buffer = self._buffer, []
+                    try:
+                        self._append_lines(pending)
+                    except Exception:
+                        with self._lock:
+                            self._buffer = pending + self._buffer
+                        raise
+
+                    # 超出保留上限20%时压缩一次，摊还重写成本
+                    if self.max_records and self._line_count > self.max_records * 1.2:
+                        self._compact_locked()
+            except Exception as e:
+                logger.error(f"写入使用记录失败: {e}")
+
+    def replace_all(self, records: List[Dict[str, Any]]):
+        """用给定记录整体替换账本（用于清空或导入）"""
+        with self._file_lock:
+            with self._interprocess_lock():
+                with self._lock:
+                    self._buffer = []
+                self._write_all(records)
+                self._catch_up_locked()
+
+    def close(self):
+        """停止后台线程并落盘剩余记录"""
+        self._closed = True
+        self._flush_event.set()
+        self.flush()
+
+    # ---------- 读取 ----------
+
+    def load_records(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        读取记录（含尚未落盘的缓冲区）
+
+        Args:
+            since: ISO格式时间戳，只返回不早于该时间的记录；按天统计时使用 window_start(days)
+        """
+        self.flush()
+        return self._read_file(since)
+
+    def get_statistics(self, days: int = 30) -> Dict[str, Any]:
+        """根据小时聚合计算最近N天的统计"""
+        self._refresh()
+        cutoff_hour = window_start(days)[:13]
+
+        provider_stats: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for hour, providers in self._hourly.items():
+                if hour < cutoff_hour:
+                    continue
+                for provider, bucket in providers.items():
+                    stats = provider_stats.setdefault(provider, _empty_bucket())
+                    for key, value in bucket.items():
+                        stats[key] += value
+
+        total_requests = sum(s["requests"] for s in provider_stats.values())
+        return {
+            "period_days": days,
+            "total_cost": round(sum(s["cost"] for s in provider_stats.values()), 4),
+            "total_input_tokens": sum(s["input_tokens"] for s in provider_stats.values()),
+            "total_output_tokens": sum(s["output_tokens"] for s in provider_stats.values()),
+            "total_requests": total_requests,
+            "provider_stats": provider_stats,
+            "records_count": total_requests
+        }
+
+    def get_daily_statistics(self, days: int = 30) -> List[Dict[str, Any]]:
+        """按日期汇总最近N天的成本与Token数，按日期升序"""
+        self._refresh()
+        cutoff_hour = window_start(days)[:13]
+
+        daily: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for hour, providers in self._hourly.items():
+                if hour < cutoff_hour:
+                    continue
+                day = daily.setdefault(hour[:10], {"date": hour[:10], "cost": 0.0, "tokens": 0, "requests": 0})
+                for bucket in providers.values():
+                    day["cost"] += bucket["cost"]
+                    day["tokens"] += bucket["input_tokens"] + bucket["output_tokens"]
+                    day["requests"] += bucket["requests"]
+        return [daily[d] for d in sorted(daily)]
+
+    def get_session_cost(self, session_id: str) -> float:
+        """获取会话累计成本"""
+        self._refresh()
+        with self._lock:
+            return self._session_cost.get(session_id, 0.0)
+
+    # ---------- 内部实现 ----------
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="usage-ledger-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+
+    def _aggregate(self, record: Dict[str, Any]):
+        """把一条记录计入聚合（需持有_lock）"""
+        hour = str(record.get("timestamp", ""))[:13]
+        if not hour:
+            return
+        bucket = self._hourly.setdefault(hour, {}).setdefault(
+            record.get("provider", "unknown"), _empty_bucket()
+        )
+        cost = record.get("cost", 0.0) or 0.0
+        bucket["cost"] += cost
+        bucket["input_tokens"] += record.get("input_tokens", 0) or 0
+        bucket["output_tokens"] += record.get("output_tokens", 0) or 0
+        bucket["requests"] += 1
+
+        session_id = record.get("session_id")
+        if session_id:
+            self._session_cost[session_id] = self._session_cost.get(session_id, 0.0) + cost
+
+    def _rebuild_aggregates(self, records: List[Dict[str, Any]]):
+        """按账本文件中的记录重建聚合，尚未落盘的缓冲区记录一并计入"""
+        with self._lock:
+            self._hourly = {}
+            self._session_cost = {}
+            for record in records:
+                self._aggregate(record)
+            for record in self._buffer:
+                self._aggregate(record)
+            self._line_count = len(records)
+
+    @contextmanager
+    def _interprocess_lock(self):
+        """
+        账本的跨进程排他锁
+
+        锁加在旁路的 .lock 文件上，压缩时替换账本文件不会让其他进程持有的锁失效
+        """
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK重试约10秒后仍未拿到锁，继续等待
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _refresh(self):
+        """并入其他进程追加到账本的记录"""
+        with self._file_lock:
+            self._catch_up_locked()
+
+    def _catch_up_locked(self):
+        """
+        把账本文件中上次读取位置之后的完整行计入聚合（需持有_file_lock）
+
+        文件被其他进程压缩替换或截断时从头重建聚合；
+        其他进程正在写入的半行留到下次读取
+        """
+        try:
+            f = open(self.ledger_file, 'rb')
+        except FileNotFoundError:
+            if self._file_key is not None:
+                self._rebuild_aggregates([])
+                self._file_key, self._offset = None, 0
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            file_key = (stat.st_dev, stat.st_ino)
+            if file_key == self._file_key and stat.st_size == self._offset:
+                return
+            replaced = file_key != self._file_key or stat.st_size < self._offset
+            start = 0 if replaced else self._offset
+            f.seek(start)
+            records, consumed = self._parse_lines(f.read())
+
+        if replaced:
+            self._rebuild_aggregates(records)
+        else:
+            with self._lock:
+                for record in records:
+                    self._aggregate(record)
+                self._line_count += len(records)
+        self._file_key, self._offset = file_key, start + consumed
+
+    @staticmethod
+    def _parse_lines(data: bytes) -> Tuple[List[Dict[str, Any]], int]:
+        """解析完整的行，返回 (记录, 已消费的字节数)"""
+        end = data.rfind(b'\n') + 1
+        records = []
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line.decode('utf-8')))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                # 进程异常退出可能留下半行，跳过即可
+                continue
+        return records, end
+
+    def _append_lines(self, records: List[Dict[str, Any]]):
+        """追加记录并把读取位置推进到文件末尾（需持有_file_lock和跨进程锁，且已追上文件末尾）"""
+        self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+        data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8')
+        with open(self.ledger_file, 'ab') as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            stat = os.fstat(f.fileno())
+        self._file_key, self._offset = (stat.st_dev, stat.st_ino), stat.st_size
+        self._line_count += len(records)
+
+    def _read_file(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.ledger_file.exists():
+            return []
+        try:
+            with open(self.ledger_file, 'rb') as f:
+                records, _ = self._parse_lines(f.read())
+        except Exception as e:
+            logger.error(f"加载使用记录失败: {e}")
+            return []
+        if since is not None:
+            records = [r for r in records if str(r.get("timestamp", "")) >= since]
+        return records
+
+    def _write_all(self, records: List[Dict[str, Any]]):
+        """原子地重写账本（需持有_file_lock和跨进程锁）"""
+        tmp_file = self.ledger_file.with_suffix(self.ledger_file.suffix + '.tmp')
+        try:
+            self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, self.ledger_file)
+        except Exception as e:
+            logger.error(f"保存使用记录失败: {e}")
+
+    def _compact_locked(self):
+        """只保留最近max_records条（需持有_file_lock和跨进程锁）"""
+        records = self._read_file()[-self.max_records:]
+        self._write_all(records)
+        # 新文件标识不同，追读时从头重建聚合
+        self._catch_up_locked()
+        logger.info(f"📒 使用记录账本已压缩，保留最近 {len(records)} 条")
+
+    def _migrate_legacy(self, legacy_file: Path):
+        """把旧版usage.json一次性迁移到JSONL账本"""
+        if self.ledger_file.exists() or not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            with self._file_lock, self._interprocess_lock():
+                # 另一个进程可能已完成迁移
+                if self.ledger_file.exists() or not legacy_file.exists():
+                    return
+                self._write_all(records)
+                legacy_file.rename(legacy_file.with_suffix(legacy_file.suffix + '.migrated'))
+            logger.info(f"📒 已将 {len(records)} 条使用记录从 {legacy_file.name} 迁移到 {self.ledger_file.name}")
+        except Exception as e:
+            logger.error(f"迁移旧版使用记录失败: {e}")
@@ -11,10 +11,11 @@ import hashlib
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 import pandas as pd
 
 from ..config.database_manager import get_database_manager
+from .frame_serializer import get_frame_serializer, serialize_frame, deserialize_frame
 
 class AdaptiveCacheSystem:
     """自适应缓存系统"""
@@ -36,6 +37,9 @@ class AdaptiveCacheSystem:
         # 初始化缓存后端
         self.primary_backend = self.cache_config["primary_backend"]
         self.fallback_enabled = self.cache_config["fallback_enabled"]
+
+        # DataFrame负载以列式二进制格式保存，其余数据保持原样
+        self.frame_serializer = get_frame_serializer()
         
         self.logger.info(f"自适应缓存系统初始化 - 主要后端: {self.primary_backend}")
     
@@ -66,12 +70,28 @@ class AdaptiveCacheSystem:
         expiry_time = cache_time + timedelta(seconds=ttl_seconds)
         return datetime.now() < expiry_time
     
+    def _encode_data(self, data: Any) -> Tuple[Any, Optional[str]]:
+        """DataFrame序列化为列式二进制，返回(数据, 格式)；非DataFrame原样返回"""
+        if isinstance(data, pd.DataFrame):
+            data_format, payload = serialize_frame(data, self.frame_serializer)
+            return payload, data_format
+        return data, None
+
+    def _decode_data(self, cache_data: Dict) -> Dict:
+        """还原DataFrame负载；旧版缓存没有data_format字段，直接返回"""
+        data_format = cache_data.get('data_format')
+        if data_format:
+            cache_data['data'] = deserialize_frame(data_format, cache_data['data'])
+        return cache_data
+
     def _save_to_file(self, cache_key: str, data: Any, metadata: Dict) -> bool:
         """保存到文件缓存"""
         try:
             cache_file = self.cache_dir / f"{cache_key}.pkl"
+            payload, data_format = self._encode_data(data)
             cache_data = {
-                'data': data,
+                'data': payload,
+                'data_format': data_format,
                 'metadata': metadata,
                 'timestamp': datetime.now(),
                 'backend': 'file'
@@ -98,7 +118,7 @@ class AdaptiveCacheSystem:
                 cache_data = pickle.load(f)
             
             self.logger.debug(f"文件缓存加载成功: {cache_key}")
-            return cache_data
+            return self._decode_data(cache_data)
             
         except Exception as e:
             self.logger.error(f"文件缓存加载失败: {e}")
@@ -111,8 +131,10 @@ class AdaptiveCacheSystem:
             return False
         
         try:
+            payload, data_format = self._encode_data(data)
             cache_data = {
-                'data': data,
+                'data': payload,
+                'data_format': data_format,
                 'metadata': metadata,
                 'timestamp': datetime.now().isoformat(),
                 'backend': 'redis'
@@ -146,7 +168,7 @@ class AdaptiveCacheSystem:
                 cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
             
             self.logger.debug(f"Redis缓存加载成功: {cache_key}")
-            return cache_data
+            return self._decode_data(cache_data)
             
         except Exception as e:
             self.logger.error(f"Redis缓存加载失败: {e}")
@@ -164,8 +186,7 @@ class AdaptiveCacheSystem:
             
             # 序列化数据
             if isinstance(data, pd.DataFrame):
-                serialized_data = data.to_json()
-                data_type = 'dataframe'
+                serialized_data, data_type = self._encode_data(data)
             else:
                 serialized_data = pickle.dumps(data).hex()
                 data_type = 'pickle'
@@ -210,9 +231,12 @@ class AdaptiveCacheSystem:
             
             # 反序列化数据
             if doc['data_type'] == 'dataframe':
+                # 旧版to_json格式
                 data = pd.read_json(doc['data'])
-            else:
+            elif doc['data_type'] == 'pickle':
                 data = pickle.loads(bytes.fromhex(doc['data']))
+            else:
+                data = deserialize_frame(doc['data_type'], bytes(doc['data']))
             
             cache_data = {
                 'data': data,
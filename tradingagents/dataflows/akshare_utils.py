@@ -11,6 +11,10 @@ import warnings
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
+
+from .rate_limiter import wait_for_api
+from .provider_executor import run_blocking, ProviderCallTimeout
+
 warnings.filterwarnings('ignore')
 
 class AKShareProvider:
@@ -78,13 +82,14 @@ class AKShareProvider:
                 symbol = symbol.replace('.SZ', '').replace('.SS', '')
             
             # 获取数据
-            data = self.ak.stock_zh_a_hist(
+            wait_for_api("akshare", "stock_zh_a_hist")
+            data = run_blocking("akshare", lambda: self.ak.stock_zh_a_hist(
                 symbol=symbol,
                 period="daily",
                 start_date=start_date.replace('-', '') if start_date else "20240101",
                 end_date=end_date.replace('-', '') if end_date else "20241231",
                 adjust=""
-            )
+            ))
             
             return data
             
@@ -99,7 +104,8 @@ class AKShareProvider:
         
         try:
             # 获取股票基本信息
-            stock_list = self.ak.stock_info_a_code_name()
+            wait_for_api("akshare", "stock_info_a_code_name")
+            stock_list = run_blocking("akshare", self.ak.stock_info_a_code_name)
             stock_info = stock_list[stock_list['code'] == symbol]
             
             if not stock_info.empty:
@@ -142,41 +148,18 @@ class AKShareProvider:
             end_date_formatted = end_date.replace('-', '') if end_date else "20241231"
 
             # 使用AKShare获取港股历史数据（带超时保护）
-            import threading
-
-            result = [None]
-            exception = [None]
-
-            def fetch_hist_data():
-                try:
-                    result[0] = self.ak.stock_hk_hist(
-                        symbol=hk_symbol,
-                        period="daily",
-                        start_date=start_date_formatted,
-                        end_date=end_date_formatted,
-                        adjust=""
-                    )
-                except Exception as e:
-                    exception[0] = e
-
-            # 启动线程
-            thread = threading.Thread(target=fetch_hist_data)
-            thread.daemon = True
-            thread.start()
-
-            # 等待60秒
-            thread.join(timeout=60)
-
-            if thread.is_alive():
-                # 超时了
+            wait_for_api("akshare", "stock_hk_hist")
+            try:
+                data = run_blocking("akshare", lambda: self.ak.stock_hk_hist(
+                    symbol=hk_symbol,
+                    period="daily",
+                    start_date=start_date_formatted,
+                    end_date=end_date_formatted,
+                    adjust=""
+                ), timeout=60)
+            except ProviderCallTimeout:
                 logger.warning(f"⚠️ AKShare港股历史数据获取超时（60秒）: {symbol}")
-                raise Exception(f"AKShare港股历史数据获取超时（60秒）: {symbol}")
-            elif exception[0]:
-                # 有异常
-                raise exception[0]
-            else:
-                # 成功
-                data = result[0]
+                raise
 
             if not data.empty:
                 # 数据预处理
@@ -232,39 +215,13 @@ class AKShareProvider:
 
             logger.info(f"🇭🇰 AKShare获取港股信息: {hk_symbol}")
 
-            # 尝试获取港股实时行情数据来获取基本信息
-            # 使用线程超时包装（兼容Windows）
-            import threading
-            import time
-
-
-            result = [None]
-            exception = [None]
-
-            def fetch_data():
-                try:
-                    result[0] = self.ak.stock_hk_spot_em()
-                except Exception as e:
-                    exception[0] = e
-
-            # 启动线程
-            thread = threading.Thread(target=fetch_data)
-            thread.daemon = True
-            thread.start()
-
-            # 等待60秒
-            thread.join(timeout=60)
-
-            if thread.is_alive():
-                # 超时了
+            # 尝试获取港股实时行情数据来获取基本信息（带超时保护）
+            wait_for_api("akshare", "stock_hk_spot_em")
+            try:
+                spot_data = run_blocking("akshare", self.ak.stock_hk_spot_em, timeout=60)
+            except ProviderCallTimeout:
                 logger.warning(f"⚠️ AKShare港股信息获取超时（60秒），使用备用方案")
-                raise Exception("AKShare港股信息获取超时（60秒）")
-            elif exception[0]:
-                # 有异常
-                raise exception[0]
-            else:
-                # 成功
-                spot_data = result[0]
+                raise
 
             # 查找对应的股票信息
             if not spot_data.empty:
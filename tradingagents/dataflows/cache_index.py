@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+缓存元数据索引
+用单个SQLite文件替代每个缓存一份的 *_meta.json，
+按 symbol/data_type/market/source/日期 建立索引，支持O(log n)查找、原子更新和按数量淘汰
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 索引列，其余元数据字段原样保存在extra列中
+_COLUMNS = (
+    'cache_key', 'symbol', 'data_type', 'market_type', 'data_source',
+    'start_date', 'end_date', 'file_path', 'file_format', 'file_size', 'cached_at',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    cache_key   TEXT PRIMARY KEY,
+    symbol      TEXT,
+    data_type   TEXT,
+    market_type TEXT,
+    data_source TEXT,
+    start_date  TEXT,
+    end_date    TEXT,
+    file_path   TEXT,
+    file_format TEXT,
+    file_size   INTEGER DEFAULT 0,
+    cached_at   TEXT,
+    extra       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cache_lookup
+    ON cache_entries (symbol, data_type, market_type, data_source, cached_at);
+CREATE INDEX IF NOT EXISTS idx_cache_type_age
+    ON cache_entries (data_type, market_type, cached_at);
+"""
+
+
+class CacheMetadataIndex:
+    """基于SQLite的缓存元数据索引"""
+
+    def __init__(self, db_path: Path, legacy_metadata_dir: Optional[Path] = None):
+        """
+        初始化元数据索引
+
+        Args:
+            db_path: SQLite索引文件路径
+            legacy_metadata_dir: 旧版 *_meta.json 所在目录，首次创建索引时导入
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            imported = self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+        if not imported:
+            if legacy_metadata_dir is not None:
+                self._import_legacy(Path(legacy_metadata_dir))
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA user_version = 1")
+
+    # ---------- 写入 ----------
+
+    def upsert(self, cache_key: str, metadata: Dict[str, Any]):
+        """原子地插入或替换一条元数据"""
+        row = self._to_row(cache_key, metadata)
+        placeholders = ', '.join('?' for _ in row)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO cache_entries ({', '.join(_COLUMNS)}, extra) VALUES ({placeholders})",
+                row,
+            )
+
+    def delete(self, cache_keys: List[str]):
+        """删除若干条元数据"""
+        if not cache_keys:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM cache_entries WHERE cache_key = ?",
+                [(key,) for key in cache_keys],
+            )
+
+    # ---------- 查询 ----------
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """按缓存键获取元数据"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM cache_entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def find(self, symbol: str = None, data_type: str = None, market_type: str = None,
+             data_source: str = None, cached_after: str = None,
+             limit: int = None) -> List[Dict[str, Any]]:
+        """
+        按条件查找元数据，按缓存时间从新到旧排序
+
+        Args:
+            cached_after: ISO时间戳，只返回在此之后缓存的条目
+        """
+        clauses = []
+        params: List[Any] = []
+        for column, value in (('symbol', symbol), ('data_type', data_type),
+                              ('market_type', market_type), ('data_source', data_source)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if cached_after is not None:
+            clauses.append("cached_at >= ?")
+            params.append(cached_after)
+
+        sql = "SELECT * FROM cache_entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY cached_at DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def find_older_than(self, cached_before: str) -> List[Dict[str, Any]]:
+        """查找在指定时间之前缓存的条目"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM cache_entries WHERE cached_at < ?", (cached_before,)
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def overflow(self, data_type: str, market_type: str, max_files: int) -> List[Dict[str, Any]]:
+        """返回超出max_files的最旧条目（用于淘汰）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM cache_entries WHERE data_type = ? AND market_type IS ? "
+                "ORDER BY cached_at DESC LIMIT -1 OFFSET ?",
+                (data_type, market_type, max_files),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """按数据类型汇总条目数和文件大小"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data_type, COUNT(*) AS cnt, COALESCE(SUM(file_size), 0) AS size "
+                "FROM cache_entries GROUP BY data_type"
+            ).fetchall()
+        return {row['data_type']: {'count': row['cnt'], 'size': row['size']} for row in rows}
+
+    # ---------- 内部实现 ----------
+
+    @staticmethod
+    def _to_row(cache_key: str, metadata: Dict[str, Any]) -> tuple:
+        values = [cache_key] + [metadata.get(column) for column in _COLUMNS[1:]]
+        extra = {k: v for k, v in metadata.items() if k not in _COLUMNS}
+        return tuple(values) + (json.dumps(extra, ensure_ascii=False),)
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        metadata = {column: row[column] for column in _COLUMNS}
+        if row['extra']:
+            try:
+                metadata.update(json.loads(row['extra']))
+            except json.JSONDecodeError:
+                pass
+        return metadata
+
+    def _import_legacy(self, metadata_dir: Path):
+        """一次性导入旧版 *_meta.json 元数据"""
+        rows = []
+        for metadata_file in metadata_dir.glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                cache_key = metadata_file.stem.replace('_meta', '')
+                file_path = Path(metadata.get('file_path', ''))
+                if file_path.exists():
+                    metadata.setdefault('file_size', file_path.stat().st_size)
+                rows.append(self._to_row(cache_key, metadata))
+            except Exception:
+                continue
+
+        if rows:
+            placeholders = ', '.join('?' for _ in rows[0])
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO cache_entries ({', '.join(_COLUMNS)}, extra) VALUES ({placeholders})",
+                    rows,
+                )
+            logger.info(f"🗂️ 已将 {len(rows)} 条旧版缓存元数据导入索引")
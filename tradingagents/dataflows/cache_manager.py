@@ -10,14 +10,28 @@ import pickle
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Tuple, Union
 import hashlib
+import re
+from urllib.parse import unquote_plus
+
+from .cache_index import CacheMetadataIndex
+from .frame_serializer import get_frame_serializer, serialize_frame, deserialize_frame
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
 
+# 结束于昨天的新闻窗口仍可能被搜索引擎补充收录，保留的小时数
+GOOGLE_NEWS_SETTLING_TTL_HOURS = 6
+
+
+def _shift_date(date_str: str, days: int) -> str:
+    """YYYY-MM-DD格式的日期加减天数"""
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
 class StockDataCache:
     """股票数据缓存管理器 - 支持美股和A股数据缓存优化"""
 
@@ -82,9 +96,25 @@ class StockDataCache:
                 'ttl_hours': 1,  # A股基本面数据缓存1小时
                 'max_files': 200,
                 'description': 'A股基本面数据'
+            },
+            # 按股票保存的日线序列，历史K线不过期，只有最近一个交易日会重新获取
+            'us_ohlcv': {
+                'max_files': 500,
+                'description': '美股日线序列'
+            },
+            'china_ohlcv': {
+                'max_files': 500,
+                'description': 'A股日线序列'
             }
         }
 
+        # DataFrame缓存的序列化格式（默认Arrow IPC，可通过 TRADINGAGENTS_CACHE_SERIALIZER 切换）
+        self.frame_serializer = get_frame_serializer()
+
+        # 元数据索引（SQLite），首次创建时导入旧版 *_meta.json
+        self.index = CacheMetadataIndex(self.metadata_dir / "index.sqlite",
+                                        legacy_metadata_dir=self.metadata_dir)
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
@@ -121,7 +151,7 @@ class StockDataCache:
             market_type = 'us' if not cache_key.startswith(('0', '1', '2', '3', '4', '5', '6', '7', '8', '9')) else 'china'
 
         # 根据数据类型和市场类型选择目录
-        if data_type == "stock_data":
+        if data_type in ("stock_data", "ohlcv"):
             base_dir = self.china_stock_dir if market_type == 'china' else self.us_stock_dir
         elif data_type == "news":
             base_dir = self.china_news_dir if market_type == 'china' else self.us_news_dir
@@ -132,31 +162,91 @@ class StockDataCache:
 
         return base_dir / f"{cache_key}.{file_format}"
     
-    def _get_metadata_path(self, cache_key: str) -> Path:
-        """获取元数据文件路径"""
-        return self.metadata_dir / f"{cache_key}_meta.json"
-    
+    def _write_frame(self, data_type: str, cache_key: str, symbol: str,
+                     data: pd.DataFrame) -> Tuple[Path, str]:
+        """以列式二进制格式原子地写入DataFrame，返回(文件路径, 存储格式)"""
+        file_format, payload = serialize_frame(data, self.frame_serializer)
+        cache_path = self._get_cache_path(data_type, cache_key, file_format, symbol)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+        return cache_path, file_format
+
+    def _read_frame(self, cache_path: Path, file_format: str) -> pd.DataFrame:
+        """读取DataFrame缓存，旧版CSV缓存走兼容路径"""
+        if file_format == 'csv':
+            return pd.read_csv(cache_path, index_col=0)
+        with open(cache_path, 'rb') as f:
+            return deserialize_frame(file_format, f.read())
+
     def _save_metadata(self, cache_key: str, metadata: Dict[str, Any]):
-        """保存元数据"""
-        metadata_path = self._get_metadata_path(cache_key)
+        """保存元数据到索引，并按max_files淘汰同类最旧的缓存"""
         metadata['cached_at'] = datetime.now().isoformat()
-        
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-    
+        file_path = Path(metadata.get('file_path', ''))
+        metadata['file_size'] = file_path.stat().st_size if file_path.exists() else 0
+        if not metadata.get('market_type'):
+            metadata['market_type'] = self._determine_market_type(metadata.get('symbol', ''))
+
+        self.index.upsert(cache_key, metadata)
+        self._enforce_max_files(metadata['data_type'], metadata['market_type'])
+
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
-        metadata_path = self._get_metadata_path(cache_key)
-        if not metadata_path.exists():
-            return None
-        
         try:
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.index.get(cache_key)
         except Exception as e:
             logger.error(f"⚠️ 加载元数据失败: {e}")
             return None
-    
+
+    def _remove_entries(self, entries: List[Dict[str, Any]]) -> int:
+        """删除缓存数据文件及其索引记录"""
+        for metadata in entries:
+            try:
+                data_file = Path(metadata.get('file_path') or '')
+                if data_file.is_file():
+                    data_file.unlink()
+            except Exception as e:
+                logger.warning(f"⚠️ 删除缓存文件时出错: {e}")
+        self.index.delete([metadata['cache_key'] for metadata in entries])
+        return len(entries)
+
+    def _enforce_max_files(self, data_type: str, market_type: str):
+        """超过cache_config中max_files时淘汰最旧的缓存"""
+        cache_type = f"{market_type}_{data_type}"
+        max_files = self.cache_config.get(cache_type, {}).get('max_files')
+        if not max_files:
+            return
+
+        overflow = self.index.overflow(data_type, market_type, max_files)
+        if overflow:
+            self._remove_entries(overflow)
+            desc = self.cache_config[cache_type].get('description', '数据')
+            logger.info(f"🧹 {desc}缓存超过 {max_files} 个，已淘汰最旧的 {len(overflow)} 个")
+
+    def find_cache_entries(self, symbol: str, data_type: str, market_type: str = None,
+                           data_source: str = None, max_age_hours: float = None) -> List[Dict[str, Any]]:
+        """
+        按条件查询缓存元数据，按缓存时间从新到旧排序
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型（stock_data/news/fundamentals）
+            market_type: 市场类型，None时根据股票代码判断
+            data_source: 数据源，None表示不限
+            max_age_hours: 只返回该时间内缓存的条目，None表示不限
+
+        Returns:
+            元数据字典列表，每项包含 cache_key
+        """
+        if market_type is None:
+            market_type = self._determine_market_type(symbol)
+        cached_after = None
+        if max_age_hours is not None:
+            cached_after = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        return self.index.find(symbol=symbol, data_type=data_type, market_type=market_type,
+                               data_source=data_source, cached_after=cached_after)
+
     def is_cache_valid(self, cache_key: str, max_age_hours: int = None, symbol: str = None, data_type: str = None) -> bool:
         """检查缓存是否有效 - 支持智能TTL配置"""
         metadata = self._load_metadata(cache_key)
@@ -215,10 +305,10 @@ class StockDataCache:
 
         # 保存数据
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
-            data.to_csv(cache_path, index=True)
+            cache_path, file_format = self._write_frame("stock_data", cache_key, symbol, data)
         else:
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
+            file_format = 'txt'
             with open(cache_path, 'w', encoding='utf-8') as f:
                 f.write(str(data))
 
@@ -231,7 +321,7 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt'
+            'file_format': file_format
         }
         self._save_metadata(cache_key, metadata)
 
@@ -252,11 +342,10 @@ class StockDataCache:
             return None
         
         try:
-            if metadata['file_format'] == 'csv':
-                return pd.read_csv(cache_path, index_col=0)
-            else:
+            if metadata['file_format'] == 'txt':
                 with open(cache_path, 'r', encoding='utf-8') as f:
                     return f.read()
+            return self._read_frame(cache_path, metadata['file_format'])
         except Exception as e:
             logger.error(f"⚠️ 加载缓存数据失败: {e}")
             return None
@@ -297,29 +386,127 @@ class StockDataCache:
             logger.info(f"🎯 找到精确匹配的{desc}: {symbol} -> {search_key}")
             return search_key
 
-        # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'stock_data' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
-                        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
-                        logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        # 如果没有精确匹配，从索引中查找部分匹配（相同股票代码、相同区间的其他缓存）
+        # 格式化后的文本无法截取子区间，区间内的部分命中由日线序列(load_ohlcv_range)负责
+        entries = [
+            entry for entry in self.find_cache_entries(symbol, 'stock_data', market_type,
+                                                       data_source, max_age_hours)
+            if (start_date is None or entry.get('start_date') == start_date) and
+               (end_date is None or entry.get('end_date') == end_date)
+        ]
+        if entries:
+            cache_key = entries[0]['cache_key']
+            desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+            logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
+            return cache_key
 
         desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
         return None
     
+    def _get_ohlcv_key(self, symbol: str, data_source: str) -> str:
+        """日线序列的缓存键，与日期区间无关"""
+        return self._generate_cache_key("ohlcv", symbol, source=data_source,
+                                        market=self._determine_market_type(symbol))
+
+    def load_ohlcv_range(self, symbol: str, start_date: str, end_date: str,
+                         data_source: str) -> Tuple[Optional[pd.DataFrame], List[Tuple[str, str]]]:
+        """
+        从日线序列中读取区间数据，并给出尚未覆盖的边缘区间
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期 (YYYY-MM-DD，含)
+            end_date: 结束日期 (YYYY-MM-DD，含)
+            data_source: 数据源
+
+        Returns:
+            (已覆盖部分的DataFrame或None, 需要补充获取的[(开始, 结束)]列表)
+        """
+        metadata = self._load_metadata(self._get_ohlcv_key(symbol, data_source))
+        if not metadata or not Path(metadata['file_path']).exists():
+            return None, [(start_date, end_date)]
+
+        try:
+            series = self._read_frame(Path(metadata['file_path']), metadata['file_format'])
+        except Exception as e:
+            logger.error(f"⚠️ 加载日线序列失败: {e}")
+            return None, [(start_date, end_date)]
+
+        covered_start, covered_end = metadata['start_date'], metadata['end_date']
+        missing = []
+        # 缺口与已覆盖区间相邻补齐，保证覆盖范围始终连续
+        if start_date < covered_start:
+            missing.append((start_date, _shift_date(covered_start, -1)))
+        if end_date > covered_end:
+            missing.append((_shift_date(covered_end, 1), end_date))
+
+        subset = series.loc[start_date:end_date]
+        if missing:
+            desc = self.cache_config.get(f"{metadata['market_type']}_ohlcv", {}).get('description', '日线序列')
+            logger.info(f"📋 {desc}部分命中: {symbol} 已覆盖 {covered_start}~{covered_end}，需补充 {missing}")
+        return subset, missing
+
+    def save_ohlcv(self, symbol: str, data: pd.DataFrame, start_date: str, end_date: str,
+                   data_source: str) -> str:
+        """
+        把一段日线数据合并进该股票的日线序列
+
+        Args:
+            symbol: 股票代码
+            data: 以日期为索引(DatetimeIndex)的日线数据；成功请求但区间内没有交易日时传入空DataFrame，
+                只扩展覆盖范围，避免周末、节假日区间被反复请求
+            start_date: 本次请求覆盖的开始日期 (YYYY-MM-DD，含)
+            end_date: 本次请求覆盖的结束日期 (YYYY-MM-DD，含)
+            data_source: 数据源
+
+        Returns:
+            cache_key: 缓存键
+        """
+        market_type = self._determine_market_type(symbol)
+        cache_key = self._get_ohlcv_key(symbol, data_source)
+
+        # 当天的K线可能尚未收盘，覆盖范围只记到昨天，下次请求会重新获取
+        settled_end = min(end_date, _shift_date(datetime.now().strftime('%Y-%m-%d'), -1))
+
+        metadata = self._load_metadata(cache_key)
+        adjacent = (metadata is not None and
+                    start_date <= _shift_date(metadata['end_date'], 1) and
+                    settled_end >= _shift_date(metadata['start_date'], -1))
+        old_path = Path(metadata['file_path']) if metadata else None
+        if adjacent and old_path.exists():
+            series = self._read_frame(old_path, metadata['file_format'])
+            if not data.empty:
+                series = pd.concat([series, data])
+                series = series[~series.index.duplicated(keep='last')]
+            covered_start = min(start_date, metadata['start_date'])
+            covered_end = max(settled_end, metadata['end_date'])
+        elif data.empty and metadata is not None and old_path.exists():
+            # 不相邻的空区间不值得替换已有序列
+            return cache_key
+        else:
+            # 与已有序列不相邻时重新开始一段，避免覆盖范围中出现空洞
+            series = data if not data.empty else pd.DataFrame(index=pd.DatetimeIndex([], name='date'))
+            covered_start, covered_end = start_date, settled_end
+
+        if covered_end < covered_start:
+            return cache_key
+
+        cache_path, file_format = self._write_frame("ohlcv", cache_key, symbol, series.sort_index())
+        if old_path is not None and old_path != cache_path and old_path.exists():
+            old_path.unlink()
+        self._save_metadata(cache_key, {
+            'symbol': symbol,
+            'data_type': 'ohlcv',
+            'market_type': market_type,
+            'start_date': covered_start,
+            'end_date': covered_end,
+            'data_source': data_source,
+            'file_path': str(cache_path),
+            'file_format': file_format
+        })
+        return cache_key
+
     def save_news_data(self, symbol: str, news_data: str, 
                       start_date: str = None, end_date: str = None,
                       data_source: str = "unknown") -> str:
@@ -347,6 +534,99 @@ class StockDataCache:
         logger.info(f"📰 新闻数据已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
+    @staticmethod
+    def _normalize_news_query(query: str) -> str:
+        """新闻查询归一化：'+'与空白等价、忽略大小写和多余空格"""
+        return " ".join(unquote_plus(str(query)).lower().split())
+
+    def _get_google_news_key(self, query: str, start_date: str, end_date: str) -> str:
+        return self._generate_cache_key("news", self._normalize_news_query(query),
+                                        start_date=start_date, end_date=end_date,
+                                        source="google_news")
+
+    def _google_news_ttl_hours(self, end_date: str, cached_on: str, market_type: str) -> Optional[float]:
+        """
+        按日期窗口结束日期与缓存写入日期的关系确定新闻缓存的TTL
+
+        写入时窗口还包含当天，按新闻缓存的TTL过期；窗口结束于写入前一天时考虑到搜索引擎
+        收录延迟，保留 GOOGLE_NEWS_SETTLING_TTL_HOURS 小时；写入时窗口已经封闭则永不过期（返回None）
+        """
+        if end_date >= cached_on:
+            return self.cache_config.get(f"{market_type}_news", {}).get('ttl_hours', 1)
+        if end_date == _shift_date(cached_on, -1):
+            return GOOGLE_NEWS_SETTLING_TTL_HOURS
+        return None
+
+    def load_google_news(self, query: str, start_date: str,
+                         end_date: str) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """
+        读取Google新闻缓存
+
+        Args:
+            query: 搜索查询
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+
+        Returns:
+            (缓存的文章列表或None, 是否仍在TTL内)；过期的文章列表仍会返回，用于增量抓取
+        """
+        metadata = self._load_metadata(self._get_google_news_key(query, start_date, end_date))
+        if not metadata or not Path(metadata['file_path']).exists():
+            return None, False
+
+        try:
+            with open(metadata['file_path'], 'r', encoding='utf-8') as f:
+                articles = json.load(f)
+        except Exception as e:
+            logger.error(f"⚠️ 加载新闻缓存失败: {e}")
+            return None, False
+
+        cached_at = datetime.fromisoformat(metadata['cached_at'])
+        ttl_hours = self._google_news_ttl_hours(end_date, cached_at.strftime('%Y-%m-%d'),
+                                                metadata['market_type'])
+        age_hours = (datetime.now() - cached_at).total_seconds() / 3600
+        fresh = ttl_hours is None or age_hours < ttl_hours
+        return articles, fresh
+
+    def save_google_news(self, query: str, start_date: str, end_date: str,
+                         articles: List[Dict[str, Any]]) -> str:
+        """
+        保存Google新闻文章列表到缓存
+
+        Args:
+            query: 搜索查询（保存前归一化）
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            articles: 文章字典列表
+
+        Returns:
+            cache_key: 缓存键
+        """
+        normalized = self._normalize_news_query(query)
+        # 查询中含中文时归入A股新闻目录
+        market_type = 'china' if re.search(r'[\u4e00-\u9fff]', normalized) else 'us'
+        cache_key = self._get_google_news_key(query, start_date, end_date)
+        base_dir = self.china_news_dir if market_type == 'china' else self.us_news_dir
+        cache_path = base_dir / f"{cache_key}.json"
+
+        tmp_path = cache_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(articles, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+
+        self._save_metadata(cache_key, {
+            'symbol': normalized,
+            'data_type': 'news',
+            'market_type': market_type,
+            'start_date': start_date,
+            'end_date': end_date,
+            'data_source': 'google_news',
+            'file_path': str(cache_path),
+            'file_format': 'json'
+        })
+        logger.info(f"📰 Google新闻已缓存: {normalized} ({start_date}~{end_date}, {len(articles)}条)")
+        return cache_key
+
     def save_fundamentals_data(self, symbol: str, fundamentals_data: str,
                               data_source: str = "unknown") -> str:
         """保存基本面数据到缓存"""
@@ -411,25 +691,15 @@ class StockDataCache:
             cache_type = f"{market_type}_fundamentals"
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
-        # 查找匹配的缓存
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'fundamentals' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-                    
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
-                        desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
-                        logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
-        
+        # 从索引中查找匹配的缓存
+        entries = self.find_cache_entries(symbol, 'fundamentals', market_type,
+                                          data_source, max_age_hours)
+        if entries:
+            cache_key = entries[0]['cache_key']
+            desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+            logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
+            return cache_key
+
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
         return None
@@ -438,28 +708,15 @@ class StockDataCache:
         """清理过期缓存"""
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         cleared_count = 0
-        
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                cached_at = datetime.fromisoformat(metadata['cached_at'])
-                if cached_at < cutoff_time:
-                    # 删除数据文件
-                    data_file = Path(metadata['file_path'])
-                    if data_file.exists():
-                        data_file.unlink()
-                    
-                    # 删除元数据文件
-                    metadata_file.unlink()
-                    cleared_count += 1
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ 清理缓存时出错: {e}")
-        
+
+        try:
+            expired = self.index.find_older_than(cutoff_time.isoformat())
+            cleared_count = self._remove_entries(expired)
+        except Exception as e:
+            logger.warning(f"⚠️ 清理缓存时出错: {e}")
+
         logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
-    
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         stats = {
@@ -470,29 +727,17 @@ class StockDataCache:
             'total_size_mb': 0
         }
         
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                data_type = metadata.get('data_type', 'unknown')
-                if data_type == 'stock_data':
-                    stats['stock_data_count'] += 1
-                elif data_type == 'news':
-                    stats['news_count'] += 1
-                elif data_type == 'fundamentals':
-                    stats['fundamentals_count'] += 1
-                
-                # 计算文件大小
-                data_file = Path(metadata['file_path'])
-                if data_file.exists():
-                    stats['total_size_mb'] += data_file.stat().st_size / (1024 * 1024)
-                
-                stats['total_files'] += 1
-                
-            except Exception:
-                continue
-        
+        for data_type, type_stats in self.index.stats().items():
+            if data_type == 'stock_data':
+                stats['stock_data_count'] += type_stats['count']
+            elif data_type == 'news':
+                stats['news_count'] += type_stats['count']
+            elif data_type == 'fundamentals':
+                stats['fundamentals_count'] += type_stats['count']
+
+            stats['total_size_mb'] += type_stats['size'] / (1024 * 1024)
+            stats['total_files'] += type_stats['count']
+
         stats['total_size_mb'] = round(stats['total_size_mb'], 2)
         return stats
 
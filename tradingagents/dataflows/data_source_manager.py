@@ -4,12 +4,18 @@
 统一管理中国股票数据源的选择和切换，支持Tushare、AKShare、BaoStock等
 """
 
+import math
 import os
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 import warnings
 
+from .stock_data_result import StockDataResult
+from .provider_executor import run_blocking
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -28,18 +34,128 @@ class ChinaDataSource(Enum):
     TDX = "tdx"  # 中国股票数据，将被逐步淘汰
 
 
+# 备用数据源优先级: Tushare > AKShare > BaoStock > TDX
+FALLBACK_ORDER = [
+    ChinaDataSource.TUSHARE,
+    ChinaDataSource.AKSHARE,
+    ChinaDataSource.BAOSTOCK,
+    ChinaDataSource.TDX
+]
+
+
+class SourceHealth:
+    """单个数据源的健康状况：延迟/错误率EWMA + 熔断器"""
+
+    def __init__(self, alpha: float = 0.2, failure_threshold: int = 3, cooldown_seconds: float = 60.0):
+        """
+        Args:
+            alpha: EWMA平滑系数
+            failure_threshold: 连续失败多少次后熔断
+            cooldown_seconds: 熔断时长，到期后放行一次试探请求
+        """
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.latency_ewma: Optional[float] = None
+        self.latency_var = 0.0
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, success: bool, latency: float):
+        """记录一次调用结果"""
+        with self._lock:
+            self.samples += 1
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                diff = latency - self.latency_ewma
+                self.latency_ewma += self.alpha * diff
+                self.latency_var = (1 - self.alpha) * (self.latency_var + self.alpha * diff * diff)
+            self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+
+            if success:
+                self.consecutive_failures = 0
+                self.open_until = 0.0
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.failure_threshold:
+                    self.open_until = time.time() + self.cooldown_seconds
+
+    def is_open(self) -> bool:
+        """熔断器是否打开（打开时直接跳过该数据源）"""
+        return time.time() < self.open_until
+
+    def p95_latency(self) -> Optional[float]:
+        """按EWMA均值和方差估算的p95延迟（假设近似正态分布）"""
+        with self._lock:
+            if self.latency_ewma is None:
+                return None
+            return self.latency_ewma + 1.645 * math.sqrt(self.latency_var)
+
+    def get_statistics(self) -> Dict:
+        p95 = self.p95_latency()
+        with self._lock:
+            return {
+                'samples': self.samples,
+                'latency_ewma': self.latency_ewma,
+                'latency_p95': p95,
+                'error_rate': self.error_rate,
+                'consecutive_failures': self.consecutive_failures,
+                'circuit_open': self.is_open(),
+            }
+
+
+# 对冲请求使用的线程池，未被采用的慢请求在后台完成并继续更新健康状况
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="data_source")
+    return _hedge_executor
+
+
 class DataSourceManager:
     """数据源管理器"""
     
-    def __init__(self):
-        """初始化数据源管理器"""
+    def __init__(self, hedged: Optional[bool] = None, hedge_delay: Optional[float] = None):
+        """
+        初始化数据源管理器
+
+        Args:
+            hedged: 是否启用对冲模式（主数据源超出延迟预算时并发请求下一个数据源），
+                    None时读取环境变量 CHINA_DATA_HEDGED
+            hedge_delay: 固定的对冲等待时间（秒），None时读取 CHINA_DATA_HEDGE_DELAY，
+                         仍未设置则按数据源的p95延迟自适应
+        """
         self.default_source = self._get_default_source()
         self.available_sources = self._check_available_sources()
         self.current_source = self.default_source
+
+        if hedged is None:
+            hedged = os.getenv('CHINA_DATA_HEDGED', 'false').lower() == 'true'
+        if hedge_delay is None and os.getenv('CHINA_DATA_HEDGE_DELAY'):
+            hedge_delay = float(os.getenv('CHINA_DATA_HEDGE_DELAY'))
+        self.hedged = hedged
+        self.hedge_delay = hedge_delay
+        # 没有足够样本时的对冲等待时间，以及自适应预算的下限
+        self.default_hedge_delay = 5.0
+        self.min_hedge_delay = 1.0
+        self.source_health: Dict[ChinaDataSource, SourceHealth] = {
+            source: SourceHealth() for source in ChinaDataSource
+        }
         
         logger.info(f"📊 数据源管理器初始化完成")
         logger.info(f"   默认数据源: {self.default_source.value}")
         logger.info(f"   可用数据源: {[s.value for s in self.available_sources]}")
+        logger.info(f"   对冲模式: {'已启用' if self.hedged else '未启用'}")
     
     def _get_default_source(self) -> ChinaDataSource:
         """获取默认数据源"""
@@ -174,6 +290,20 @@ class DataSourceManager:
         Returns:
             str: 格式化的股票数据
         """
+        return self.get_stock_data_result(symbol, start_date, end_date).render()
+
+    def get_stock_data_result(self, symbol: str, start_date: str = None, end_date: str = None) -> StockDataResult:
+        """
+        获取股票数据的统一接口（结构化结果）
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            StockDataResult: DataFrame + 元数据 + 状态，由调用方在工具边界渲染为文本
+        """
         # 记录详细的输入参数
         logger.info(f"📊 [数据获取] 开始获取股票数据",
                    extra={
@@ -185,82 +315,181 @@ class DataSourceManager:
                    })
 
         # 添加详细的股票代码追踪日志
-        logger.info(f"🔍 [股票代码追踪] DataSourceManager.get_stock_data 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
+        logger.info(f"🔍 [股票代码追踪] DataSourceManager.get_stock_data_result 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
         logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
         logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
         logger.info(f"🔍 [股票代码追踪] 当前数据源: {self.current_source.value}")
 
         start_time = time.time()
+        candidates = self._candidate_sources()
+
+        if self.hedged:
+            result, source = self._get_stock_data_hedged(candidates, symbol, start_date, end_date)
+        else:
+            result, source = self._get_stock_data_sequential(candidates, symbol, start_date, end_date)
+
+        duration = time.time() - start_time
+
+        if source is not None:
+            logger.info(f"✅ [数据获取] 成功获取股票数据",
+                       extra={
+                           'symbol': symbol,
+                           'start_date': start_date,
+                           'end_date': end_date,
+                           'data_source': source.value,
+                           'duration': duration,
+                           'rows': len(result.data) if result.data is not None else 0,
+                           'event_type': 'data_fetch_success'
+                       })
+        else:
+            logger.error(f"❌ [数据获取] 所有数据源都无法获取有效数据",
+                        extra={
+                            'symbol': symbol,
+                            'start_date': start_date,
+                            'end_date': end_date,
+                            'data_source': self.current_source.value,
+                            'duration': duration,
+                            'error': result.error,
+                            'event_type': 'data_fetch_warning'
+                        })
+        return result
+
+    @staticmethod
+    def _is_valid_result(result: Optional[StockDataResult]) -> bool:
+        return result is not None and result.ok
+
+    def _candidate_sources(self) -> List[ChinaDataSource]:
+        """当前数据源在前，其余按备用优先级排列，跳过熔断中的数据源"""
+        ordered = [self.current_source] + [
+            source for source in FALLBACK_ORDER
+            if source != self.current_source and source in self.available_sources
+        ]
+        candidates = []
+        for source in ordered:
+            if self.source_health[source].is_open():
+                logger.warning(f"⚡ 数据源{source.value}连续失败，熔断中，直接跳过")
+            else:
+                candidates.append(source)
+        # 全部熔断时仍然按原顺序尝试，避免无数据可用
+        return candidates or ordered
 
+    def _fetch_from_source(self, source: ChinaDataSource, symbol: str,
+                           start_date: str, end_date: str) -> StockDataResult:
+        """从指定数据源获取数据并记录延迟和成败（不修改current_source，可并发调用）"""
+        start_time = time.time()
         try:
-            # 根据数据源调用相应的获取方法
-            if self.current_source == ChinaDataSource.TUSHARE:
+            if source == ChinaDataSource.TUSHARE:
                 logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}'")
                 result = self._get_tushare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.AKSHARE:
+            elif source == ChinaDataSource.AKSHARE:
                 result = self._get_akshare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
+            elif source == ChinaDataSource.BAOSTOCK:
                 result = self._get_baostock_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.TDX:
+            elif source == ChinaDataSource.TDX:
                 result = self._get_tdx_data(symbol, start_date, end_date)
             else:
-                result = f"❌ 不支持的数据源: {self.current_source.value}"
-
-            # 记录详细的输出结果
-            duration = time.time() - start_time
-            result_length = len(result) if result else 0
-            is_success = result and "❌" not in result and "错误" not in result
-
-            if is_success:
-                logger.info(f"✅ [数据获取] 成功获取股票数据",
-                           extra={
-                               'symbol': symbol,
-                               'start_date': start_date,
-                               'end_date': end_date,
-                               'data_source': self.current_source.value,
-                               'duration': duration,
-                               'result_length': result_length,
-                               'result_preview': result[:200] + '...' if result_length > 200 else result,
-                               'event_type': 'data_fetch_success'
-                           })
-                return result
-            else:
-                logger.warning(f"⚠️ [数据获取] 数据质量异常，尝试降级到其他数据源",
-                              extra={
-                                  'symbol': symbol,
-                                  'start_date': start_date,
-                                  'end_date': end_date,
-                                  'data_source': self.current_source.value,
-                                  'duration': duration,
-                                  'result_length': result_length,
-                                  'result_preview': result[:200] + '...' if result_length > 200 else result,
-                                  'event_type': 'data_fetch_warning'
-                              })
-
-                # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
-                if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
-                    logger.info(f"✅ [数据获取] 降级成功获取数据")
-                    return fallback_result
-                else:
-                    logger.error(f"❌ [数据获取] 所有数据源都无法获取有效数据")
-                    return result  # 返回原始结果（包含错误信息）
-
+                result = StockDataResult.failure(symbol, source.value, f"❌ 不支持的数据源: {source.value}")
         except Exception as e:
-            duration = time.time() - start_time
-            logger.error(f"❌ [数据获取] 异常失败: {e}",
+            logger.error(f"❌ [数据获取] {source.value}异常失败: {e}",
                         extra={
                             'symbol': symbol,
-                            'start_date': start_date,
-                            'end_date': end_date,
-                            'data_source': self.current_source.value,
-                            'duration': duration,
+                            'data_source': source.value,
+                            'duration': time.time() - start_time,
                             'error': str(e),
                             'event_type': 'data_fetch_exception'
                         }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
+            result = StockDataResult.failure(symbol, source.value, f"❌ {source.value}获取{symbol}数据失败: {e}",
+                                             start_date=start_date, end_date=end_date)
+
+        success = self._is_valid_result(result)
+        self.source_health[source].record(success, time.time() - start_time)
+        if not success:
+            logger.warning(f"⚠️ [数据获取] {source.value}数据获取失败: {result.error}")
+        return result
+
+    def _get_stock_data_sequential(self, candidates: List[ChinaDataSource], symbol: str,
+                                   start_date: str, end_date: str) -> Tuple[StockDataResult, Optional[ChinaDataSource]]:
+        """依次尝试各数据源，返回(结果, 成功的数据源)；全部失败时数据源为None"""
+        first_result = None
+        for i, source in enumerate(candidates):
+            if i > 0:
+                logger.info(f"🔄 尝试备用数据源: {source.value}")
+            result = self._fetch_from_source(source, symbol, start_date, end_date)
+            if self._is_valid_result(result):
+                if i > 0:
+                    logger.info(f"✅ 备用数据源{source.value}获取成功")
+                return result, source
+            if first_result is None:
+                first_result = result
+
+        return first_result or self._all_failed(symbol, start_date, end_date), None
+
+    def _all_failed(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
+        return StockDataResult.failure(symbol, self.current_source.value, f"❌ 所有数据源都无法获取{symbol}的数据",
+                                       start_date=start_date, end_date=end_date)
+
+    def _hedge_budget(self, source: ChinaDataSource) -> float:
+        """等待某数据源多久后发起对冲请求"""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        health = self.source_health[source]
+        p95 = health.p95_latency()
+        if p95 is None or health.samples < 5:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, p95)
+
+    def _get_stock_data_hedged(self, candidates: List[ChinaDataSource], symbol: str,
+                               start_date: str, end_date: str) -> Tuple[StockDataResult, Optional[ChinaDataSource]]:
+        """
+        对冲模式：主数据源超出p95延迟预算或返回失败时，立即请求下一个数据源，
+        采用最先返回的有效结果
+        """
+        executor = _get_hedge_executor()
+        remaining = list(candidates)
+        pending = {}
+        results = {}
+
+        def launch_next() -> Optional[ChinaDataSource]:
+            if not remaining:
+                return None
+            source = remaining.pop(0)
+            future = executor.submit(self._fetch_from_source, source, symbol, start_date, end_date)
+            pending[future] = source
+            return source
+
+        last_launched = launch_next()
+        while pending:
+            budget = self._hedge_budget(last_launched) if remaining else None
+            done, _ = wait(list(pending), timeout=budget, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # 最近发起的数据源超出延迟预算，对冲下一个数据源
+                slow_source = last_launched
+                last_launched = launch_next()
+                logger.info(f"⏱️ {slow_source.value}超过{budget:.1f}秒未返回，对冲请求{last_launched.value}")
+                continue
+
+            for future in done:
+                source = pending.pop(future)
+                result = future.result()
+                if self._is_valid_result(result):
+                    if source != candidates[0]:
+                        logger.info(f"✅ 对冲数据源{source.value}先返回有效数据")
+                    return result, source
+                results[source] = result
+
+            # 有数据源失败，不必等待预算，立即尝试下一个
+            if remaining:
+                last_launched = launch_next()
+
+        first_result = results.get(candidates[0])
+        return first_result or self._all_failed(symbol, start_date, end_date), None
+
+    def get_source_health(self) -> Dict[str, Dict]:
+        """获取各数据源的延迟、错误率和熔断状态"""
+        return {source.value: health.get_statistics() for source, health in self.source_health.items()}
     
-    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> str:
+    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
         """使用Tushare获取数据"""
         logger.debug(f"📊 [Tushare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
 
@@ -273,19 +502,18 @@ class DataSourceManager:
 
         start_time = time.time()
         try:
-            from .interface import get_china_stock_data_tushare
-            logger.info(f"🔍 [股票代码追踪] 调用 get_china_stock_data_tushare，传入参数: symbol='{symbol}'")
-            logger.info(f"🔍 [DataSourceManager详细日志] 开始调用interface.get_china_stock_data_tushare...")
+            from .interface import get_china_stock_data_tushare_result
+            logger.info(f"🔍 [股票代码追踪] 调用 get_china_stock_data_tushare_result，传入参数: symbol='{symbol}'")
+            logger.info(f"🔍 [DataSourceManager详细日志] 开始调用interface.get_china_stock_data_tushare_result...")
 
-            result = get_china_stock_data_tushare(symbol, start_date, end_date)
+            result = get_china_stock_data_tushare_result(symbol, start_date, end_date)
 
             duration = time.time() - start_time
+            rows = len(result.data) if result.data is not None else 0
             logger.info(f"🔍 [DataSourceManager详细日志] interface调用完成，耗时: {duration:.3f}秒")
-            logger.info(f"🔍 [股票代码追踪] get_china_stock_data_tushare 返回结果前200字符: {result[:200] if result else 'None'}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果类型: {type(result)}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果长度: {len(result) if result else 0}")
+            logger.info(f"🔍 [DataSourceManager详细日志] 返回状态: {result.status}, 数据条数: {rows}")
 
-            logger.debug(f"📊 [Tushare] 调用完成: 耗时={duration:.2f}s, 结果长度={len(result) if result else 0}")
+            logger.debug(f"📊 [Tushare] 调用完成: 耗时={duration:.2f}s, 数据条数={rows}")
 
             return result
         except Exception as e:
@@ -297,7 +525,7 @@ class DataSourceManager:
             logger.error(f"❌ [DataSourceManager详细日志] 异常堆栈: {traceback.format_exc()}")
             raise
     
-    def _get_akshare_data(self, symbol: str, start_date: str, end_date: str) -> str:
+    def _get_akshare_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
         """使用AKShare获取数据"""
         logger.debug(f"📊 [AKShare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
 
@@ -310,81 +538,33 @@ class DataSourceManager:
 
             duration = time.time() - start_time
 
-            if data is not None and not data.empty:
-                result = f"股票代码: {symbol}\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-                result += "最新数据:\n"
-                result += data.tail(5).to_string(index=False)
-
-                logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(data)}, 结果长度={len(result)}")
-                return result
+            result = StockDataResult.from_frame(symbol, 'akshare', data, start_date, end_date)
+            if result.ok:
+                logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(data)}")
             else:
-                result = f"❌ 未能获取{symbol}的股票数据"
                 logger.warning(f"⚠️ [AKShare] 数据为空: 耗时={duration:.2f}s")
-                return result
+            return result
 
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ [AKShare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            return f"❌ AKShare获取{symbol}数据失败: {e}"
+            return StockDataResult.failure(symbol, 'akshare', f"❌ AKShare获取{symbol}数据失败: {e}",
+                                           start_date=start_date, end_date=end_date)
     
-    def _get_baostock_data(self, symbol: str, start_date: str, end_date: str) -> str:
+    def _get_baostock_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
         """使用BaoStock获取数据"""
         # 这里需要实现BaoStock的统一接口
         from .baostock_utils import get_baostock_provider
         provider = get_baostock_provider()
-        data = provider.get_stock_data(symbol, start_date, end_date)
-        
-        if data is not None and not data.empty:
-            result = f"股票代码: {symbol}\n"
-            result += f"数据期间: {start_date} 至 {end_date}\n"
-            result += f"数据条数: {len(data)}条\n\n"
-            result += "最新数据:\n"
-            result += data.tail(5).to_string(index=False)
-            return result
-        else:
-            return f"❌ 未能获取{symbol}的股票数据"
+        data = run_blocking('baostock', lambda: provider.get_stock_data(symbol, start_date, end_date))
+        return StockDataResult.from_frame(symbol, 'baostock', data, start_date, end_date)
     
-    def _get_tdx_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用TDX获取数据 (已弃用)"""
+    def _get_tdx_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
+        """使用TDX获取数据 (已弃用，只提供格式化文本)"""
         logger.warning(f"⚠️ 警告: 正在使用已弃用的TDX数据源")
         from .tdx_utils import get_china_stock_data
-        return get_china_stock_data(symbol, start_date, end_date)
-    
-    def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str) -> str:
-        """尝试备用数据源"""
-        logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源...")
-        
-        # 备用数据源优先级: Tushare > AKShare > BaoStock > TDX
-        fallback_order = [
-            ChinaDataSource.TUSHARE,
-            ChinaDataSource.AKSHARE,
-            ChinaDataSource.BAOSTOCK,
-            ChinaDataSource.TDX
-        ]
-        
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 尝试备用数据源: {source.value}")
-                    original_source = self.current_source
-                    self.current_source = source
-                    
-                    result = self.get_stock_data(symbol, start_date, end_date)
-                    
-                    # 恢复原数据源
-                    self.current_source = original_source
-                    
-                    if "❌" not in result:
-                        logger.info(f"✅ 备用数据源{source.value}获取成功")
-                        return result
-                        
-                except Exception as e:
-                    logger.error(f"❌ 备用数据源{source.value}也失败: {e}")
-                    continue
-        
-        return f"❌ 所有数据源都无法获取{symbol}的数据"
+        text = get_china_stock_data(symbol, start_date, end_date)
+        return StockDataResult.from_text(symbol, 'tdx', text, start_date, end_date)
     
     def get_stock_info(self, symbol: str) -> Dict:
         """获取股票基本信息"""
@@ -446,6 +626,21 @@ def get_data_source_manager() -> DataSourceManager:
     return _data_source_manager
 
 
+def get_china_stock_data_result(symbol: str, start_date: str, end_date: str) -> StockDataResult:
+    """
+    统一的中国股票数据获取接口（结构化结果）
+
+    Args:
+        symbol: 股票代码
+        start_date: 开始日期
+        end_date: 结束日期
+
+    Returns:
+        StockDataResult: DataFrame + 元数据 + 状态
+    """
+    return get_data_source_manager().get_stock_data_result(symbol, start_date, end_date)
+
+
 def get_china_stock_data_unified(symbol: str, start_date: str, end_date: str) -> str:
     """
     统一的中国股票数据获取接口
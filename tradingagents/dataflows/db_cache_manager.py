@@ -10,8 +10,11 @@ import pickle
 import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Union
+import base64
 import pandas as pd
 
+from .frame_serializer import get_frame_serializer, serialize_frame, deserialize_frame
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -71,6 +74,9 @@ class DatabaseCacheManager:
         self.mongodb_client = None  # 保留变量但不使用
         self.mongodb_db = None  # 保留变量但不使用
         self.redis_client = None
+
+        # DataFrame以列式二进制格式保存（Redis以decode_responses连接，二进制内容经base64编码）
+        self.frame_serializer = get_frame_serializer()
         
         # self._init_mongodb()  # MongoDB已禁用
         self._init_redis()
@@ -230,8 +236,9 @@ class DatabaseCacheManager:
         
         # 处理数据格式
         if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
-            doc["data_format"] = "dataframe_json"
+            file_format, payload = serialize_frame(data, self.frame_serializer)
+            doc["data"] = base64.b64encode(payload).decode('ascii')
+            doc["data_format"] = file_format
         else:
             doc["data"] = str(data)
             doc["data_format"] = "text"
@@ -278,10 +285,13 @@ class DatabaseCacheManager:
                     data_dict = json.loads(redis_data)
                     logger.info(f"⚡ 从Redis加载数据: {cache_key}")
                     
-                    if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
-                    else:
+                    data_format = data_dict["data_format"]
+                    if data_format == "text":
                         return data_dict["data"]
+                    if data_format == "dataframe_json":
+                        # 旧版JSON缓存
+                        return deserialize_frame(data_format, data_dict["data"])
+                    return deserialize_frame(data_format, base64.b64decode(data_dict["data"]))
             except Exception as e:
                 logger.error(f"⚠️ Redis加载失败: {e}")
         
@@ -1,11 +1,111 @@
 import json
 import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Optional
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
 
+class FinnhubDataFile:
+    """一个已解析的finnhub数据文件：保留原始键顺序，另建按日期键排序的索引"""
+
+    def __init__(self, data: dict):
+        # 只保留非空条目，区间查询时不再逐个判断
+        self.items = [(key, value) for key, value in data.items() if len(value) > 0]
+        self._positions = sorted(range(len(self.items)), key=lambda i: self.items[i][0])
+        self._sorted_keys = [self.items[i][0] for i in self._positions]
+
+    def range(self, start_date: str, end_date: str) -> dict:
+        """返回 start_date <= key <= end_date 的条目，顺序与原文件一致"""
+        lo = bisect_left(self._sorted_keys, start_date)
+        hi = bisect_right(self._sorted_keys, end_date)
+        return dict(self.items[i] for i in sorted(self._positions[lo:hi]))
+
+
+class FinnhubDataStore:
+    """所有finnhub数据类型共用的文件缓存，按文件mtime失效，按LRU限制内存占用"""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        初始化finnhub数据缓存
+
+        Args:
+            max_entries: 最多缓存的文件数，超出后淘汰最久未使用的
+        """
+        self.max_entries = max_entries
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> FinnhubDataFile:
+        """
+        获取已解析的数据文件，文件修改后自动重新加载
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            json.JSONDecodeError: 文件内容不是合法JSON
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == version:
+                self._files.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+
+        with open(path, "r", encoding="utf-8") as f:
+            data_file = FinnhubDataFile(json.load(f))
+
+        with self._lock:
+            self.misses += 1
+            self._files[path] = (version, data_file)
+            self._files.move_to_end(path)
+            while len(self._files) > self.max_entries:
+                evicted, _ = self._files.popitem(last=False)
+                logger.debug(f"🧹 finnhub数据缓存已满，淘汰: {os.path.basename(evicted)}")
+        return data_file
+
+    def invalidate(self, path: Optional[str] = None):
+        """清除指定文件或全部缓存"""
+        with self._lock:
+            if path is None:
+                self._files.clear()
+            else:
+                self._files.pop(os.path.abspath(path), None)
+
+    def get_statistics(self) -> Dict:
+        """获取命中统计"""
+        with self._lock:
+            return {
+                'entries': len(self._files),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# 全局实例
+_finnhub_store: Optional[FinnhubDataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_finnhub_store() -> FinnhubDataStore:
+    """获取全局finnhub数据缓存实例"""
+    global _finnhub_store
+    if _finnhub_store is None:
+        with _store_lock:
+            if _finnhub_store is None:
+                _finnhub_store = FinnhubDataStore()
+    return _finnhub_store
+
 
 def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=None):
     """
@@ -36,8 +136,8 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
             logger.warning(f"⚠️ [DEBUG] 请确保已下载相关数据或检查数据目录配置")
             return {}
         
-        with open(data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # 每个文件只解析一次，返回的条目与缓存共享，调用方不得原地修改
+        data_file = get_finnhub_store().get(data_path)
     except FileNotFoundError:
         logger.error(f"❌ [ERROR] 文件未找到: {data_path}")
         return {}
@@ -49,8 +149,4 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
         return {}
 
     # filter keys (date, str in format YYYY-MM-DD) by the date range (str, str in format YYYY-MM-DD)
-    filtered_data = {}
-    for key, value in data.items():
-        if start_date <= key <= end_date and len(value) > 0:
-            filtered_data[key] = value
-    return filtered_data
+    return data_file.range(start_date, end_date)
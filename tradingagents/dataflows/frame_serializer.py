@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+DataFrame缓存序列化器
+默认使用列式二进制格式（Arrow IPC/Feather），保证dtype和索引往返一致；
+旧版CSV/JSON缓存通过兼容路径继续加载
+"""
+
+import io
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    PYARROW_AVAILABLE = False
+    logger.warning(f"⚠️ pyarrow 未安装，DataFrame缓存将使用pickle格式")
+
+
+class FrameSerializer:
+    """DataFrame序列化器基类"""
+
+    name = "base"
+    file_format = "bin"
+
+    def dumps(self, data: pd.DataFrame) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, payload: bytes) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class FeatherSerializer(FrameSerializer):
+    """Arrow IPC（Feather v2）格式，索引和dtype保存在schema元数据中"""
+
+    name = "feather"
+    file_format = "feather"
+
+    def dumps(self, data: pd.DataFrame) -> bytes:
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def loads(self, payload: bytes) -> pd.DataFrame:
+        return pa.ipc.open_file(pa.py_buffer(payload)).read_all().to_pandas()
+
+
+class ParquetSerializer(FrameSerializer):
+    """Parquet格式，体积更小，适合长期保存"""
+
+    name = "parquet"
+    file_format = "parquet"
+
+    def dumps(self, data: pd.DataFrame) -> bytes:
+        buffer = io.BytesIO()
+        data.to_parquet(buffer, engine="pyarrow", index=True)
+        return buffer.getvalue()
+
+    def loads(self, payload: bytes) -> pd.DataFrame:
+        return pd.read_parquet(io.BytesIO(payload), engine="pyarrow")
+
+
+class PickleSerializer(FrameSerializer):
+    """pickle格式，pyarrow不可用或列类型无法转换为Arrow时使用"""
+
+    name = "pickle"
+    file_format = "pkl"
+
+    def dumps(self, data: pd.DataFrame) -> bytes:
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, payload: bytes) -> pd.DataFrame:
+        return pickle.loads(payload)
+
+
+SERIALIZERS: Dict[str, FrameSerializer] = {
+    serializer.name: serializer
+    for serializer in (FeatherSerializer(), ParquetSerializer(), PickleSerializer())
+}
+
+# 文件扩展名/存储格式名 -> 序列化器
+_FORMATS: Dict[str, FrameSerializer] = {
+    serializer.file_format: serializer for serializer in SERIALIZERS.values()
+}
+
+
+def get_frame_serializer(name: Optional[str] = None) -> FrameSerializer:
+    """
+    获取序列化器
+
+    Args:
+        name: feather/parquet/pickle，None时读取环境变量 TRADINGAGENTS_CACHE_SERIALIZER，默认feather
+    """
+    name = (name or os.getenv("TRADINGAGENTS_CACHE_SERIALIZER") or "feather").lower()
+    serializer = SERIALIZERS.get(name)
+    if serializer is None:
+        logger.warning(f"⚠️ 未知的缓存序列化格式 {name}，使用feather")
+        serializer = SERIALIZERS["feather"]
+    if serializer.name in ("feather", "parquet") and not PYARROW_AVAILABLE:
+        serializer = SERIALIZERS["pickle"]
+    return serializer
+
+
+def serialize_frame(data: pd.DataFrame, serializer: Optional[FrameSerializer] = None) -> Tuple[str, bytes]:
+    """
+    序列化DataFrame
+
+    Returns:
+        (实际使用的存储格式, 二进制内容)，列类型无法转换为Arrow时自动退回pickle
+    """
+    serializer = serializer or get_frame_serializer()
+    try:
+        return serializer.file_format, serializer.dumps(data)
+    except Exception as e:
+        if serializer.name == "pickle":
+            raise
+        logger.debug(f"📦 {serializer.name}序列化失败，退回pickle: {e}")
+        fallback = SERIALIZERS["pickle"]
+        return fallback.file_format, fallback.dumps(data)
+
+
+def deserialize_frame(file_format: str, payload) -> pd.DataFrame:
+    """
+    按存储格式反序列化DataFrame
+
+    兼容旧版格式：csv（to_csv输出，第一列为索引）、dataframe_json（to_json(orient='records')）
+    """
+    if file_format == "csv":
+        text = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+        return pd.read_csv(io.StringIO(text), index_col=0)
+    if file_format == "dataframe_json":
+        text = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+        return pd.read_json(io.StringIO(text), orient="records")
+
+    serializer = _FORMATS.get(file_format)
+    if serializer is None:
+        raise ValueError(f"不支持的DataFrame缓存格式: {file_format}")
+    return serializer.loads(payload)
@@ -1,5 +1,4 @@
 import json
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import time
@@ -14,6 +13,7 @@ from tenacity import (
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.http_clients import get_http_session
 logger = get_logger('agents')
 
 
@@ -31,16 +31,26 @@ def make_request(url, headers):
     """Make a request with retry logic for rate limiting"""
     # Random delay before each request to avoid detection
     time.sleep(random.uniform(2, 6))
-    response = requests.get(url, headers=headers)
+    response = get_http_session(url).get(url, headers=headers)
     return response
 
 
-def getNewsData(query, start_date, end_date):
+def getNewsData(query, start_date, end_date, known_links=None):
     """
     Scrape Google News search results for a given query and date range.
     query: str - search query
     start_date: str - start date in the format yyyy-mm-dd or mm/dd/yyyy
     end_date: str - end date in the format yyyy-mm-dd or mm/dd/yyyy
+    known_links: set - links of already cached articles; paging stops after
+        the first page that contains one of them
+    """
+    news_results, _ = _scrape_news(query, start_date, end_date, known_links)
+    return news_results
+
+
+def _scrape_news(query, start_date, end_date, known_links=None):
+    """
+    getNewsData的实现，返回 (新文章列表, 是否因遇到已缓存文章而停止翻页)
     """
     if "-" in start_date:
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
@@ -57,7 +67,9 @@ def getNewsData(query, start_date, end_date):
         )
     }
 
+    known_links = known_links or set()
     news_results = []
+    reached_cached = False
     page = 0
     while True:
         offset = page * 10
@@ -82,6 +94,9 @@ def getNewsData(query, start_date, end_date):
                     snippet = el.select_one(".GI74Re").get_text()
                     date = el.select_one(".LfVVr").get_text()
                     source = el.select_one(".NUnG9d span").get_text()
+                    if link in known_links:
+                        reached_cached = True
+                        continue
                     news_results.append(
                         {
                             "link": link,
@@ -96,7 +111,10 @@ def getNewsData(query, start_date, end_date):
                     # If one of the fields is not found, skip this result
                     continue
 
-            # Update the progress bar with the current count of results scraped
+            # 后续页面的文章已在缓存中，不再翻页
+            if reached_cached:
+                logger.debug(f"📋 [Google新闻] 第{page + 1}页遇到已缓存文章，停止翻页")
+                break
 
             # Check for the "Next" link (pagination)
             next_link = soup.find("a", id="pnnext")
@@ -109,4 +127,50 @@ def getNewsData(query, start_date, end_date):
             logger.error(f"Failed after multiple retries: {e}")
             break
 
+    return news_results, reached_cached
+
+
+def _to_iso_date(date_str):
+    if "/" in date_str:
+        return datetime.strptime(date_str, "%m/%d/%Y").strftime("%Y-%m-%d")
+    return date_str
+
+
+def get_cached_news_data(query, start_date, end_date):
+    """
+    getNewsData with a disk cache keyed by normalized query + date window.
+
+    Fresh entries are returned without scraping. Expired entries (windows that
+    include today or yesterday) are refreshed incrementally: paging stops at the
+    first cached article and new results are merged in front of the cached ones.
+    A refresh that reaches a cached article re-saves the entry even without new
+    results, so its cache time advances and a window that has since closed
+    becomes permanent.
+    """
+    start_date, end_date = _to_iso_date(start_date), _to_iso_date(end_date)
+    try:
+        from .cache_manager import get_cache
+        cache = get_cache()
+        cached, fresh = cache.load_google_news(query, start_date, end_date)
+    except Exception as e:
+        logger.warning(f"⚠️ 新闻缓存不可用，直接抓取: {e}")
+        return getNewsData(query, start_date, end_date)
+
+    if cached is not None and fresh:
+        logger.info(f"⚡ [Google新闻] 缓存命中: {query} ({start_date}~{end_date}, {len(cached)}条)")
+        return cached
+
+    cached = cached or []
+    new_results, reached_cached = _scrape_news(query, start_date, end_date,
+                                               known_links={news["link"] for news in cached})
+    new_links = {news["link"] for news in new_results}
+    news_results = new_results + [news for news in cached if news["link"] not in new_links]
+
+    # 遇到已缓存文章说明抓取成功，即使没有新文章也要刷新缓存时间；
+    # 既没有新结果也没遇到已缓存文章时可能是抓取失败，不刷新已有缓存，也不缓存空结果
+    if new_results or reached_cached:
+        try:
+            cache.save_google_news(query, start_date, end_date, news_results)
+        except Exception as e:
+            logger.warning(f"⚠️ 保存新闻缓存失败: {e}")
     return news_results
@@ -14,6 +14,9 @@ import os
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .rate_limiter import wait_for_api
+from .provider_executor import run_blocking
+
 
 
 class HKStockProvider:
@@ -21,8 +24,6 @@ class HKStockProvider:
 
     def __init__(self):
         """初始化港股数据提供器"""
-        self.last_request_time = 0
-        self.min_request_interval = 2.0  # 增加请求间隔到2秒
         self.timeout = 60  # 请求超时时间（增加到60秒）
         self.max_retries = 3  # 增加重试次数
         self.rate_limit_wait = 60  # 遇到限制时等待时间
@@ -30,15 +31,8 @@ class HKStockProvider:
         logger.info(f"🇭🇰 港股数据提供器初始化完成")
     
     def _wait_for_rate_limit(self):
-        """等待速率限制"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        """等待速率限制 - 使用全局频率限制器的yfinance令牌桶"""
+        wait_for_api("yfinance", "hk_stock_utils")
     
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> Optional[pd.DataFrame]:
         """
@@ -71,11 +65,11 @@ class HKStockProvider:
                     
                     # 使用yfinance获取数据
                     ticker = yf.Ticker(symbol)
-                    data = ticker.history(
+                    data = run_blocking("yfinance", lambda: ticker.history(
                         start=start_date,
                         end=end_date,
                         timeout=self.timeout
-                    )
+                    ))
                     
                     if not data.empty:
                         # 数据预处理
@@ -128,7 +122,7 @@ class HKStockProvider:
             self._wait_for_rate_limit()
             
             ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = run_blocking("yfinance", lambda: ticker.info)
             
             if info and 'symbol' in info:
                 return {
@@ -179,7 +173,7 @@ class HKStockProvider:
             ticker = yf.Ticker(symbol)
             
             # 获取最新的历史数据（1天）
-            data = ticker.history(period="1d", timeout=self.timeout)
+            data = run_blocking("yfinance", lambda: ticker.history(period="1d", timeout=self.timeout))
             
             if not data.empty:
                 latest = data.iloc[-1]
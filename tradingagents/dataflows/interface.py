@@ -1,9 +1,11 @@
 from typing import Annotated, Dict
 import time
 import os
-from .reddit_utils import fetch_top_from_category
+from .reddit_utils import fetch_top_from_category, fetch_top_from_category_range
 from .chinese_finance_utils import get_chinese_social_sentiment
 from .googlenews_utils import *
+from .news_memo import memoized_news
+from .provider_executor import run_blocking
 from .finnhub_utils import get_data_in_range
 
 # 导入统一日志系统
@@ -50,8 +52,7 @@ from datetime import datetime
 import json
 import os
 import pandas as pd
-from tqdm import tqdm
-from openai import OpenAI
+from tradingagents.utils.http_clients import get_openai_client
 
 # 尝试导入yfinance，如果失败则设置为None
 try:
@@ -62,6 +63,8 @@ except ImportError as e:
     yf = None
     YF_AVAILABLE = False
 from .config import get_config, set_config, DATA_DIR
+from .price_store import get_price_store
+from .simfin_store import get_simfin_store
 
 
 def get_finnhub_news(
@@ -213,26 +216,15 @@ def get_simfin_balance_sheet(
         "us",
         f"us-balance-{freq}.csv",
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    # The CSV is parsed once per process (and cached in columnar form next to it);
+    # the latest statement published on or before curr_date is a binary search
+    latest_balance_sheet = get_simfin_store().latest_statement(data_path, ticker, curr_date)
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_balance_sheet is None:
         logger.info(f"No balance sheet available before the given current date.")
         return ""
 
-    # Get the most recent balance sheet by selecting the row with the latest Publish Date
-    latest_balance_sheet = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_balance_sheet = latest_balance_sheet.drop("SimFinId")
 
@@ -260,26 +252,15 @@ def get_simfin_cashflow(
         "us",
         f"us-cashflow-{freq}.csv",
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    # The CSV is parsed once per process (and cached in columnar form next to it);
+    # the latest statement published on or before curr_date is a binary search
+    latest_cash_flow = get_simfin_store().latest_statement(data_path, ticker, curr_date)
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_cash_flow is None:
         logger.info(f"No cash flow statement available before the given current date.")
         return ""
 
-    # Get the most recent cash flow statement by selecting the row with the latest Publish Date
-    latest_cash_flow = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_cash_flow = latest_cash_flow.drop("SimFinId")
 
@@ -307,26 +288,15 @@ def get_simfin_income_statements(
         "us",
         f"us-income-{freq}.csv",
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    # The CSV is parsed once per process (and cached in columnar form next to it);
+    # the latest statement published on or before curr_date is a binary search
+    latest_income = get_simfin_store().latest_statement(data_path, ticker, curr_date)
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_income is None:
         logger.info(f"No income statement available before the given current date.")
         return ""
 
-    # Get the most recent income statement by selecting the row with the latest Publish Date
-    latest_income = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_income = latest_income.drop("SimFinId")
 
@@ -348,7 +318,11 @@ def get_google_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    news_results = getNewsData(query, before, curr_date)
+    # 同一次分析中相同查询和日期窗口只抓取一次
+    news_results = memoized_news(
+        "google_news", query, before, curr_date,
+        lambda: get_cached_news_data(query, before, curr_date),
+    )
 
     news_str = ""
 
@@ -381,26 +355,15 @@ def get_reddit_global_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
-    curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
-
-    while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "global_news",
-            curr_date_str,
-            max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
-        curr_date += relativedelta(days=1)
-        pbar.update(1)
-
-    pbar.close()
+    # one range query over the pre-built index covers every day in the window
+    posts = fetch_top_from_category_range(
+        "global_news",
+        before,
+        start_date.strftime("%Y-%m-%d"),
+        max_limit_per_day,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
+    )
+    curr_date = start_date + relativedelta(days=1)
 
     if len(posts) == 0:
         return ""
@@ -435,31 +398,16 @@ def get_reddit_company_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
-    curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(
-        desc=f"Getting Company News for {ticker} on {start_date}",
-        total=total_iterations,
+    # one range query over the pre-built index covers every day in the window
+    posts = fetch_top_from_category_range(
+        "company_news",
+        before,
+        start_date.strftime("%Y-%m-%d"),
+        max_limit_per_day,
+        ticker,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
     )
-
-    while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "company_news",
-            curr_date_str,
-            max_limit_per_day,
-            ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
-        curr_date += relativedelta(days=1)
-
-        pbar.update(1)
-
-    pbar.close()
+    curr_date = start_date + relativedelta(days=1)
 
     if len(posts) == 0:
         return ""
@@ -566,39 +514,45 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
+    # every calendar day in the window, newest first
+    window_dates = []
+    day = curr_date
+    while day >= before:
+        window_dates.append(day.strftime("%Y-%m-%d"))
+        day = day - relativedelta(days=1)
+
+    # load the price frame once and compute the indicator column once,
+    # instead of re-reading the CSV for every day of the window
+    data_dir = os.path.join(DATA_DIR, "market_data", "price_data")
     if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
+        data = StockstatsUtils.load_price_data(symbol, data_dir, online)
+        trading_dates = set(
+            pd.to_datetime(data["Date"], utc=True).astype(str).str[:10]
         )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+        # only do the trading dates
+        window_dates = [d for d in window_dates if d in trading_dates]
+        try:
+            by_date = StockstatsUtils.compute_indicators(data, [indicator])[indicator]
+            values = {d: str(by_date.get(d, NOT_TRADING_DAY)) for d in window_dates}
+        except Exception as e:
+            print(
+                f"Error getting stockstats indicator data for indicator {indicator} from {before.strftime('%Y-%m-%d')} to {end_date}: {e}"
+            )
+            values = {d: "" for d in window_dates}
     else:
         # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
+        try:
+            window = StockstatsUtils.get_stock_stats_window(
+                symbol, [indicator], window_dates, data_dir, online=online
             )
+            values = {d: str(v) for d, v in window[indicator].items()}
+        except Exception as e:
+            print(
+                f"Error getting stockstats indicator data for indicator {indicator} from {before.strftime('%Y-%m-%d')} to {end_date}: {e}"
+            )
+            values = {d: "" for d in window_dates}
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+    ind_string = "".join(f"{d}: {values[d]}\n" for d in window_dates)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -649,24 +603,13 @@ def get_YFin_data_window(
     before = date_obj - relativedelta(days=look_back_days)
     start_date = before.strftime("%Y-%m-%d")
 
-    # read in data
-    data = pd.read_csv(
+    # read the rows from the process-wide price store instead of the disk
+    filtered_data = get_price_store().get(
         os.path.join(
             DATA_DIR,
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
         )
-    )
-
-    # Extract just the date part for comparison
-    data["DateOnly"] = data["Date"].str[:10]
-
-    # Filter data between the start and end dates (inclusive)
-    filtered_data = data[
-        (data["DateOnly"] >= start_date) & (data["DateOnly"] <= curr_date)
-    ]
-
-    # Drop the temporary column we created
-    filtered_data = filtered_data.drop("DateOnly", axis=1)
+    ).slice(start_date, curr_date)
 
     # Set pandas display options to show the full DataFrame
     with pd.option_context(
@@ -696,7 +639,7 @@ def get_YFin_data_online(
     ticker = yf.Ticker(symbol.upper())
 
     # Fetch historical data for the specified date range
-    data = ticker.history(start=start_date, end=end_date)
+    data = run_blocking("yfinance", lambda: ticker.history(start=start_date, end=end_date))
 
     # Check if data is empty
     if data.empty:
@@ -731,7 +674,7 @@ def get_YFin_data(
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ) -> str:
     # read in data
-    data = pd.read_csv(
+    price_frame = get_price_store().get(
         os.path.join(
             DATA_DIR,
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
@@ -743,16 +686,8 @@ def get_YFin_data(
             f"Get_YFin_Data: {end_date} is outside of the data range of 2015-01-01 to 2025-03-25"
         )
 
-    # Extract just the date part for comparison
-    data["DateOnly"] = data["Date"].str[:10]
-
     # Filter data between the start and end dates (inclusive)
-    filtered_data = data[
-        (data["DateOnly"] >= start_date) & (data["DateOnly"] <= end_date)
-    ]
-
-    # Drop the temporary column we created
-    filtered_data = filtered_data.drop("DateOnly", axis=1)
+    filtered_data = price_frame.slice(start_date, end_date)
 
     # remove the index from the dataframe
     filtered_data = filtered_data.reset_index(drop=True)
@@ -762,7 +697,7 @@ def get_YFin_data(
 
 def get_stock_news_openai(ticker, curr_date):
     config = get_config()
-    client = OpenAI(base_url=config["backend_url"])
+    client = get_openai_client(config["backend_url"])
 
     response = client.responses.create(
         model=config["quick_think_llm"],
@@ -797,7 +732,7 @@ def get_stock_news_openai(ticker, curr_date):
 
 def get_global_news_openai(curr_date):
     config = get_config()
-    client = OpenAI(base_url=config["backend_url"])
+    client = get_openai_client(config["backend_url"])
 
     response = client.responses.create(
         model=config["quick_think_llm"],
@@ -1013,7 +948,7 @@ def get_fundamentals_openai(ticker, curr_date):
         
         logger.debug(f"📊 [DEBUG] 尝试使用OpenAI获取 {ticker} 的基本面数据...")
         
-        client = OpenAI(base_url=config["backend_url"])
+        client = get_openai_client(config["backend_url"])
 
         response = client.responses.create(
             model=config["quick_think_llm"],
@@ -1060,13 +995,9 @@ def get_fundamentals_openai(ticker, curr_date):
 
 # ==================== Tushare数据接口 ====================
 
-def get_china_stock_data_tushare(
-    ticker: Annotated[str, "中国股票代码，如：000001、600036等"],
-    start_date: Annotated[str, "开始日期，格式：YYYY-MM-DD"],
-    end_date: Annotated[str, "结束日期，格式：YYYY-MM-DD"]
-) -> str:
+def get_china_stock_data_tushare_result(ticker: str, start_date: str, end_date: str):
     """
-    使用Tushare获取中国A股历史数据
+    使用Tushare获取中国A股历史数据（结构化结果）
 
     Args:
         ticker: 股票代码
@@ -1074,8 +1005,10 @@ def get_china_stock_data_tushare(
         end_date: 结束日期
 
     Returns:
-        str: 格式化的股票数据报告
+        StockDataResult: DataFrame + 股票名称等元数据
     """
+    from .stock_data_result import StockDataResult
+
     try:
         from .tushare_adapter import get_tushare_adapter
 
@@ -1091,68 +1024,39 @@ def get_china_stock_data_tushare(
         data = adapter.get_stock_data(ticker, start_date, end_date)
         logger.info(f"🔍 [股票代码追踪] adapter.get_stock_data 返回数据形状: {data.shape if data is not None and hasattr(data, 'shape') else 'None'}")
 
+        stock_name = None
         if data is not None and not data.empty:
             # 获取股票基本信息
             stock_info = adapter.get_stock_info(ticker)
             stock_name = stock_info.get('name', f'股票{ticker}') if stock_info else f'股票{ticker}'
 
-            # 计算最新价格和涨跌幅
-            latest_data = data.iloc[-1]
-            current_price = f"¥{latest_data['close']:.2f}"
-
-            if len(data) > 1:
-                prev_close = data.iloc[-2]['close']
-                change = latest_data['close'] - prev_close
-                change_pct = (change / prev_close) * 100
-                change_pct_str = f"{change_pct:+.2f}%"
-            else:
-                change_pct_str = "N/A"
-
-            # 格式化成交量 - 修复成交量显示问题
-            volume = 0
-            if 'vol' in latest_data.index:
-                volume = latest_data['vol']
-            elif 'volume' in latest_data.index:
-                volume = latest_data['volume']
-
-            # 处理NaN值
-            import pandas as pd
-            if pd.isna(volume):
-                volume = 0
-
-            if volume > 10000:
-                volume_str = f"{volume/10000:.1f}万手"
-            elif volume > 0:
-                volume_str = f"{volume:.0f}手"
-            else:
-                volume_str = "暂无数据"
-
-            # 转换为与TDX兼容的字符串格式
-            result = f"# {ticker} 股票数据分析\n\n"
-            result += f"## 📊 实时行情\n"
-            result += f"- 股票名称: {stock_name}\n"
-            result += f"- 股票代码: {ticker}\n"
-            result += f"- 当前价格: {current_price}\n"
-            result += f"- 涨跌幅: {change_pct_str}\n"
-            result += f"- 成交量: {volume_str}\n"
-            result += f"- 数据来源: Tushare\n\n"
-            result += f"## 📈 历史数据概览\n"
-            result += f"- 数据期间: {start_date} 至 {end_date}\n"
-            result += f"- 数据条数: {len(data)}条\n"
-
-            if len(data) > 0:
-                period_high = data['high'].max()
-                period_low = data['low'].min()
-                result += f"- 期间最高: ¥{period_high:.2f}\n"
-                result += f"- 期间最低: ¥{period_low:.2f}\n\n"
-
-            result += "## 📋 最新交易数据\n"
-            result += data.tail(5).to_string(index=False)
+        return StockDataResult.from_frame(ticker, 'tushare', data, start_date, end_date, stock_name=stock_name)
 
-            return result
-        else:
-            return f"❌ 未能获取{ticker}的股票数据"
+    except Exception as e:
+        logger.error(f"❌ [Tushare] 获取股票数据失败: {e}")
+        return StockDataResult.failure(ticker, 'tushare', f"❌ 获取{ticker}股票数据失败: {e}",
+                                       start_date=start_date, end_date=end_date)
 
+
+def get_china_stock_data_tushare(
+    ticker: Annotated[str, "中国股票代码，如：000001、600036等"],
+    start_date: Annotated[str, "开始日期，格式：YYYY-MM-DD"],
+    end_date: Annotated[str, "结束日期，格式：YYYY-MM-DD"]
+) -> str:
+    """
+    使用Tushare获取中国A股历史数据
+
+    Args:
+        ticker: 股票代码
+        start_date: 开始日期
+        end_date: 结束日期
+
+    Returns:
+        str: 格式化的股票数据报告
+    """
+    result = get_china_stock_data_tushare_result(ticker, start_date, end_date)
+    try:
+        return result.render()
     except Exception as e:
         logger.error(f"❌ [Tushare] 获取股票数据失败: {e}")
         return f"❌ 获取{ticker}股票数据失败: {e}"
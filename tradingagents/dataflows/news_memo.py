@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+单次分析范围内的新闻请求备忘录
+同一次 propagate 中，情绪工具、新闻工具和中文财经聚合器会以相同的查询和日期窗口
+反复抓取Google新闻，每次都要付出随机等待。备忘录按 (数据源, 查询, 起止日期) 缓存结果，
+并保证并发的相同请求只发起一次抓取（single-flight），其余调用等待同一个结果。
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class NewsMemo:
+    """一次分析运行内共享的新闻结果备忘录"""
+
+    def __init__(self):
+        self._entries: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, key: Tuple[Hashable, ...], fetch: Callable[[], Any]) -> Any:
+        """
+        返回key对应的结果，首次请求时调用fetch
+
+        并发的相同请求等待同一次抓取；抓取失败不会被记住，
+        已在等待的调用收到同一个异常，之后的调用会重新抓取
+        """
+        with self._lock:
+            future = self._entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            logger.debug(f"📋 [新闻备忘录] 复用结果: {key}")
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._entries.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(value)
+        return value
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_current_memo: ContextVar[Optional[NewsMemo]] = ContextVar('news_memo', default=None)
+
+
+def get_current_memo() -> Optional[NewsMemo]:
+    """当前分析运行的备忘录，不在运行范围内时返回None"""
+    return _current_memo.get()
+
+
+@contextmanager
+def news_memo_scope():
+    """
+    为一次分析运行开启新闻备忘录
+
+    备忘录保存在contextvar中：LangGraph的节点线程和工具调用线程池会复制上下文，
+    因此同一次运行中的所有工具共享它，而并发的其他运行各自独立。
+    嵌套调用复用外层备忘录。
+    """
+    memo = _current_memo.get()
+    if memo is not None:
+        yield memo
+        return
+
+    memo = NewsMemo()
+    token = _current_memo.set(memo)
+    start_time = time.time()
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+        stats = memo.get_statistics()
+        if stats['hits']:
+            logger.info(f"📋 [新闻备忘录] 本次分析抓取 {stats['misses']} 次，复用 {stats['hits']} 次，"
+                        f"耗时 {time.time() - start_time:.1f}s")
+
+
+def memoized_news(source: str, query: str, start_date: str, end_date: str,
+                  fetch: Callable[[], Any]) -> Any:
+    """在当前运行的备忘录中按 (数据源, 查询, 日期窗口) 去重；没有备忘录时直接抓取"""
+    memo = _current_memo.get()
+    if memo is None:
+        return fetch()
+    return memo.get_or_fetch((source, query, start_date, end_date), fetch)
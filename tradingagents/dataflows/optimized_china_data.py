@@ -8,10 +8,11 @@ import os
 import time
 import random
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from .cache_manager import get_cache
 from .config import get_config
 from .rate_limiter import wait_for_tushare_api, get_api_statistics
+from .stock_data_result import StockDataResult, STATUS_ERROR
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -53,6 +54,22 @@ class OptimizedChinaDataProvider:
         Returns:
             格式化的股票数据字符串
         """
+        return self.get_stock_data_result(symbol, start_date, end_date, force_refresh).render()
+
+    def get_stock_data_result(self, symbol: str, start_date: str, end_date: str,
+                              force_refresh: bool = False) -> StockDataResult:
+        """
+        获取A股数据（结构化结果） - 优先使用缓存，缓存中保存DataFrame而非渲染后的文本
+
+        Args:
+            symbol: 股票代码（6位数字）
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            force_refresh: 是否强制刷新缓存
+
+        Returns:
+            StockDataResult；获取失败且无旧缓存时为包含备用说明文本的失败结果
+        """
         logger.info(f"📈 获取A股数据: {symbol} ({start_date} 到 {end_date})")
         
         # 检查缓存（除非强制刷新）
@@ -61,16 +78,18 @@ class OptimizedChinaDataProvider:
                 symbol=symbol,
                 start_date=start_date,
                 end_date=end_date,
-                data_source="tdx"
+                data_source="unified"
             )
             
             if cache_key:
                 cached_data = self.cache.load_stock_data(cache_key)
-                if cached_data:
-                    logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
-                    return cached_data
+                if cached_data is not None:
+                    cached_result = StockDataResult.from_cache(cached_data, symbol, start_date, end_date)
+                    if cached_result.ok:
+                        logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
+                        return cached_result
         
-        # 缓存未命中，从Tushare数据接口获取
+        # 缓存未命中，从Tushare数据接口获取（Tushare适配器按日线序列缓存，只请求缺失的日期）
         logger.info(f"🌐 从Tushare数据接口获取数据: {symbol}")
         
         try:
@@ -78,16 +97,16 @@ class OptimizedChinaDataProvider:
             self._wait_for_rate_limit()
             
             # 调用统一数据源接口（默认Tushare，支持备用数据源）
-            from .data_source_manager import get_china_stock_data_unified
+            from .data_source_manager import get_china_stock_data_result
 
-            formatted_data = get_china_stock_data_unified(
+            result = get_china_stock_data_result(
                 symbol=symbol,
                 start_date=start_date,
                 end_date=end_date
             )
 
             # 检查是否获取成功
-            if "❌" in formatted_data or "错误" in formatted_data:
+            if not result.ok:
                 logger.error(f"❌ 数据源API调用失败: {symbol}")
                 # 尝试从旧缓存获取数据
                 old_cache = self._try_get_old_cache(symbol, start_date, end_date)
@@ -96,19 +115,19 @@ class OptimizedChinaDataProvider:
                     return old_cache
 
                 # 生成备用数据
-                return self._generate_fallback_data(symbol, start_date, end_date, "数据源API调用失败")
+                return self._fallback_result(symbol, start_date, end_date, "数据源API调用失败")
             
-            # 保存到缓存
+            # 保存到缓存（DataFrame按列式格式保存，TDX等文本结果按原文保存）
             self.cache.save_stock_data(
                 symbol=symbol,
-                data=formatted_data,
+                data=result.to_frame() if result.data is not None else result.text,
                 start_date=start_date,
                 end_date=end_date,
                 data_source="unified"  # 使用统一数据源标识
             )
             
             logger.info(f"✅ A股数据获取成功: {symbol}")
-            return formatted_data
+            return result
             
         except Exception as e:
             error_msg = f"Tushare数据接口调用异常: {str(e)}"
@@ -121,7 +140,7 @@ class OptimizedChinaDataProvider:
                 return old_cache
             
             # 生成备用数据
-            return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
+            return self._fallback_result(symbol, start_date, end_date, error_msg)
     
     def get_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
         """
@@ -138,25 +157,13 @@ class OptimizedChinaDataProvider:
         
         # 检查缓存（除非强制刷新）
         if not force_refresh:
-            # 查找基本面数据缓存
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
-                try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    if (metadata.get('symbol') == symbol and 
-                        metadata.get('data_type') == 'fundamentals' and
-                        metadata.get('market_type') == 'china'):
-                        
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        if self.cache.is_cache_valid(cache_key, symbol=symbol, data_type='fundamentals'):
-                            cached_data = self.cache.load_stock_data(cache_key)
-                            if cached_data:
-                                logger.info(f"⚡ 从缓存加载A股基本面数据: {symbol}")
-                                return cached_data
-                except Exception:
-                    continue
+            # 从缓存索引查找基本面数据
+            cache_key = self.cache.find_cached_fundamentals_data(symbol)
+            if cache_key:
+                cached_data = self.cache.load_fundamentals_data(cache_key)
+                if cached_data:
+                    logger.info(f"⚡ 从缓存加载A股基本面数据: {symbol}")
+                    return cached_data
         
         # 缓存未命中，生成基本面分析
         logger.debug(f"🔍 生成A股基本面分析: {symbol}")
@@ -166,7 +173,7 @@ class OptimizedChinaDataProvider:
             current_date = datetime.now().strftime('%Y-%m-%d')
             start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
             
-            stock_data = self.get_stock_data(symbol, start_date, current_date)
+            stock_data = self.get_stock_data_result(symbol, start_date, current_date)
             
             # 生成基本面分析报告
             fundamentals_data = self._generate_fundamentals_report(symbol, stock_data)
@@ -186,8 +193,19 @@ class OptimizedChinaDataProvider:
             logger.error(f"❌ {error_msg}")
             return self._generate_fallback_fundamentals(symbol, error_msg)
     
-    def _generate_fundamentals_report(self, symbol: str, stock_data: str) -> str:
-        """基于股票数据生成真实的基本面分析报告"""
+    def _generate_fundamentals_report(self, symbol: str, stock_data: Union[StockDataResult, str]) -> str:
+        """
+        基于股票数据生成真实的基本面分析报告
+
+        Args:
+            symbol: 股票代码
+            stock_data: 结构化行情结果；也兼容格式化文本（TDX、旧版缓存）
+        """
+        if isinstance(stock_data, StockDataResult):
+            if stock_data.data is None:
+                stock_data = stock_data.render()
+            else:
+                return self._build_fundamentals_report(symbol, *self._quote_from_result(stock_data))
 
         # 添加详细的股票代码追踪日志
         logger.debug(f"🔍 [股票代码追踪] _generate_fundamentals_report 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
@@ -195,8 +213,7 @@ class OptimizedChinaDataProvider:
         logger.debug(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
         logger.debug(f"🔍 [股票代码追踪] 接收到的股票数据前200字符: {stock_data[:200] if stock_data else 'None'}")
 
-        # 从股票数据中提取信息
-        company_name = "未知公司"
+        # 从股票数据文本中提取信息
         current_price = "N/A"
         volume = "N/A"
         change_pct = "N/A"
@@ -277,13 +294,25 @@ class OptimizedChinaDataProvider:
                             logger.warning(f"⚠️ 解析股票数据字段时出错: {e}")
                             # 保持默认值
             
-            # 尝试从股票代码获取公司名称（简单映射）
-            company_name = self._get_company_name_by_code(symbol)
-            
         except Exception as e:
             logger.warning(f"⚠️ 解析股票数据时出错: {e}")
             # 保持默认值
 
+        return self._build_fundamentals_report(symbol, current_price, change_pct, volume)
+
+    def _quote_from_result(self, result: StockDataResult):
+        """直接从DataFrame取当前价格、涨跌幅和成交量，无需解析文本"""
+        latest_close = result.latest_close()
+        change_pct = result.change_pct()
+        current_price = f"¥{latest_close:.2f}" if latest_close is not None else "N/A"
+        change_pct = f"{change_pct:+.2f}%" if change_pct is not None else "N/A"
+        return current_price, change_pct, result.format_volume()
+
+    def _build_fundamentals_report(self, symbol: str, current_price: str, change_pct: str, volume: str) -> str:
+        """按行情摘要生成基本面分析报告"""
+        # 尝试从股票代码获取公司名称（简单映射）
+        company_name = self._get_company_name_by_code(symbol)
+
         # 根据股票代码判断行业和基本信息
         logger.debug(f"🔍 [股票代码追踪] 调用 _get_industry_info，传入参数: '{symbol}'")
         industry_info = self._get_industry_info(symbol)
@@ -631,31 +660,27 @@ class OptimizedChinaDataProvider:
 - 建议等待基本面改善或估值回落
 - 风险承受能力较低的投资者应避免"""
     
-    def _try_get_old_cache(self, symbol: str, start_date: str, end_date: str) -> Optional[str]:
+    def _try_get_old_cache(self, symbol: str, start_date: str, end_date: str) -> Optional[StockDataResult]:
         """尝试获取过期的缓存数据作为备用"""
         try:
-            # 查找任何相关的缓存，不考虑TTL
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
-                try:
-                    import json
-
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    if (metadata.get('symbol') == symbol and 
-                        metadata.get('data_type') == 'stock_data' and
-                        metadata.get('market_type') == 'china'):
-                        
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
-                            return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
-                except Exception:
-                    continue
+            # 查找任何相关的缓存，不考虑TTL（按缓存时间从新到旧）
+            for metadata in self.cache.find_cache_entries(symbol, 'stock_data', 'china'):
+                cached_data = self.cache.load_stock_data(metadata['cache_key'])
+                if cached_data is not None:
+                    result = StockDataResult.from_cache(cached_data, symbol, start_date, end_date)
+                    if result.ok:
+                        result.stale = True
+                        return result
         except Exception:
             pass
         
         return None
+
+    def _fallback_result(self, symbol: str, start_date: str, end_date: str, error_msg: str) -> StockDataResult:
+        """数据源和旧缓存都不可用时的失败结果"""
+        return StockDataResult.failure(symbol, 'unified',
+                                       self._generate_fallback_data(symbol, start_date, end_date, error_msg),
+                                       status=STATUS_ERROR, start_date=start_date, end_date=end_date)
     
     def _generate_fallback_data(self, symbol: str, start_date: str, end_date: str, error_msg: str) -> str:
         """生成备用数据"""
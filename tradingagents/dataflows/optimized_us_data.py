@@ -13,6 +13,8 @@ import yfinance as yf
 import pandas as pd
 from .cache_manager import get_cache
 from .config import get_config
+from .rate_limiter import wait_for_api
+from .provider_executor import run_blocking
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -25,22 +27,12 @@ class OptimizedUSDataProvider:
     def __init__(self):
         self.cache = get_cache()
         self.config = get_config()
-        self.last_api_call = 0
-        self.min_api_interval = 1.0  # 最小API调用间隔（秒）
         
         logger.info(f"📊 优化美股数据提供器初始化完成")
     
-    def _wait_for_rate_limit(self):
-        """等待API限制"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call
-        
-        if time_since_last_call < self.min_api_interval:
-            wait_time = self.min_api_interval - time_since_last_call
-            logger.info(f"⏳ API限制等待 {wait_time:.1f}s...")
-            time.sleep(wait_time)
-        
-        self.last_api_call = time.time()
+    def _wait_for_rate_limit(self, provider: str = "yfinance"):
+        """等待API限制 - 使用全局频率限制器中对应数据源的令牌桶"""
+        wait_for_api(provider, "optimized_us_data")
     
     def get_stock_data(self, symbol: str, start_date: str, end_date: str, 
                       force_refresh: bool = False) -> str:
@@ -87,22 +79,35 @@ class OptimizedUSDataProvider:
         formatted_data = None
         data_source = None
 
-        # 尝试FINNHUB API（优先）
-        try:
-            logger.info(f"🌐 从FINNHUB API获取数据: {symbol}")
-            self._wait_for_rate_limit()
-
-            formatted_data = self._get_data_from_finnhub(symbol, start_date, end_date)
-            if formatted_data and "❌" not in formatted_data:
-                data_source = "finnhub"
-                logger.info(f"✅ FINNHUB数据获取成功: {symbol}")
-            else:
-                logger.error(f"⚠️ FINNHUB数据获取失败，尝试备用方案")
+        # 日线序列中已有该股票的Yahoo Finance数据时，只补充缺失的日期，无需整段重新获取
+        if not force_refresh and self.cache.find_cache_entries(symbol.upper(), 'ohlcv', data_source='yfinance'):
+            try:
+                data = self._get_yfinance_history(symbol.upper(), start_date, end_date)
+                if not data.empty:
+                    formatted_data = self._format_stock_data(symbol, data, start_date, end_date)
+                    data_source = "yfinance"
+                    logger.info(f"⚡ 从日线序列加载美股数据: {symbol}")
+            except Exception as e:
+                logger.error(f"⚠️ 日线序列读取失败: {e}")
                 formatted_data = None
 
-        except Exception as e:
-            logger.error(f"❌ FINNHUB API调用失败: {e}")
-            formatted_data = None
+        # 尝试FINNHUB API（优先）
+        if not formatted_data:
+            try:
+                logger.info(f"🌐 从FINNHUB API获取数据: {symbol}")
+                self._wait_for_rate_limit("finnhub")
+
+                formatted_data = self._get_data_from_finnhub(symbol, start_date, end_date)
+                if formatted_data and "❌" not in formatted_data:
+                    data_source = "finnhub"
+                    logger.info(f"✅ FINNHUB数据获取成功: {symbol}")
+                else:
+                    logger.error(f"⚠️ FINNHUB数据获取失败，尝试备用方案")
+                    formatted_data = None
+
+            except Exception as e:
+                logger.error(f"❌ FINNHUB API调用失败: {e}")
+                formatted_data = None
 
         # 备用方案：根据股票类型选择合适的数据源
         if not formatted_data:
@@ -130,9 +135,7 @@ class OptimizedUSDataProvider:
                         # 备用方案：Yahoo Finance
                         logger.info(f"🔄 使用Yahoo Finance备用方案获取港股数据: {symbol}")
 
-                        self._wait_for_rate_limit()
-                        ticker = yf.Ticker(symbol)  # 港股代码保持原格式
-                        data = ticker.history(start=start_date, end=end_date)
+                        data = self._get_yfinance_history(symbol, start_date, end_date)  # 港股代码保持原格式
 
                         if not data.empty:
                             formatted_data = self._format_stock_data(symbol, data, start_date, end_date)
@@ -143,11 +146,8 @@ class OptimizedUSDataProvider:
                 else:
                     # 美股使用Yahoo Finance
                     logger.info(f"🇺🇸 从Yahoo Finance API获取美股数据: {symbol}")
-                    self._wait_for_rate_limit()
-
-                    # 获取数据
-                    ticker = yf.Ticker(symbol.upper())
-                    data = ticker.history(start=start_date, end=end_date)
+                    # 获取数据（已缓存的日期直接从日线序列读取）
+                    data = self._get_yfinance_history(symbol.upper(), start_date, end_date)
 
                     if data.empty:
                         error_msg = f"未找到股票 '{symbol}' 在 {start_date} 到 {end_date} 期间的数据"
@@ -179,6 +179,37 @@ class OptimizedUSDataProvider:
 
         return formatted_data
     
+    def _get_yfinance_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取Yahoo Finance日线数据 - 已覆盖的日期从日线序列读取，只请求缺失的边缘区间
+
+        Returns:
+            以日期为索引的日线数据（start_date 至 end_date，含两端）
+        """
+        cached, missing = self.cache.load_ohlcv_range(symbol, start_date, end_date, "yfinance")
+        frames = [] if cached is None else [cached]
+
+        for edge_start, edge_end in missing:
+            self._wait_for_rate_limit("yfinance")
+            # yfinance的end参数不含当天，向后顺延一天
+            edge_end_exclusive = (datetime.strptime(edge_end, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            data = run_blocking("yfinance", lambda: yf.Ticker(symbol).history(start=edge_start, end=edge_end_exclusive))
+            if data.empty:
+                continue
+
+            if data.index.tz is not None:
+                data.index = data.index.tz_localize(None)
+            data.index = data.index.normalize()
+            frames.append(data)
+            self.cache.save_ohlcv(symbol, data, edge_start, edge_end, "yfinance")
+
+        if not frames:
+            return pd.DataFrame()
+
+        combined = pd.concat(frames)
+        combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+        return combined.loc[start_date:end_date].copy()
+
     def _format_stock_data(self, symbol: str, data: pd.DataFrame, 
                           start_date: str, end_date: str) -> str:
         """格式化股票数据为字符串"""
@@ -243,23 +274,11 @@ class OptimizedUSDataProvider:
     def _try_get_old_cache(self, symbol: str, start_date: str, end_date: str) -> Optional[str]:
         """尝试获取过期的缓存数据作为备用"""
         try:
-            # 查找任何相关的缓存，不考虑TTL
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
-                try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    if (metadata.get('symbol') == symbol and 
-                        metadata.get('data_type') == 'stock_data' and
-                        metadata.get('market_type') == 'us'):
-                        
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
-                            return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
-                except Exception:
-                    continue
+            # 查找任何相关的缓存，不考虑TTL（按缓存时间从新到旧）
+            for metadata in self.cache.find_cache_entries(symbol, 'stock_data', 'us'):
+                cached_data = self.cache.load_stock_data(metadata['cache_key'])
+                if cached_data is not None:
+                    return str(cached_data) + "\n\n⚠️ 注意: 使用的是过期缓存数据"
         except Exception:
             pass
         
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+进程级价格数据存储
+同一个价格CSV在进程内只读取一次，按文件mtime失效，按LRU限制内存占用
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class PriceFrame:
+    """一份已加载的价格数据：原始行 + 解析好的日期索引"""
+
+    def __init__(self, data: pd.DataFrame):
+        # 原始数据保持CSV读取时的样子（字符串Date列、行号索引），调用方不得原地修改
+        self.data = data
+        self.dates = pd.DatetimeIndex(pd.to_datetime(data["Date"].astype(str).str[:10]))
+        self.is_sorted = self.dates.is_monotonic_increasing
+
+    def slice(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """返回 start_date 至 end_date（含两端）的原始行副本，保留原行号"""
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        if self.is_sorted:
+            left = self.dates.searchsorted(start, side="left")
+            right = self.dates.searchsorted(end, side="right")
+            return self.data.iloc[left:right].copy()
+        mask = (self.dates >= start) & (self.dates <= end)
+        return self.data[mask].copy()
+
+
+class PriceFrameStore:
+    """按文件路径缓存价格数据的LRU存储"""
+
+    def __init__(self, max_entries: int = 32):
+        """
+        初始化价格数据存储
+
+        Args:
+            max_entries: 最多缓存的文件数，超出后淘汰最久未使用的
+        """
+        self.max_entries = max_entries
+        self._frames: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, **read_csv_kwargs) -> PriceFrame:
+        """
+        获取价格数据，文件修改后自动重新加载
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._frames.get(path)
+            if cached is not None and cached[0] == version:
+                self._frames.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+
+        frame = PriceFrame(pd.read_csv(path, **read_csv_kwargs))
+
+        with self._lock:
+            self.misses += 1
+            self._frames[path] = (version, frame)
+            self._frames.move_to_end(path)
+            while len(self._frames) > self.max_entries:
+                evicted, _ = self._frames.popitem(last=False)
+                logger.debug(f"🧹 价格数据存储已满，淘汰: {os.path.basename(evicted)}")
+        return frame
+
+    def invalidate(self, path: Optional[str] = None):
+        """清除指定文件或全部缓存"""
+        with self._lock:
+            if path is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(os.path.abspath(path), None)
+
+    def get_statistics(self) -> dict:
+        """获取命中统计"""
+        with self._lock:
+            return {
+                'entries': len(self._frames),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# 全局实例
+_price_store: Optional[PriceFrameStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_store() -> PriceFrameStore:
+    """获取全局价格数据存储实例"""
+    global _price_store
+    if _price_store is None:
+        with _store_lock:
+            if _price_store is None:
+                _price_store = PriceFrameStore()
+    return _price_store
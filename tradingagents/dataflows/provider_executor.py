@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+第三方阻塞调用执行器
+AKShare、BaoStock、yfinance 等库只提供同步接口且不一定支持超时，
+所有这类调用在一个有界线程池中执行，按数据源限制并发数，并为每次调用设置截止时间。
+Python线程无法被强制终止：超时的调用仍会占用其数据源的并发名额直到返回，
+因此卡住的调用最多占满该数据源的名额，不会无限堆积线程和连接。
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 线程池大小和默认的单次调用截止时间（秒）
+BLOCKING_CALL_MAX_WORKERS = int(os.getenv('BLOCKING_CALL_MAX_WORKERS', 16))
+BLOCKING_CALL_TIMEOUT = float(os.getenv('BLOCKING_CALL_TIMEOUT', 60))
+
+# 各数据源同时进行的调用数上限（含已超时但仍在运行的调用）
+# BaoStock的登录会话是进程级全局状态，不支持并发调用
+DEFAULT_PROVIDER_LIMITS = {
+    'akshare': 4,
+    'baostock': 1,
+    'yfinance': 4,
+}
+DEFAULT_PROVIDER_LIMIT = 4
+
+
+class ProviderCallTimeout(TimeoutError):
+    """数据源调用超过截止时间"""
+
+
+class ProviderCallExecutor:
+    """按数据源限流的有界阻塞调用执行器"""
+
+    def __init__(self, max_workers: int = BLOCKING_CALL_MAX_WORKERS,
+                 provider_limits: Optional[Dict[str, int]] = None,
+                 default_timeout: float = BLOCKING_CALL_TIMEOUT):
+        """
+        Args:
+            max_workers: 线程池大小
+            provider_limits: 覆盖 DEFAULT_PROVIDER_LIMITS 中的并发上限
+            default_timeout: 未指定timeout时的截止时间（秒）
+        """
+        self.max_workers = max_workers
+        self.provider_limits = dict(DEFAULT_PROVIDER_LIMITS, **(provider_limits or {}))
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider_call")
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _provider_state(self, provider: str):
+        """返回 (并发名额, 统计字典)，调用方需持有锁"""
+        if provider not in self._slots:
+            limit = self.provider_limits.get(provider, DEFAULT_PROVIDER_LIMIT)
+            self._slots[provider] = threading.BoundedSemaphore(limit)
+            self._stats[provider] = {
+                'calls': 0, 'errors': 0, 'timeouts': 0,
+                'waiting': 0, 'max_waiting': 0, 'queued': 0,
+                'in_flight': 0, 'abandoned': 0,
+            }
+        return self._slots[provider], self._stats[provider]
+
+    def call(self, provider: str, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        在线程池中执行func并等待结果
+
+        Args:
+            provider: 数据源名称，用于并发限制和统计
+            func: 无参数的可调用对象
+            timeout: 截止时间（秒），包含等待并发名额的时间；None时使用默认值
+
+        Returns:
+            func的返回值；func抛出的异常原样抛出
+
+        Raises:
+            ProviderCallTimeout: 超过截止时间
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            slot, stats = self._provider_state(provider)
+            stats['waiting'] += 1
+            stats['max_waiting'] = max(stats['max_waiting'], stats['waiting'])
+
+        acquired = slot.acquire(timeout=timeout)
+        with self._lock:
+            stats['waiting'] -= 1
+            if not acquired:
+                stats['timeouts'] += 1
+        if not acquired:
+            logger.warning(f"⏱️ [{provider}] 并发名额已满，等待超过{timeout:g}秒")
+            raise ProviderCallTimeout(f"{provider}调用超时（{timeout:g}秒）：并发名额已满")
+
+        call_state = {'finished': False}
+        # 保留调用方的上下文变量（如本次分析的新闻备忘录）
+        context = contextvars.copy_context()
+
+        def task():
+            with self._lock:
+                stats['queued'] -= 1
+            try:
+                return context.run(func)
+            finally:
+                slot.release()
+                with self._lock:
+                    call_state['finished'] = True
+                    stats['in_flight'] -= 1
+                    if call_state.get('abandoned'):
+                        stats['abandoned'] -= 1
+
+        with self._lock:
+            stats['calls'] += 1
+            stats['in_flight'] += 1
+            stats['queued'] += 1
+        future = self._executor.submit(task)
+
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            cancelled = future.cancel()
+            with self._lock:
+                stats['timeouts'] += 1
+                if cancelled:
+                    # 尚未开始执行，直接归还名额
+                    stats['queued'] -= 1
+                    stats['in_flight'] -= 1
+                elif not call_state['finished']:
+                    call_state['abandoned'] = True
+                    stats['abandoned'] += 1
+            if cancelled:
+                slot.release()
+            logger.warning(f"⏱️ [{provider}] 调用超过{timeout:g}秒未返回")
+            raise ProviderCallTimeout(f"{provider}调用超时（{timeout:g}秒）")
+        except Exception:
+            with self._lock:
+                stats['errors'] += 1
+            raise
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """各数据源的调用、超时、排队统计"""
+        with self._lock:
+            providers = {name: dict(stats, limit=self.provider_limits.get(name, DEFAULT_PROVIDER_LIMIT))
+                         for name, stats in self._stats.items()}
+            queue_depth = sum(stats['queued'] for stats in self._stats.values())
+        return {
+            'max_workers': self.max_workers,
+            'queue_depth': queue_depth,
+            'providers': providers,
+        }
+
+
+_provider_executor: Optional[ProviderCallExecutor] = None
+_provider_executor_lock = threading.Lock()
+
+
+def get_provider_executor() -> ProviderCallExecutor:
+    """获取全局阻塞调用执行器"""
+    global _provider_executor
+    if _provider_executor is None:
+        with _provider_executor_lock:
+            if _provider_executor is None:
+                _provider_executor = ProviderCallExecutor()
+    return _provider_executor
+
+
+def run_blocking(provider: str, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+    """在全局执行器中执行一次数据源调用，见 ProviderCallExecutor.call"""
+    return get_provider_executor().call(provider, func, timeout)
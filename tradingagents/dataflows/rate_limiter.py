@@ -1,196 +1,268 @@
 #!/usr/bin/env python3
 """
 API频率限制管理器
-实现全局API调用计数器和精确的分钟级频率监控
+基于令牌桶(GCRA)实现按数据源划分的全局API频率控制
+只有在令牌耗尽时才会阻塞，不再对每次调用施加固定等待
 """
 
+import asyncio
 import time
 import threading
 from collections import deque
-from datetime import datetime, timedelta
 from typing import Dict, Optional
 
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
 
-class GlobalRateLimiter:
-    """全局API频率限制器"""
-    
-    def __init__(self, max_calls_per_minute: int = 950, safety_margin: int = 50):
+# 各数据源的默认配额：每分钟调用数 + 突发容量
+# 令牌桶在任意60秒窗口内最多放行 calls_per_minute + burst 次调用，
+# 因此 burst 同时充当安全边距（Tushare: 950 + 50 = 1000次/分钟）
+DEFAULT_BUCKET_CONFIGS = {
+    'tushare': {'calls_per_minute': 950, 'burst': 50},
+    'akshare': {'calls_per_minute': 120, 'burst': 10},
+    'finnhub': {'calls_per_minute': 55, 'burst': 5},
+    'yfinance': {'calls_per_minute': 120, 'burst': 10},
+    'dashscope': {'calls_per_minute': 300, 'burst': 20},
+}
+
+DEFAULT_PROVIDER = 'tushare'
+
+
+class TokenBucket:
+    """单个数据源的令牌桶"""
+
+    def __init__(self, name: str, calls_per_minute: int, burst: int = 1):
         """
-        初始化全局频率限制器
-        
+        初始化令牌桶
+
         Args:
-            max_calls_per_minute: 每分钟最大调用次数（默认950，为Tushare 1000次/分钟留出安全边距）
-            safety_margin: 安全边距，当接近限制时提前降速
+            name: 数据源名称
+            calls_per_minute: 每分钟补充的令牌数
+            burst: 桶容量，即允许的最大突发调用数
         """
-        self.max_calls_per_minute = max_calls_per_minute
-        self.safety_margin = safety_margin
-        self.warning_threshold = max_calls_per_minute - safety_margin
-        
-        # 使用deque存储调用时间戳，自动维护1分钟窗口
-        self.call_timestamps = deque()
+        self.name = name
+        self.calls_per_minute = calls_per_minute
+        self.capacity = max(1, burst)
+        self.rate = calls_per_minute / 60.0  # 每秒补充的令牌数
+
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
         self.lock = threading.Lock()
-        
-        # 动态调整的等待时间
-        self.base_wait_time = 0.5  # 基础等待时间（秒）
-        self.current_wait_time = self.base_wait_time
-        
-        # 统计信息
+
+        # 统计信息（滑动1分钟窗口只用于展示，不参与限流判断）
+        self.recent_calls = deque()
         self.total_calls = 0
         self.blocked_calls = 0
+        self.total_wait_time = 0.0
         self.last_reset_time = time.time()
-        
-        logger.info(f"📊 全局API频率限制器初始化完成")
-        logger.info(f"   最大调用频率: {max_calls_per_minute}/分钟")
-        logger.info(f"   警告阈值: {self.warning_threshold}/分钟")
-        logger.info(f"   基础等待时间: {self.base_wait_time}秒")
-    
-    def _cleanup_old_timestamps(self):
-        """清理超过1分钟的时间戳"""
-        current_time = time.time()
-        cutoff_time = current_time - 60  # 1分钟前
-        
-        while self.call_timestamps and self.call_timestamps[0] < cutoff_time:
-            self.call_timestamps.popleft()
-    
-    def get_current_call_count(self) -> int:
-        """获取当前1分钟内的调用次数"""
-        with self.lock:
-            self._cleanup_old_timestamps()
-            return len(self.call_timestamps)
-    
-    def get_remaining_calls(self) -> int:
-        """获取当前分钟内剩余可调用次数"""
-        current_count = self.get_current_call_count()
-        return max(0, self.max_calls_per_minute - current_count)
-    
-    def calculate_dynamic_wait_time(self, current_count: int = None) -> float:
-        """根据当前调用频率动态计算等待时间"""
-        if current_count is None:
-            current_count = self.get_current_call_count()
-        
-        if current_count >= self.max_calls_per_minute:
-            # 已达到限制，等待到下一分钟
-            oldest_timestamp = self.call_timestamps[0] if self.call_timestamps else time.time()
-            wait_time = 61 - (time.time() - oldest_timestamp)  # 等待到最老调用过期+1秒
-            return max(wait_time, 1.0)
-        
-        elif current_count >= self.warning_threshold:
-            # 接近限制，大幅增加等待时间
-            progress = (current_count - self.warning_threshold) / self.safety_margin
-            wait_time = self.base_wait_time * (1 + progress * 10)  # 最多增加10倍
-            return min(wait_time, 30.0)  # 最大等待30秒
-        
-        elif current_count >= self.warning_threshold * 0.7:
-            # 中等负载，适度增加等待时间
-            progress = (current_count - self.warning_threshold * 0.7) / (self.warning_threshold * 0.3)
-            wait_time = self.base_wait_time * (1 + progress * 2)  # 最多增加2倍
-            return wait_time
-        
-        else:
-            # 低负载，使用基础等待时间
-            return self.base_wait_time
-    
-    def wait_for_api_call(self, api_name: str = "unknown") -> bool:
+
+    def _refill(self, now: float):
+        """按流逝时间补充令牌（需持有锁）"""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def _record_call(self):
+        """记录一次放行的调用（需持有锁）"""
+        now = time.time()
+        self.recent_calls.append(now)
+        self.total_calls += 1
+        cutoff = now - 60
+        while self.recent_calls and self.recent_calls[0] < cutoff:
+            self.recent_calls.popleft()
+
+    def _reserve(self) -> float:
         """
-        等待API调用许可
-        
-        Args:
-            api_name: API名称，用于日志记录
-            
-        Returns:
-            bool: True表示可以调用，False表示被阻止
+        预留一个令牌并返回需要等待的秒数（需持有锁）
+
+        令牌不足时预支令牌（tokens可为负），等待时间即补足欠额所需时间，
+        这样并发等待者按到达顺序排队，不会集中在同一时刻醒来。
         """
-        # 初始化变量
-        need_long_wait = False
-        long_wait_time = 0
-        wait_time = self.base_wait_time
-        
-        # 第一步：检查当前状态
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        self._record_call()
+        if self.tokens >= 0:
+            return 0.0
+        self.blocked_calls += 1
+        wait_time = -self.tokens / self.rate if self.rate > 0 else float('inf')
+        self.total_wait_time += wait_time
+        return wait_time
+
+    def try_acquire(self) -> bool:
+        """非阻塞获取令牌，桶为空时立即返回False"""
         with self.lock:
-            current_time = time.time()
-            self._cleanup_old_timestamps()
-            
-            current_count = len(self.call_timestamps)
-            remaining_calls = self.max_calls_per_minute - current_count
-            
-            # 记录调用统计
-            self.total_calls += 1
-            
-            # 检查是否需要长时间等待
-            need_long_wait = current_count >= self.max_calls_per_minute
-            if need_long_wait:
-                self.blocked_calls += 1
-                oldest_timestamp = self.call_timestamps[0] if self.call_timestamps else current_time
-                long_wait_time = 61 - (current_time - oldest_timestamp)
-                
-                logger.warning(f"🚫 API调用频率已达限制 ({current_count}/{self.max_calls_per_minute})")
-                logger.warning(f"   API: {api_name}")
-                logger.warning(f"   等待时间: {long_wait_time:.1f}秒")
-        
-        # 第二步：如果需要长时间等待，释放锁后等待
-        if need_long_wait:
-            time.sleep(max(long_wait_time, 1.0))
-        
-        # 第三步：重新获取锁，记录调用并计算短等待
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self._record_call()
+                return True
+            return False
+
+    def wait(self, api_name: str = "unknown") -> float:
+        """阻塞直到获得令牌，返回实际等待的秒数"""
         with self.lock:
-            current_time = time.time()
-            self._cleanup_old_timestamps()
-            current_count = len(self.call_timestamps)
-            remaining_calls = self.max_calls_per_minute - current_count
-            
-            # 动态计算等待时间（传入current_count避免重复获取锁）
-            wait_time = self.calculate_dynamic_wait_time(current_count)
-            
-            # 记录调用
-            self.call_timestamps.append(current_time)
-            
-            # 日志记录
-            if current_count >= self.warning_threshold:
-                logger.warning(f"⚠️ API调用频率接近限制 ({current_count}/{self.max_calls_per_minute})")
-                logger.warning(f"   API: {api_name}")
-                logger.warning(f"   剩余调用: {remaining_calls}")
-                logger.warning(f"   动态等待: {wait_time:.1f}秒")
-            elif current_count % 100 == 0:  # 每100次调用记录一次
-                logger.info(f"📊 API调用统计: {current_count}/{self.max_calls_per_minute} (剩余: {remaining_calls})")
-        
-        # 第四步：应用等待时间（在锁外进行）
-        if wait_time > self.base_wait_time:
+            wait_time = self._reserve()
+        if wait_time > 0:
+            if wait_time >= 1.0:
+                logger.warning(f"🚫 [{self.name}] API调用频率已达限制，等待 {wait_time:.1f}秒 (API: {api_name})")
             time.sleep(wait_time)
-        else:
-            time.sleep(self.base_wait_time)
-        
-        return True
-    
+        return wait_time
+
+    async def acquire(self, api_name: str = "unknown") -> float:
+        """asyncio版本的获取令牌，等待期间不阻塞事件循环"""
+        with self.lock:
+            wait_time = self._reserve()
+        if wait_time > 0:
+            if wait_time >= 1.0:
+                logger.warning(f"🚫 [{self.name}] API调用频率已达限制，等待 {wait_time:.1f}秒 (API: {api_name})")
+            await asyncio.sleep(wait_time)
+        return wait_time
+
     def get_statistics(self) -> Dict:
-        """获取统计信息"""
+        """获取令牌桶统计信息"""
         with self.lock:
-            self._cleanup_old_timestamps()
-            current_time = time.time()
-            uptime = current_time - self.last_reset_time
-            current_count = len(self.call_timestamps)
-            remaining_calls = max(0, self.max_calls_per_minute - current_count)
-            
+            self._refill(time.monotonic())
+            now = time.time()
+            cutoff = now - 60
+            while self.recent_calls and self.recent_calls[0] < cutoff:
+                self.recent_calls.popleft()
+            uptime = now - self.last_reset_time
             return {
-                'current_calls_per_minute': current_count,
-                'max_calls_per_minute': self.max_calls_per_minute,
-                'remaining_calls': remaining_calls,
+                'calls_per_minute_limit': self.calls_per_minute,
+                'burst': self.capacity,
+                'available_tokens': max(0, int(self.tokens)),
+                'current_calls_per_minute': len(self.recent_calls),
                 'total_calls': self.total_calls,
                 'blocked_calls': self.blocked_calls,
-                'current_wait_time': self.current_wait_time,
+                'total_wait_seconds': self.total_wait_time,
                 'uptime_seconds': uptime,
-                'calls_per_second': self.total_calls / uptime if uptime > 0 else 0
+                'calls_per_second': self.total_calls / uptime if uptime > 0 else 0,
             }
-    
+
     def reset_statistics(self):
-        """重置统计信息"""
+        """重置统计信息（不影响令牌余量）"""
         with self.lock:
             self.total_calls = 0
             self.blocked_calls = 0
+            self.total_wait_time = 0.0
             self.last_reset_time = time.time()
-            logger.info("📊 API频率限制器统计信息已重置")
+
+
+class GlobalRateLimiter:
+    """全局API频率限制器，按数据源维护独立的令牌桶"""
+
+    def __init__(self, max_calls_per_minute: int = 950, safety_margin: int = 50,
+                 bucket_configs: Optional[Dict[str, Dict]] = None):
+        """
+        初始化全局频率限制器
+
+        Args:
+            max_calls_per_minute: Tushare每分钟最大调用次数（默认950，为Tushare 1000次/分钟留出安全边距）
+            safety_margin: Tushare令牌桶的突发容量，与每分钟调用数之和不超过官方限制
+            bucket_configs: 其他数据源的配额，格式 {name: {'calls_per_minute': int, 'burst': int}}
+        """
+        self.max_calls_per_minute = max_calls_per_minute
+        self.safety_margin = safety_margin
+
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, TokenBucket] = {}
+
+        configs = {name: dict(cfg) for name, cfg in DEFAULT_BUCKET_CONFIGS.items()}
+        configs[DEFAULT_PROVIDER] = {'calls_per_minute': max_calls_per_minute, 'burst': safety_margin}
+        if bucket_configs:
+            for name, cfg in bucket_configs.items():
+                configs.setdefault(name, {}).update(cfg)
+
+        for name, cfg in configs.items():
+            self.configure_bucket(name, cfg['calls_per_minute'], cfg.get('burst', 1))
+
+        logger.info(f"📊 全局API频率限制器初始化完成（令牌桶）")
+        for name, bucket in self.buckets.items():
+            logger.info(f"   {name}: {bucket.calls_per_minute}/分钟, 突发容量 {bucket.capacity}")
+
+    def configure_bucket(self, name: str, calls_per_minute: int, burst: int = 1) -> TokenBucket:
+        """新增或替换某个数据源的令牌桶"""
+        bucket = TokenBucket(name, calls_per_minute, burst)
+        with self.lock:
+            self.buckets[name] = bucket
+        return bucket
+
+    def get_bucket(self, provider: str = DEFAULT_PROVIDER) -> TokenBucket:
+        """获取数据源对应的令牌桶，未配置的数据源使用保守的默认配额"""
+        bucket = self.buckets.get(provider)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.get(provider)
+                if bucket is None:
+                    logger.info(f"📊 未配置的数据源 {provider}，使用默认配额 60/分钟")
+                    bucket = TokenBucket(provider, 60, 5)
+                    self.buckets[provider] = bucket
+        return bucket
+
+    def wait_for_api_call(self, api_name: str = "unknown", provider: str = DEFAULT_PROVIDER) -> bool:
+        """
+        等待API调用许可，只有令牌耗尽时才会阻塞
+
+        Args:
+            api_name: API名称，用于日志记录
+            provider: 数据源名称，对应令牌桶
+
+        Returns:
+            bool: 总是返回True（获得许可后返回）
+        """
+        self.get_bucket(provider).wait(api_name)
+        return True
+
+    def try_acquire(self, provider: str = DEFAULT_PROVIDER) -> bool:
+        """非阻塞获取调用许可，没有可用令牌时返回False"""
+        return self.get_bucket(provider).try_acquire()
+
+    async def acquire(self, provider: str = DEFAULT_PROVIDER, api_name: str = "unknown") -> bool:
+        """asyncio调用方使用的获取许可接口"""
+        await self.get_bucket(provider).acquire(api_name)
+        return True
+
+    def get_current_call_count(self, provider: str = DEFAULT_PROVIDER) -> int:
+        """获取当前1分钟内的调用次数"""
+        return self.get_bucket(provider).get_statistics()['current_calls_per_minute']
+
+    def get_remaining_calls(self, provider: str = DEFAULT_PROVIDER) -> int:
+        """获取当前可立即放行的调用次数"""
+        return self.get_bucket(provider).get_statistics()['available_tokens']
+
+    def get_statistics(self) -> Dict:
+        """
+        获取统计信息
+
+        顶层字段为Tushare令牌桶的统计（保持原有字段名），
+        'buckets' 中包含每个数据源的完整统计。
+        """
+        with self.lock:
+            buckets = dict(self.buckets)
+        bucket_stats = {name: bucket.get_statistics() for name, bucket in buckets.items()}
+        default = bucket_stats[DEFAULT_PROVIDER]
+
+        return {
+            'current_calls_per_minute': default['current_calls_per_minute'],
+            'max_calls_per_minute': default['calls_per_minute_limit'],
+            'remaining_calls': default['available_tokens'],
+            'total_calls': default['total_calls'],
+            'blocked_calls': default['blocked_calls'],
+            'total_wait_seconds': default['total_wait_seconds'],
+            'uptime_seconds': default['uptime_seconds'],
+            'calls_per_second': default['calls_per_second'],
+            'buckets': bucket_stats,
+        }
+
+    def reset_statistics(self):
+        """重置统计信息"""
+        with self.lock:
+            buckets = list(self.buckets.values())
+        for bucket in buckets:
+            bucket.reset_statistics()
+        logger.info("📊 API频率限制器统计信息已重置")
 
 
 # 全局实例
@@ -201,19 +273,24 @@ _limiter_lock = threading.Lock()
 def get_global_rate_limiter() -> GlobalRateLimiter:
     """获取全局频率限制器实例"""
     global _global_rate_limiter
-    
+
     if _global_rate_limiter is None:
         with _limiter_lock:
             if _global_rate_limiter is None:
                 _global_rate_limiter = GlobalRateLimiter()
-    
+
     return _global_rate_limiter
 
 
+def wait_for_api(provider: str, api_name: str = "unknown") -> bool:
+    """任意数据源API调用前的频率控制"""
+    limiter = get_global_rate_limiter()
+    return limiter.wait_for_api_call(api_name, provider=provider)
+
+
 def wait_for_tushare_api(api_name: str = "tushare") -> bool:
     """Tushare API调用前的频率控制"""
-    limiter = get_global_rate_limiter()
-    return limiter.wait_for_api_call(api_name)
+    return wait_for_api('tushare', api_name)
 
 
 def get_api_statistics() -> Dict:
@@ -225,4 +302,4 @@ def get_api_statistics() -> Dict:
 def reset_api_statistics():
     """重置API调用统计信息"""
     limiter = get_global_rate_limiter()
-    limiter.reset_statistics()
\ No newline at end of file
+    limiter.reset_statistics()
@@ -4,7 +4,6 @@
 解决新闻滞后性问题
 """
 
-import requests
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
@@ -14,6 +13,7 @@ from dataclasses import dataclass
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.http_clients import get_http_session
 logger = get_logger('agents')
 
 
@@ -37,6 +37,8 @@ class RealtimeNewsAggregator:
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
+        # 各新闻API共用进程级连接池
+        self.session = get_http_session()
         
         # API密钥配置
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
@@ -90,7 +92,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             news_data = response.json()
@@ -135,7 +137,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
@@ -195,7 +197,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
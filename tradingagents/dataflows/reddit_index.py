@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Reddit离线语料索引
+一次性扫描 reddit_data/<category>/*.jsonl，按日期分区记录每个帖子在文件中的偏移量，
+公司新闻帖子同时记录提及的股票代码。查询时只读取命中的帖子，多日查询是一次范围查询
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id   INTEGER PRIMARY KEY,
+    category  TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    UNIQUE (category, file_name)
+);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id   INTEGER PRIMARY KEY,
+    file_id   INTEGER NOT NULL,
+    line_no   INTEGER NOT NULL,
+    post_date TEXT NOT NULL,
+    ups       INTEGER NOT NULL,
+    offset    INTEGER NOT NULL,
+    length    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_date ON posts (post_date, file_id);
+CREATE INDEX IF NOT EXISTS idx_posts_file ON posts (file_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS post_tickers (
+    ticker    TEXT NOT NULL,
+    post_date TEXT NOT NULL,
+    post_id   INTEGER NOT NULL,
+    PRIMARY KEY (ticker, post_date, post_id)
+) WITHOUT ROWID;
+"""
+
+# 帖子 -> 提及的股票代码
+TickerTagger = Callable[[str, str], Iterable[str]]
+
+
+class RedditCorpusIndex:
+    """基于SQLite的Reddit语料索引，按文件mtime/大小增量更新"""
+
+    def __init__(self, data_path: str, tagger: Optional[TickerTagger] = None,
+                 tagger_version: str = "", index_path: Optional[str] = None):
+        """
+        初始化语料索引
+
+        Args:
+            data_path: reddit_data目录
+            tagger: 从(title, selftext)中识别股票代码的函数，用于公司新闻分类
+            tagger_version: 识别规则的版本号，与索引中记录的不同时整体重建
+            index_path: 索引文件路径，默认 data_path/.reddit_index.sqlite，不可写时放到临时目录
+        """
+        self.data_path = os.path.abspath(data_path)
+        self.tagger = tagger
+        self._lock = threading.Lock()
+        self.db_path, self._conn = self._open(index_path)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'tagger_version'").fetchone()
+            if row is None or row[0] != tagger_version:
+                if row is not None:
+                    logger.info(f"📋 股票代码识别规则已变化，重建Reddit索引")
+                self._conn.execute("DELETE FROM post_tickers")
+                self._conn.execute("DELETE FROM posts")
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('tagger_version', ?)",
+                    (tagger_version,),
+                )
+
+    def _open(self, index_path: Optional[str]) -> Tuple[str, sqlite3.Connection]:
+        candidates = [index_path] if index_path else [
+            os.path.join(self.data_path, ".reddit_index.sqlite"),
+            os.path.join(
+                tempfile.gettempdir(),
+                f"reddit_index_{hashlib.md5(self.data_path.encode()).hexdigest()[:12]}.sqlite",
+            ),
+        ]
+        last_error = None
+        for path in candidates:
+            try:
+                conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+                conn.execute("CREATE TABLE IF NOT EXISTS _probe (x INTEGER)")
+                conn.execute("DROP TABLE _probe")
+                return path, conn
+            except (sqlite3.Error, OSError) as e:
+                logger.debug(f"📋 Reddit索引路径不可用 {path}: {e}")
+                last_error = e
+        raise last_error
+
+    # ---------- 建索引 ----------
+
+    def refresh(self, category: str) -> int:
+        """
+        同步某个分类的索引：新增或修改过的文件重新扫描，已删除的文件移除
+
+        Returns:
+            重新扫描的文件数
+        """
+        category_dir = os.path.join(self.data_path, category)
+        on_disk = {}
+        for file_name in os.listdir(category_dir):
+            if file_name.endswith(".jsonl"):
+                stat = os.stat(os.path.join(category_dir, file_name))
+                on_disk[file_name] = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            indexed = {
+                row[1]: (row[0], (row[2], row[3]))
+                for row in self._conn.execute(
+                    "SELECT file_id, file_name, mtime_ns, size FROM files WHERE category = ?",
+                    (category,),
+                )
+            }
+
+            stale = [file_id for name, (file_id, version) in indexed.items()
+                     if on_disk.get(name) != version]
+            changed = [name for name, version in on_disk.items()
+                       if indexed.get(name, (None, None))[1] != version]
+            if not stale and not changed:
+                return 0
+
+            with self._conn:
+                for file_id in stale:
+                    self._drop_file(file_id)
+                for file_name in changed:
+                    self._index_file(category, file_name, on_disk[file_name])
+
+        logger.info(f"📋 Reddit索引已更新: {category} ({len(changed)}个文件)")
+        return len(changed)
+
+    def _drop_file(self, file_id: int):
+        self._conn.execute(
+            "DELETE FROM post_tickers WHERE post_id IN (SELECT post_id FROM posts WHERE file_id = ?)",
+            (file_id,),
+        )
+        self._conn.execute("DELETE FROM posts WHERE file_id = ?", (file_id,))
+        self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+
+    def _index_file(self, category: str, file_name: str, version: Tuple[int, int]):
+        file_id = self._conn.execute(
+            "INSERT INTO files (category, file_name, mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (category, file_name, version[0], version[1]),
+        ).lastrowid
+        tag = self.tagger if self.tagger is not None and "company" in category else None
+
+        ticker_rows = []
+        offset = 0
+        with open(os.path.join(self.data_path, category, file_name), "rb") as f:
+            for line_no, line in enumerate(f):
+                length = len(line)
+                if line.strip():
+                    post = json.loads(line)
+                    post_date = datetime.utcfromtimestamp(post["created_utc"]).strftime("%Y-%m-%d")
+                    post_id = self._conn.execute(
+                        "INSERT INTO posts (file_id, line_no, post_date, ups, offset, length) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (file_id, line_no, post_date, post["ups"], offset, length),
+                    ).lastrowid
+                    if tag is not None:
+                        ticker_rows.extend(
+                            (ticker, post_date, post_id) for ticker in tag(post["title"], post["selftext"])
+                        )
+                offset += length
+
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO post_tickers (ticker, post_date, post_id) VALUES (?, ?, ?)",
+            ticker_rows,
+        )
+
+    # ---------- 查询 ----------
+
+    def top_posts(self, category: str, start_date: str, end_date: str,
+                  limit_per_file: int, ticker: Optional[str] = None) -> Dict[Tuple[str, str], List[dict]]:
+        """
+        查询日期范围内每天、每个文件点赞数最高的帖子
+
+        Returns:
+            {(post_date, file_name): [帖子, ...]}，每组按点赞数降序（同票数保持文件中的顺序）
+        """
+        if ticker is None:
+            source = "posts p"
+            params: list = [category, start_date, end_date]
+            where = "f.category = ? AND p.post_date BETWEEN ? AND ?"
+        else:
+            source = "post_tickers t JOIN posts p ON p.post_id = t.post_id"
+            params = [ticker, start_date, end_date, category]
+            where = "t.ticker = ? AND t.post_date BETWEEN ? AND ? AND f.category = ?"
+
+        sql = f"""
+            SELECT post_date, file_name, offset, length FROM (
+                SELECT p.post_date, f.file_name, p.offset, p.length, p.ups, p.line_no,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY p.post_date, p.file_id ORDER BY p.ups DESC, p.line_no
+                       ) AS rank
+                FROM {source} JOIN files f ON f.file_id = p.file_id
+                WHERE {where}
+            )
+            WHERE rank <= ?
+            ORDER BY post_date, file_name, ups DESC, line_no
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit_per_file]).fetchall()
+
+        grouped: Dict[Tuple[str, str], List[dict]] = {}
+        handles = {}
+        try:
+            for post_date, file_name, offset, length in rows:
+                f = handles.get(file_name)
+                if f is None:
+                    f = handles[file_name] = open(os.path.join(self.data_path, category, file_name), "rb")
+                f.seek(offset)
+                grouped.setdefault((post_date, file_name), []).append(json.loads(f.read(length)))
+        finally:
+            for f in handles.values():
+                f.close()
+        return grouped
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,15 @@
 import requests
 import time
 import json
+import hashlib
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 from typing import Annotated
 import os
 import re
+import threading
+
+from .reddit_index import RedditCorpusIndex
 
 ticker_to_company = {
     "AAPL": "Apple",
@@ -49,87 +53,139 @@ ticker_to_company = {
 }
 
 
-def fetch_top_from_category(
+def _company_search_terms(ticker: str, company: str) -> list:
+    search_terms = company.split(" OR ") if "OR" in company else [company]
+    search_terms.append(ticker)
+    return search_terms
+
+
+class CompanyTermMatcher:
+    """
+    Case-insensitive matcher for the company search terms of each ticker.
+
+    Each ticker's terms are compiled once into a single alternation. Tickers are
+    kept as separate patterns because some terms overlap (e.g. "V" inside
+    "Nvidia"), and one global alternation would let one match hide another.
+    """
+
+    def __init__(self, companies: dict = None):
+        companies = ticker_to_company if companies is None else companies
+        self.patterns = {
+            ticker: re.compile(
+                "|".join(f"(?:{term})" for term in _company_search_terms(ticker, company)),
+                re.IGNORECASE,
+            )
+            for ticker, company in companies.items()
+        }
+        # changes whenever the term table does, so a persisted index knows to re-tag
+        self.version = hashlib.md5(
+            json.dumps(sorted(companies.items())).encode("utf-8")
+        ).hexdigest()
+
+    def mentions(self, ticker: str, title: str, selftext: str) -> bool:
+        """Whether the post mentions the given ticker's company."""
+        # no term can match across the newline, so one search covers both fields
+        return self.patterns[ticker].search(f"{title}\n{selftext}") is not None
+
+    def tag(self, title: str, selftext: str) -> list:
+        """Every ticker whose company is mentioned in the post's title or body."""
+        text = f"{title}\n{selftext}"
+        return [ticker for ticker, pattern in self.patterns.items() if pattern.search(text)]
+
+
+company_matcher = CompanyTermMatcher()
+
+
+def tag_company_tickers(title: str, selftext: str) -> list:
+    """Return every ticker in ``ticker_to_company`` mentioned in the post's title or body."""
+    return company_matcher.tag(title, selftext)
+
+
+_corpus_indexes = {}
+_corpus_indexes_lock = threading.Lock()
+
+
+def get_reddit_index(data_path: str) -> RedditCorpusIndex:
+    """Return the process-wide corpus index for ``data_path``, creating it on first use."""
+    key = os.path.abspath(data_path)
+    with _corpus_indexes_lock:
+        index = _corpus_indexes.get(key)
+        if index is None:
+            index = _corpus_indexes[key] = RedditCorpusIndex(
+                key, tagger=tag_company_tickers, tagger_version=company_matcher.version
+            )
+        return index
+
+
+def fetch_top_from_category_range(
     category: Annotated[
         str, "Category to fetch top post from. Collection of subreddits."
     ],
-    date: Annotated[str, "Date to fetch top posts from."],
-    max_limit: Annotated[int, "Maximum number of posts to fetch."],
+    start_date: Annotated[str, "First date (inclusive) to fetch top posts from."],
+    end_date: Annotated[str, "Last date (inclusive) to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch per day."],
     query: Annotated[str, "Optional query to search for in the subreddit."] = None,
     data_path: Annotated[
         str,
         "Path to the data folder. Default is 'reddit_data'.",
     ] = "reddit_data",
 ):
+    """
+    Same as calling ``fetch_top_from_category`` for every day in the range and
+    concatenating the results, but served from the pre-built corpus index with
+    a single range query.
+    """
     base_path = data_path
+    category_files = os.listdir(os.path.join(base_path, category))
 
-    all_content = []
-
-    if max_limit < len(os.listdir(os.path.join(base_path, category))):
+    if max_limit < len(category_files):
         raise ValueError(
             "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
         )
 
-    limit_per_subreddit = max_limit // len(
-        os.listdir(os.path.join(base_path, category))
-    )
-
-    for data_file in os.listdir(os.path.join(base_path, category)):
-        # check if data_file is a .jsonl file
-        if not data_file.endswith(".jsonl"):
-            continue
-
-        all_content_curr_subreddit = []
+    limit_per_subreddit = max_limit // len(category_files)
 
-        with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
-                # skip empty lines
-                if not line.strip():
-                    continue
-
-                parsed_line = json.loads(line)
-
-                # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
-                if post_date != date:
-                    continue
-
-                # if is company_news, check that the title or the content has the company's name (query) mentioned
-                if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
-                        continue
-
-                post = {
-                    "title": parsed_line["title"],
-                    "content": parsed_line["selftext"],
-                    "url": parsed_line["url"],
-                    "upvotes": parsed_line["ups"],
-                    "posted_date": post_date,
-                }
+    index = get_reddit_index(base_path)
+    index.refresh(category)
+    ticker = query if "company" in category and query else None
+    grouped = index.top_posts(
+        category, start_date, end_date, limit_per_subreddit, ticker=ticker
+    )
 
-                all_content_curr_subreddit.append(post)
+    all_content = []
+    curr_date = datetime.strptime(start_date, "%Y-%m-%d")
+    last_date = datetime.strptime(end_date, "%Y-%m-%d")
+    while curr_date <= last_date:
+        curr_date_str = curr_date.strftime("%Y-%m-%d")
+        # keep the directory listing order, as the per-day scan did
+        for data_file in category_files:
+            for parsed_line in grouped.get((curr_date_str, data_file), []):
+                all_content.append(
+                    {
+                        "title": parsed_line["title"],
+                        "content": parsed_line["selftext"],
+                        "url": parsed_line["url"],
+                        "upvotes": parsed_line["ups"],
+                        "posted_date": curr_date_str,
+                    }
+                )
+        curr_date += timedelta(days=1)
 
-        # sort all_content_curr_subreddit by upvote_ratio in descending order
-        all_content_curr_subreddit.sort(key=lambda x: x["upvotes"], reverse=True)
+    return all_content
 
-        all_content.extend(all_content_curr_subreddit[:limit_per_subreddit])
 
-    return all_content
+def fetch_top_from_category(
+    category: Annotated[
+        str, "Category to fetch top post from. Collection of subreddits."
+    ],
+    date: Annotated[str, "Date to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch."],
+    query: Annotated[str, "Optional query to search for in the subreddit."] = None,
+    data_path: Annotated[
+        str,
+        "Path to the data folder. Default is 'reddit_data'.",
+    ] = "reddit_data",
+):
+    return fetch_top_from_category_range(
+        category, date, date, max_limit, query=query, data_path=data_path
+    )
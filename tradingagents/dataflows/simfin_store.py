@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+SimFin财报数据存储
+全美公司财报CSV只解析一次：按 Ticker/Publish Date 排序后保存为列式文件，
+并在内存中建立每只股票的行区间索引，“某日期前最新一期财报”变为一次二分查找
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .frame_serializer import SERIALIZERS, deserialize_frame, serialize_frame
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class StatementTable:
+    """一份已排序的财报表：同一Ticker的行连续存放，组内按发布日期升序"""
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        # 发布日期（UTC纳秒），用于二分查找
+        self.publish_ns = data["Publish Date"].to_numpy(dtype="datetime64[ns]").view("i8")
+
+        tickers = data["Ticker"].to_numpy()
+        self.ticker_slices: Dict[str, Tuple[int, int]] = {}
+        if len(tickers):
+            starts = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]])
+            stops = np.r_[starts[1:], len(tickers)]
+            self.ticker_slices = {tickers[s]: (int(s), int(e)) for s, e in zip(starts, stops)}
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "StatementTable":
+        """读取SimFin原始CSV（分号分隔），解析日期并排序"""
+        df = pd.read_csv(csv_path, sep=";")
+        df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
+        df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
+        # 没有股票代码或发布日期的行永远不会被查到
+        df = df[df["Ticker"].notna() & df["Publish Date"].notna()]
+        # 稳定排序，保留原行号，同一发布日期的多行保持原始顺序
+        df = df.sort_values(["Ticker", "Publish Date"], kind="mergesort")
+        return cls(df)
+
+    def latest(self, ticker: str, curr_date: str) -> Optional[pd.Series]:
+        """
+        获取 curr_date 当天或之前发布的最新一期财报
+
+        同一天发布多行时返回原文件中靠前的一行（与 idxmax 一致）
+        """
+        bounds = self.ticker_slices.get(ticker)
+        if bounds is None:
+            return None
+        start, stop = bounds
+        dates = self.publish_ns[start:stop]
+        curr_ns = pd.to_datetime(curr_date, utc=True).normalize().value
+
+        pos = int(np.searchsorted(dates, curr_ns, side="right"))
+        if pos == 0:
+            return None
+        first = int(np.searchsorted(dates, dates[pos - 1], side="left"))
+        return self.data.iloc[start + first]
+
+
+class SimFinStore:
+    """按CSV路径缓存已预处理的财报表"""
+
+    def __init__(self, max_entries: int = 6):
+        """
+        初始化SimFin存储
+
+        Args:
+            max_entries: 内存中最多保留的财报表数量（年报/季报 × 三张表）
+        """
+        self.max_entries = max_entries
+        self._tables: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 同一个文件只允许一个线程做预处理
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def latest_statement(self, csv_path: str, ticker: str, curr_date: str) -> Optional[pd.Series]:
+        """获取某股票在 curr_date 当天或之前发布的最新一期财报，没有则返回None"""
+        return self.get_table(csv_path).latest(ticker, curr_date)
+
+    def get_table(self, csv_path: str) -> StatementTable:
+        """
+        获取财报表，原始CSV修改后自动重建
+
+        Raises:
+            FileNotFoundError: CSV不存在
+        """
+        csv_path = os.path.abspath(csv_path)
+        stat = os.stat(csv_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._tables.get(csv_path)
+            if cached is not None and cached[0] == version:
+                self._tables.move_to_end(csv_path)
+                return cached[1]
+            load_lock = self._load_locks.setdefault(csv_path, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                cached = self._tables.get(csv_path)
+                if cached is not None and cached[0] == version:
+                    return cached[1]
+
+            table = self._load_prepared(csv_path, stat.st_mtime_ns)
+            if table is None:
+                logger.info(f"📊 预处理SimFin数据: {os.path.basename(csv_path)}")
+                table = StatementTable.from_csv(csv_path)
+                self._save_prepared(csv_path, table)
+
+            with self._lock:
+                self._tables[csv_path] = (version, table)
+                self._tables.move_to_end(csv_path)
+                while len(self._tables) > self.max_entries:
+                    self._tables.popitem(last=False)
+        return table
+
+    @staticmethod
+    def _prepared_paths(csv_path: str):
+        return [(s.file_format, f"{csv_path}.{s.file_format}") for s in SERIALIZERS.values()]
+
+    def _load_prepared(self, csv_path: str, csv_mtime_ns: int) -> Optional[StatementTable]:
+        """读取比原始CSV新的列式预处理文件"""
+        for file_format, path in self._prepared_paths(csv_path):
+            try:
+                if os.stat(path).st_mtime_ns < csv_mtime_ns:
+                    continue
+                with open(path, "rb") as f:
+                    return StatementTable(deserialize_frame(file_format, f.read()))
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ SimFin预处理文件损坏，重新生成: {path}: {e}")
+        return None
+
+    def _save_prepared(self, csv_path: str, table: StatementTable):
+        """保存列式预处理文件，数据目录不可写时只保留内存结果"""
+        try:
+            file_format, payload = serialize_frame(table.data)
+            path = f"{csv_path}.{file_format}"
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            # 删除其他格式的旧预处理文件
+            for other_format, other_path in self._prepared_paths(csv_path):
+                if other_format != file_format and os.path.exists(other_path):
+                    os.remove(other_path)
+        except OSError as e:
+            logger.debug(f"📊 无法保存SimFin预处理文件: {e}")
+
+
+# 全局实例
+_simfin_store: Optional[SimFinStore] = None
+_store_lock = threading.Lock()
+
+
+def get_simfin_store() -> SimFinStore:
+    """获取全局SimFin存储实例"""
+    global _simfin_store
+    if _simfin_store is None:
+        with _store_lock:
+            if _simfin_store is None:
+                _simfin_store = SimFinStore()
+    return _simfin_store
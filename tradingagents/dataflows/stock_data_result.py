@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+A股行情数据结果
+数据源返回DataFrame + 元数据 + 状态，只在工具边界渲染为文本；
+缓存保存紧凑的DataFrame，元数据随DataFrame.attrs一起序列化
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"
+STATUS_ERROR = "error"
+
+# 各数据源的列名不同（Tushare为英文列名，AKShare为中文列名）
+_COLUMN_ALIASES = {
+    'close': ('close', '收盘'),
+    'high': ('high', '最高'),
+    'low': ('low', '最低'),
+    'volume': ('vol', 'volume', '成交量'),
+}
+
+STALE_CACHE_NOTE = "\n\n⚠️ 注意: 使用的是过期缓存数据"
+
+
+@dataclass
+class StockDataResult:
+    """一次A股行情数据获取的结果"""
+    symbol: str
+    source: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    data: Optional[pd.DataFrame] = None
+    status: str = STATUS_OK
+    error: Optional[str] = None
+    stock_name: Optional[str] = None
+    text: Optional[str] = None  # 只能提供格式化文本的数据源（TDX、旧版文本缓存）
+    stale: bool = False  # 是否来自过期缓存
+
+    @classmethod
+    def failure(cls, symbol: str, source: str, message: str,
+                status: str = STATUS_ERROR, **kwargs) -> 'StockDataResult':
+        """失败结果，message为展示给调用方的错误信息"""
+        return cls(symbol=symbol, source=source, status=status, error=message, **kwargs)
+
+    @classmethod
+    def from_frame(cls, symbol: str, source: str, data: Optional[pd.DataFrame],
+                   start_date: str = None, end_date: str = None,
+                   stock_name: str = None) -> 'StockDataResult':
+        """包装数据源返回的DataFrame，为空时返回empty状态"""
+        if data is None or data.empty:
+            return cls.failure(symbol, source, f"❌ 未能获取{symbol}的股票数据", status=STATUS_EMPTY,
+                               start_date=start_date, end_date=end_date)
+        return cls(symbol=symbol, source=source, start_date=start_date, end_date=end_date,
+                   data=data, stock_name=stock_name)
+
+    @classmethod
+    def from_text(cls, symbol: str, source: str, text: Optional[str],
+                  start_date: str = None, end_date: str = None) -> 'StockDataResult':
+        """包装格式化文本结果，沿用文本中的错误标记判断成败"""
+        if not text or "❌" in text or "错误" in text:
+            return cls.failure(symbol, source, text or f"❌ 未能获取{symbol}的股票数据",
+                               start_date=start_date, end_date=end_date)
+        return cls(symbol=symbol, source=source, start_date=start_date, end_date=end_date, text=text)
+
+    @classmethod
+    def from_cache(cls, cached, symbol: str, start_date: str = None,
+                   end_date: str = None) -> 'StockDataResult':
+        """从缓存内容恢复结果：DataFrame读取attrs中的元数据，旧版缓存为文本"""
+        if isinstance(cached, pd.DataFrame):
+            attrs = cached.attrs or {}
+            return cls(symbol=attrs.get('symbol', symbol),
+                       source=attrs.get('source', 'unified'),
+                       start_date=attrs.get('start_date', start_date),
+                       end_date=attrs.get('end_date', end_date),
+                       data=cached,
+                       stock_name=attrs.get('stock_name'))
+        return cls.from_text(symbol, 'unified', str(cached), start_date, end_date)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    def to_frame(self) -> pd.DataFrame:
+        """用于缓存的DataFrame，元数据写入attrs"""
+        frame = self.data.copy(deep=False)
+        frame.attrs = {
+            'symbol': self.symbol,
+            'source': self.source,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'stock_name': self.stock_name,
+        }
+        return frame
+
+    def column(self, name: str) -> Optional[pd.Series]:
+        """按统一列名（close/high/low/volume）取列"""
+        if self.data is None:
+            return None
+        for alias in _COLUMN_ALIASES.get(name, (name,)):
+            if alias in self.data.columns:
+                return self.data[alias]
+        return None
+
+    def latest_close(self) -> Optional[float]:
+        close = self.column('close')
+        if close is None or close.empty:
+            return None
+        return float(close.iloc[-1])
+
+    def change_pct(self) -> Optional[float]:
+        """最新收盘价相对前一交易日的涨跌幅（%）"""
+        close = self.column('close')
+        if close is None or len(close) < 2:
+            return None
+        prev_close = close.iloc[-2]
+        return float((close.iloc[-1] - prev_close) / prev_close * 100)
+
+    def latest_volume(self) -> float:
+        volume = self.column('volume')
+        if volume is None or volume.empty or pd.isna(volume.iloc[-1]):
+            return 0
+        return volume.iloc[-1]
+
+    def format_volume(self) -> str:
+        volume = self.latest_volume()
+        if volume > 10000:
+            return f"{volume/10000:.1f}万手"
+        elif volume > 0:
+            return f"{volume:.0f}手"
+        return "暂无数据"
+
+    def render(self) -> str:
+        """渲染为工具返回给LLM的文本"""
+        if not self.ok:
+            return self.error
+        if self.data is None:
+            text = self.text
+        elif self.source == 'tushare':
+            text = self._render_report()
+        else:
+            text = self._render_summary()
+        if self.stale:
+            text += STALE_CACHE_NOTE
+        return text
+
+    def _render_report(self) -> str:
+        """带实时行情概览的报告格式（Tushare）"""
+        stock_name = self.stock_name or f'股票{self.symbol}'
+        latest_close = self.latest_close()
+        change_pct = self.change_pct()
+
+        result = f"# {self.symbol} 股票数据分析\n\n"
+        result += f"## 📊 实时行情\n"
+        result += f"- 股票名称: {stock_name}\n"
+        result += f"- 股票代码: {self.symbol}\n"
+        result += f"- 当前价格: ¥{latest_close:.2f}\n"
+        result += f"- 涨跌幅: {f'{change_pct:+.2f}%' if change_pct is not None else 'N/A'}\n"
+        result += f"- 成交量: {self.format_volume()}\n"
+        result += f"- 数据来源: Tushare\n\n"
+        result += f"## 📈 历史数据概览\n"
+        result += f"- 数据期间: {self.start_date} 至 {self.end_date}\n"
+        result += f"- 数据条数: {len(self.data)}条\n"
+
+        high, low = self.column('high'), self.column('low')
+        if high is not None and low is not None:
+            result += f"- 期间最高: ¥{high.max():.2f}\n"
+            result += f"- 期间最低: ¥{low.min():.2f}\n\n"
+
+        result += "## 📋 最新交易数据\n"
+        result += self.data.tail(5).to_string(index=False)
+        return result
+
+    def _render_summary(self) -> str:
+        """最新数据摘要格式（AKShare/BaoStock）"""
+        result = f"股票代码: {self.symbol}\n"
+        result += f"数据期间: {self.start_date} 至 {self.end_date}\n"
+        result += f"数据条数: {len(self.data)}条\n\n"
+        result += "最新数据:\n"
+        result += self.data.tail(5).to_string(index=False)
+        return result
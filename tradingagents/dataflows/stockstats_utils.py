@@ -1,21 +1,20 @@
 import pandas as pd
 import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Dict, List, Sequence
 import os
 from .config import get_config
+from .price_store import get_price_store
+from .provider_executor import run_blocking
+
+
+NOT_TRADING_DAY = "N/A: Not a trading day (weekend or holiday)"
 
 
 class StockstatsUtils:
     @staticmethod
-    def get_stock_stats(
+    def load_price_data(
         symbol: Annotated[str, "ticker symbol for the company"],
-        indicator: Annotated[
-            str, "quantitative indicators based off of the stock data for the company"
-        ],
-        curr_date: Annotated[
-            str, "curr date for retrieving stock price data, YYYY-mm-dd"
-        ],
         data_dir: Annotated[
             str,
             "directory where the stock data is stored.",
@@ -24,64 +23,141 @@ class StockstatsUtils:
             bool,
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
-    ):
-        df = None
-        data = None
+    ) -> pd.DataFrame:
+        """Load the raw OHLCV frame used for indicator computation.
 
+        The returned frame always carries a string ``Date`` column whose first
+        ten characters are ``YYYY-mm-dd``. CSV files are read through the
+        process-wide price store, so the returned frame must not be mutated.
+        """
         if not online:
             try:
-                data = pd.read_csv(
+                data = get_price_store().get(
                     os.path.join(
                         data_dir,
                         f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
                     )
-                )
-                df = wrap(data)
+                ).data
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+            return data
+
+        # Get today's date as YYYY-mm-dd to add to cache
+        today_date = pd.Timestamp.today()
+
+        end_date = today_date
+        start_date = today_date - pd.DateOffset(years=15)
+        start_date = start_date.strftime("%Y-%m-%d")
+        end_date = end_date.strftime("%Y-%m-%d")
+
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+
+        if os.path.exists(data_file):
+            data = get_price_store().get(data_file).data.copy()
+            data["Date"] = pd.to_datetime(data["Date"])
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
-
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
-
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
-
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
-
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
-            return indicator_value
-        else:
-            return "N/A: Not a trading day (weekend or holiday)"
+            data = run_blocking("yfinance", lambda: yf.download(
+                symbol,
+                start=start_date,
+                end=end_date,
+                multi_level_index=False,
+                progress=False,
+                auto_adjust=True,
+            ))
+            data = data.reset_index()
+            data.to_csv(data_file, index=False)
+
+        data["Date"] = pd.to_datetime(data["Date"]).dt.strftime("%Y-%m-%d")
+        return data
+
+    @staticmethod
+    def compute_indicators(
+        data: Annotated[pd.DataFrame, "raw OHLCV frame from load_price_data"],
+        indicators: Annotated[
+            Sequence[str], "stockstats indicator names to compute as columns"
+        ],
+    ) -> Dict[str, Dict[str, object]]:
+        """Compute every indicator once over the whole frame.
+
+        Returns ``{indicator: {YYYY-mm-dd: value}}``. When a date occurs more
+        than once the first row wins, matching the per-day lookup.
+        """
+        date_keys = data["Date"].astype(str).str[:10].tolist()
+        # stockstats lowercases columns and moves the date into the index in place
+        df = wrap(data.copy())
+
+        result = {}
+        for indicator in indicators:
+            values = df[indicator].values
+            by_date = {}
+            for date_key, value in zip(date_keys, values):
+                if date_key not in by_date:
+                    by_date[date_key] = value
+            result[indicator] = by_date
+        return result
+
+    @staticmethod
+    def get_stock_stats_window(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicators: Annotated[
+            List[str],
+            "quantitative indicators based off of the stock data for the company",
+        ],
+        dates: Annotated[
+            Sequence[str], "dates for which to return values, YYYY-mm-dd"
+        ],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ) -> Dict[str, Dict[str, object]]:
+        """Vectorized counterpart of get_stock_stats for a set of dates.
+
+        The price data is loaded once and each indicator is computed once;
+        dates without a row map to the same "not a trading day" marker as
+        get_stock_stats.
+        """
+        data = StockstatsUtils.load_price_data(symbol, data_dir, online)
+        computed = StockstatsUtils.compute_indicators(data, indicators)
+
+        return {
+            indicator: {
+                date: by_date.get(date, NOT_TRADING_DAY) for date in dates
+            }
+            for indicator, by_date in computed.items()
+        }
+
+    @staticmethod
+    def get_stock_stats(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        curr_date: Annotated[
+            str, "curr date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ):
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        window = StockstatsUtils.get_stock_stats_window(
+            symbol, [indicator], [curr_date], data_dir, online
+        )
+        return window[indicator][curr_date]
@@ -51,6 +51,10 @@ except ImportError:
     logger.info(f"💡 安装命令: pip install pytdx")
 
 
+# 通达信协议单次行情请求最多包含的证券数量
+TDX_MAX_QUOTES_PER_REQUEST = 80
+
+
 class TongDaXinDataProvider:
     """通达信数据提供器"""
     
@@ -218,55 +222,83 @@ class TongDaXinDataProvider:
             _stock_name_cache[stock_code] = default_name
             return default_name
     
-    def get_real_time_data(self, stock_code: str) -> Dict:
+    def _get_quotes(self, pairs: List[Tuple[int, str]]) -> Dict[Tuple[int, str], Dict]:
         """
-        获取股票实时数据
+        批量获取行情，每批最多 TDX_MAX_QUOTES_PER_REQUEST 只证券，一批一次网络往返
         Args:
-            stock_code: 股票代码
+            pairs: [(市场代码, 证券代码)]，重复项只请求一次
         Returns:
-            Dict: 实时数据
+            Dict: {(市场代码, 证券代码): 行情}，没有返回行情的证券不在结果中
+        """
+        pairs = list(dict.fromkeys(pairs))
+        quotes = {}
+        for start in range(0, len(pairs), TDX_MAX_QUOTES_PER_REQUEST):
+            batch = pairs[start:start + TDX_MAX_QUOTES_PER_REQUEST]
+            data = self.api.get_security_quotes(batch) or []
+            by_code = {(int(q['market']), q['code']): q for q in data if 'market' in q and 'code' in q}
+            if len(by_code) == len(data):
+                quotes.update({pair: by_code[pair] for pair in batch if pair in by_code})
+            else:
+                # 返回结果不带代码字段时按请求顺序对应
+                quotes.update(zip(batch, data))
+        return quotes
+
+    def _format_quote(self, stock_code: str, quote: Dict) -> Dict:
+        """把pytdx行情转换为实时数据字典"""
+        # 安全获取字段，避免KeyError
+        def safe_get(key, default=0):
+            return quote.get(key, default)
+
+        return {
+            'code': stock_code,
+            'name': self._get_stock_name(stock_code),  # 使用独立的股票名称获取方法
+            'price': safe_get('price'),
+            'last_close': safe_get('last_close'),
+            'open': safe_get('open'),
+            'high': safe_get('high'),
+            'low': safe_get('low'),
+            'volume': safe_get('vol'),
+            'amount': safe_get('amount'),
+            'change': safe_get('price') - safe_get('last_close'),
+            'change_percent': ((safe_get('price') - safe_get('last_close')) / safe_get('last_close') * 100) if safe_get('last_close') > 0 else 0,
+            'bid_prices': [safe_get(f'bid{i}') for i in range(1, 6)],
+            'bid_volumes': [safe_get(f'bid_vol{i}') for i in range(1, 6)],
+            'ask_prices': [safe_get(f'ask{i}') for i in range(1, 6)],
+            'ask_volumes': [safe_get(f'ask_vol{i}') for i in range(1, 6)],
+            'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def get_real_time_data_many(self, stock_codes: List[str]) -> Dict[str, Dict]:
+        """
+        批量获取多只股票的实时数据（自选股、搜索结果等）
+        Args:
+            stock_codes: 股票代码列表
+        Returns:
+            Dict: {股票代码: 实时数据}，获取失败的股票不在结果中
         """
         if not self.connected:
             if not self.connect():
                 return {}
-        
-        try:
-            market = self._get_market_code(stock_code)
-            
-            # 获取实时数据
-            data = self.api.get_security_quotes([(market, stock_code)])
 
-            if not data:
-                return {}
+        try:
+            pairs = {code: (self._get_market_code(code), code) for code in stock_codes}
+            quotes = self._get_quotes(list(pairs.values()))
+            return {code: self._format_quote(code, quotes[pair])
+                    for code, pair in pairs.items() if pair in quotes}
 
-            quote = data[0]
-            
-            # 安全获取字段，避免KeyError
-            def safe_get(key, default=0):
-                return quote.get(key, default)
-
-            return {
-                'code': stock_code,
-                'name': self._get_stock_name(stock_code),  # 使用独立的股票名称获取方法
-                'price': safe_get('price'),
-                'last_close': safe_get('last_close'),
-                'open': safe_get('open'),
-                'high': safe_get('high'),
-                'low': safe_get('low'),
-                'volume': safe_get('vol'),
-                'amount': safe_get('amount'),
-                'change': safe_get('price') - safe_get('last_close'),
-                'change_percent': ((safe_get('price') - safe_get('last_close')) / safe_get('last_close') * 100) if safe_get('last_close') > 0 else 0,
-                'bid_prices': [safe_get(f'bid{i}') for i in range(1, 6)],
-                'bid_volumes': [safe_get(f'bid_vol{i}') for i in range(1, 6)],
-                'ask_prices': [safe_get(f'ask{i}') for i in range(1, 6)],
-                'ask_volumes': [safe_get(f'ask_vol{i}') for i in range(1, 6)],
-                'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
         except Exception as e:
-            logger.error(f"获取实时数据失败: {e}")
+            logger.error(f"批量获取实时数据失败: {e}")
             return {}
+
+    def get_real_time_data(self, stock_code: str) -> Dict:
+        """
+        获取股票实时数据
+        Args:
+            stock_code: 股票代码
+        Returns:
+            Dict: 实时数据
+        """
+        return self.get_real_time_data_many([stock_code]).get(stock_code, {})
     
     def get_stock_history_data(self, stock_code: str, start_date: str, end_date: str, period: str = 'D') -> pd.DataFrame:
         """
@@ -429,20 +461,23 @@ class TongDaXinDataProvider:
                 '工商银行': '601398'
             }
             
-            results = []
-            
             # 按关键词搜索
-            for name, code in stock_mapping.items():
-                if keyword.lower() in name.lower() or keyword in code:
-                    # 获取实时数据
-                    realtime_data = self.get_real_time_data(code)
-                    if realtime_data:
-                        results.append({
-                            'code': code,
-                            'name': name,
-                            'price': realtime_data.get('price', 0),
-                            'change_percent': realtime_data.get('change_percent', 0)
-                        })
+            matches = [(name, code) for name, code in stock_mapping.items()
+                       if keyword.lower() in name.lower() or keyword in code]
+
+            # 所有匹配的股票一次批量获取实时数据
+            realtime = self.get_real_time_data_many([code for _, code in matches])
+
+            results = []
+            for name, code in matches:
+                realtime_data = realtime.get(code)
+                if realtime_data:
+                    results.append({
+                        'code': code,
+                        'name': name,
+                        'price': realtime_data.get('price', 0),
+                        'change_percent': realtime_data.get('change_percent', 0)
+                    })
             
             return results
             
@@ -481,19 +516,22 @@ class TongDaXinDataProvider:
             }
             
             market_data = {}
-            
+
+            # 所有指数一次批量请求
+            quotes = self._get_quotes([(int(market), code) for market, code in indices.values()])
+
             for name, (market, code) in indices.items():
+                quote = quotes.get((int(market), code))
+                if not quote:
+                    continue
                 try:
-                    data = self.api.get_security_quotes([(int(market), code)])
-                    if data:
-                        quote = data[0]
-                        market_data[name] = {
-                            'price': quote['price'],
-                            'change': quote['price'] - quote['last_close'],
-                            'change_percent': ((quote['price'] - quote['last_close']) / quote['last_close'] * 100) if quote['last_close'] > 0 else 0,
-                            'volume': quote['vol']
-                        }
-                except:
+                    market_data[name] = {
+                        'price': quote['price'],
+                        'change': quote['price'] - quote['last_close'],
+                        'change_percent': ((quote['price'] - quote['last_close']) / quote['last_close'] * 100) if quote['last_close'] > 0 else 0,
+                        'volume': quote['vol']
+                    }
+                except KeyError:
                     continue
             
             return market_data
@@ -95,10 +95,6 @@ class TushareDataAdapter:
             return pd.DataFrame()
 
         try:
-            # 全局频率限制控制
-            if RATE_LIMITER_AVAILABLE:
-                wait_for_tushare_api(f"tushare_adapter_{symbol}_{data_type}")
-            
             logger.debug(f"🔄 获取{symbol}数据 (类型: {data_type})...")
 
             # 添加详细的股票代码追踪日志
@@ -119,6 +115,11 @@ class TushareDataAdapter:
             logger.error(f"❌ 获取{symbol}数据失败: {e}")
             return pd.DataFrame()
     
+    def _wait_for_rate_limit(self, caller: str):
+        """全局频率限制控制，在每次请求Tushare API前调用（缓存命中时不消耗额度）"""
+        if RATE_LIMITER_AVAILABLE:
+            wait_for_tushare_api(caller)
+
     def _get_daily_data(self, symbol: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
         """获取日线数据"""
 
@@ -127,85 +128,90 @@ class TushareDataAdapter:
         logger.info(f"🔍 [TushareAdapter详细日志] 输入参数: symbol='{symbol}', start_date='{start_date}', end_date='{end_date}'")
         logger.info(f"🔍 [TushareAdapter详细日志] 缓存启用状态: {self.enable_cache}")
 
-        # 1. 尝试从缓存获取
+        # 日期默认值与TushareProvider保持一致，日线序列按确定的日期区间读写
+        end_date = pd.to_datetime(end_date or datetime.now()).strftime('%Y-%m-%d')
+        start_date = pd.to_datetime(start_date or (datetime.now() - timedelta(days=365))).strftime('%Y-%m-%d')
+
+        # 1. 从日线序列读取已覆盖的部分，只获取缺失的边缘区间
+        cached = None
+        missing = [(start_date, end_date)]
         if self.enable_cache:
             try:
-                logger.info(f"🔍 [TushareAdapter详细日志] 开始查找缓存数据...")
-                cache_key = self.cache_manager.find_cached_stock_data(
-                    symbol=symbol,
-                    start_date=start_date,
-                    end_date=end_date,
-                    max_age_hours=24  # 日线数据缓存24小时
-                )
-
-                if cache_key:
-                    logger.info(f"🔍 [TushareAdapter详细日志] 找到缓存键: {cache_key}")
-                    cached_data = self.cache_manager.load_stock_data(cache_key)
-                    if cached_data is not None:
-                        # 检查是否为DataFrame且不为空
-                        if hasattr(cached_data, 'empty') and not cached_data.empty:
-                            logger.debug(f"📦 从缓存获取{symbol}数据: {len(cached_data)}条")
-                            logger.info(f"🔍 [TushareAdapter详细日志] 缓存数据有效，直接返回")
-                            return cached_data
-                        elif isinstance(cached_data, str) and cached_data.strip():
-                            logger.debug(f"📦 从缓存获取{symbol}数据: 字符串格式")
-                            logger.info(f"🔍 [TushareAdapter详细日志] 缓存数据为字符串格式")
-                            return cached_data
-                        else:
-                            logger.info(f"🔍 [TushareAdapter详细日志] 缓存数据无效: {type(cached_data)}")
-                    else:
-                        logger.info(f"🔍 [TushareAdapter详细日志] 缓存数据为None")
-                else:
-                    logger.info(f"🔍 [TushareAdapter详细日志] 未找到有效缓存")
+                cached, missing = self.cache_manager.load_ohlcv_range(symbol, start_date, end_date, "tushare")
             except Exception as e:
                 logger.warning(f"⚠️ 缓存获取失败: {e}")
                 logger.warning(f"⚠️ [TushareAdapter详细日志] 缓存异常类型: {type(e).__name__}")
         else:
             logger.info(f"🔍 [TushareAdapter详细日志] 缓存未启用，直接从API获取")
 
-        # 2. 从Tushare获取数据
-        logger.info(f"🔍 [股票代码追踪] _get_daily_data 调用 provider.get_stock_daily，传入参数: symbol='{symbol}'")
-        logger.info(f"🔍 [TushareAdapter详细日志] 开始调用Tushare Provider...")
+        if cached is not None and not missing:
+            logger.debug(f"📦 从日线序列获取{symbol}数据: {len(cached)}条")
+            return cached.reset_index()
 
+        # 2. 从Tushare获取缺失区间，只有真正请求API时才经过全局频率限制
         import time
-        provider_start_time = time.time()
-        data = self.provider.get_stock_daily(symbol, start_date, end_date)
-        provider_duration = time.time() - provider_start_time
+        frames = [] if cached is None else [cached]
+        undated = []
+        for edge_start, edge_end in missing:
+            logger.info(f"🔍 [股票代码追踪] _get_daily_data 调用 provider.get_stock_daily，传入参数: symbol='{symbol}', {edge_start} ~ {edge_end}")
 
-        logger.info(f"🔍 [TushareAdapter详细日志] Provider调用完成，耗时: {provider_duration:.3f}秒")
-        logger.info(f"🔍 [股票代码追踪] adapter.get_stock_data 返回数据形状: {data.shape if data is not None and hasattr(data, 'shape') else 'None'}")
+            self._wait_for_rate_limit(f"tushare_adapter_{symbol}_daily")
+            provider_start_time = time.time()
+            try:
+                data = self.provider.get_stock_daily(symbol, edge_start, edge_end, raise_errors=True)
+            except Exception as e:
+                # 请求失败不记录覆盖范围，下次重新获取
+                logger.warning(f"⚠️ Tushare获取失败: {symbol} ({edge_start} ~ {edge_end}): {e}")
+                continue
+            provider_duration = time.time() - provider_start_time
+            logger.info(f"🔍 [TushareAdapter详细日志] Provider调用完成，耗时: {provider_duration:.3f}秒")
+
+            if data is None or data.empty:
+                # 请求成功但区间内没有交易日（周末、节假日），同样记为已覆盖
+                logger.info(f"📭 Tushare区间内无交易数据: {symbol} ({edge_start} ~ {edge_end})")
+                if self.enable_cache:
+                    try:
+                        self.cache_manager.save_ohlcv(symbol, pd.DataFrame(), edge_start, edge_end, "tushare")
+                    except Exception as e:
+                        logger.warning(f"⚠️ 日线序列保存失败: {e}")
+                continue
 
-        if data is not None and not data.empty:
             logger.debug(f"✅ 从Tushare获取{symbol}数据成功: {len(data)}条")
-            logger.info(f"🔍 [股票代码追踪] provider.get_stock_daily 返回数据形状: {data.shape}")
-            logger.info(f"🔍 [TushareAdapter详细日志] 数据获取成功，开始检查数据内容...")
-
-            # 检查数据中的股票代码列
-            if 'ts_code' in data.columns:
-                unique_codes = data['ts_code'].unique()
-                logger.info(f"🔍 [股票代码追踪] 返回数据中的股票代码: {unique_codes}")
-            if 'symbol' in data.columns:
-                unique_symbols = data['symbol'].unique()
-                logger.info(f"🔍 [股票代码追踪] 返回数据中的symbol: {unique_symbols}")
-
-            logger.info(f"🔍 [TushareAdapter详细日志] 开始标准化数据...")
-            standardized_data = self._standardize_data(data)
-            logger.info(f"🔍 [TushareAdapter详细日志] 数据标准化完成")
-            return standardized_data
-        else:
-            logger.warning(f"⚠️ Tushare返回空数据")
-            logger.warning(f"⚠️ [TushareAdapter详细日志] 空数据详情: data={data}, type={type(data)}")
-            if data is not None:
-                logger.warning(f"⚠️ [TushareAdapter详细日志] DataFrame为空: {data.empty}")
+            edge = self._standardize_data(data)
+            if 'date' not in edge.columns:
+                # 无法按日期索引，不写入日线序列，最后与已获取的部分合并返回
+                logger.warning(f"⚠️ Tushare数据缺少日期列，未写入日线序列: {symbol} ({edge_start} ~ {edge_end})")
+                undated.append(edge)
+                continue
+            edge = edge.set_index('date')
+            frames.append(edge)
+
+            if self.enable_cache:
+                try:
+                    self.cache_manager.save_ohlcv(symbol, edge, edge_start, edge_end, "tushare")
+                except Exception as e:
+                    logger.warning(f"⚠️ 日线序列保存失败: {e}")
+
+        if not frames and not undated:
             return pd.DataFrame()
-    
+
+        parts = []
+        if frames:
+            combined = pd.concat(frames)
+            combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+            parts.append(combined.loc[start_date:end_date].reset_index())
+        if not undated:
+            return parts[0]
+        return pd.concat(parts + undated, ignore_index=True)
+
     def _get_realtime_data(self, symbol: str) -> pd.DataFrame:
         """获取实时数据（使用最新日线数据）"""
         
         # Tushare免费版不支持实时数据，使用最新日线数据
         end_date = datetime.now().strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
-        
+
+        self._wait_for_rate_limit(f"tushare_adapter_{symbol}_realtime")
         data = self.provider.get_stock_daily(symbol, start_date, end_date)
         
         if data is not None and not data.empty:
@@ -154,7 +154,8 @@ class TushareProvider:
             logger.error(f"❌ 获取股票列表失败: {e}")
             return pd.DataFrame()
     
-    def get_stock_daily(self, symbol: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+    def get_stock_daily(self, symbol: str, start_date: str = None, end_date: str = None,
+                        raise_errors: bool = False) -> pd.DataFrame:
         """
         获取股票日线数据
         
@@ -162,6 +163,8 @@ class TushareProvider:
             symbol: 股票代码（如：000001.SZ）
             start_date: 开始日期（YYYYMMDD）
             end_date: 结束日期（YYYYMMDD）
+            raise_errors: 获取失败时抛出异常而不是返回空DataFrame，
+                调用方据此区分"区间内没有交易日"和"请求失败"
             
         Returns:
             DataFrame: 日线数据
@@ -285,6 +288,8 @@ class TushareProvider:
             logger.error(f"❌ [Tushare详细日志] 异常信息: {str(e)}")
             import traceback
             logger.error(f"❌ [Tushare详细日志] 异常堆栈: {traceback.format_exc()}")
+            if raise_errors:
+                raise
             return pd.DataFrame()
     
     def get_stock_info(self, symbol: str) -> Dict:
@@ -7,6 +7,7 @@ import pandas as pd
 from functools import wraps
 
 from .utils import save_output, SavePathType, decorate_all_methods
+from .provider_executor import run_blocking
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -51,7 +52,7 @@ class YFinanceUtils:
         # add one day to the end_date so that the data range is inclusive
         end_date = pd.to_datetime(end_date) + pd.DateOffset(days=1)
         end_date = end_date.strftime("%Y-%m-%d")
-        stock_data = ticker.history(start=start_date, end=end_date)
+        stock_data = run_blocking("yfinance", lambda: ticker.history(start=start_date, end=end_date))
         # save_output(stock_data, f"Stock data for {ticker.ticker}", save_path)
         return stock_data
 
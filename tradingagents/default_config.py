@@ -17,8 +17,17 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # 分析师并行执行：各分析师在独立分支中运行，研究辩论前汇合
+    "parallel_analysts": False,
     # Tool settings
     "online_tools": True,
+    # Memory settings
+    # 嵌入向量磁盘缓存路径（SQLite），为None时只使用进程内LRU缓存
+    "embedding_cache_path": None,
+    # ChromaDB记忆持久化目录，为None时记忆只保存在进程内，重启后丢失
+    "memory_persist_path": os.getenv("TRADINGAGENTS_MEMORY_PATH"),
+    # 使用持久化记忆时，启动时从已存储的嵌入预热缓存
+    "memory_warm_up": True,
 
     # Note: Database and cache configuration is now managed by .env file and config.database_manager
     # No database/cache settings in default config to avoid configuration conflicts
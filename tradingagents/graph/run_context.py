@@ -0,0 +1,90 @@
+# TradingAgents/graph/run_context.py
+
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+@dataclass
+class RunContext:
+    """State of a single analysis run, returned by TradingAgentsGraph.run.
+
+    Everything a run produces lives here rather than on the graph instance,
+    so one compiled graph can serve concurrent runs.
+    """
+
+    ticker: str
+    trade_date: str
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    final_state: Optional[Dict[str, Any]] = None
+    decision: Any = None
+    log_path: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class StateLog:
+    """Append-only per-ticker state log in JSON Lines format.
+
+    Each run appends one line, so the write cost stays constant no matter
+    how many dates have been analyzed, and nothing accumulates in memory.
+    """
+
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_lock = threading.Lock()
+
+    def __init__(self, base_dir: str = "eval_results"):
+        self.base_dir = Path(base_dir)
+
+    def path_for(self, ticker: str) -> Path:
+        return self.base_dir / str(ticker) / "TradingAgentsStrategy_logs" / "full_states_log.jsonl"
+
+    @classmethod
+    def _lock_for(cls, path: Path) -> threading.Lock:
+        with cls._locks_lock:
+            return cls._locks.setdefault(str(path), threading.Lock())
+
+    def append(self, run: RunContext, entry: Dict[str, Any]) -> Path:
+        """Append one run's state entry and return the log path."""
+        path = self.path_for(run.ticker)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"run_id": run.run_id, "trade_date": str(run.trade_date), "state": entry}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock_for(path):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return path
+
+    def read(self, ticker: str) -> Dict[str, Dict[str, Any]]:
+        """Load the log as {trade_date: state}; the latest run for a date wins."""
+        path = self.path_for(ticker)
+        states = {}
+        if not path.exists():
+            return states
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程中断时可能留下不完整的最后一行
+                    logger.warning(f"⚠️ 跳过无法解析的状态日志行: {path}")
+                    continue
+                states[record["trade_date"]] = record["state"]
+        return states
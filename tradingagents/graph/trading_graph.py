@@ -1,8 +1,8 @@
 # TradingAgents/graph/trading_graph.py
 
+import asyncio
 import os
-from pathlib import Path
-import json
+import time
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
 
@@ -29,12 +29,14 @@ from tradingagents.agents.utils.agent_states import (
     RiskDebateState,
 )
 from tradingagents.dataflows.interface import set_config
+from tradingagents.dataflows.news_memo import news_memo_scope
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .run_context import RunContext, StateLog
 
 
 class TradingAgentsGraph:
@@ -177,10 +179,11 @@ class TradingAgentsGraph:
         self.reflector = Reflector(self.quick_thinking_llm)
         self.signal_processor = SignalProcessor(self.quick_thinking_llm)
 
-        # State tracking
+        # Per-run state lives in RunContext; these only mirror the most recent
+        # propagate() call for callers of reflect_and_remember without a run
         self.curr_state = None
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        self.state_log = StateLog()
 
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
@@ -232,16 +235,16 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def _prepare_propagation(self, company_name, trade_date):
+        """Create the run context, initial state and graph arguments."""
 
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的company_name: '{company_name}' (类型: {type(company_name)})")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的trade_date: '{trade_date}' (类型: {type(trade_date)})")
 
-        self.ticker = company_name
-        logger.debug(f"🔍 [GRAPH DEBUG] 设置self.ticker: '{self.ticker}'")
+        run = RunContext(ticker=company_name, trade_date=str(trade_date))
+        logger.debug(f"🔍 [GRAPH DEBUG] 创建运行上下文: run_id={run.run_id}, ticker='{run.ticker}'")
 
         # Initialize state
         logger.debug(f"🔍 [GRAPH DEBUG] 创建初始状态，传递参数: company_name='{company_name}', trade_date='{trade_date}'")
@@ -250,35 +253,104 @@ class TradingAgentsGraph:
         )
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的company_of_interest: '{init_agent_state.get('company_of_interest', 'NOT_FOUND')}'")
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的trade_date: '{init_agent_state.get('trade_date', 'NOT_FOUND')}'")
-        args = self.propagator.get_graph_args()
-
-        if self.debug:
-            # Debug mode with tracing
-            trace = []
-            for chunk in self.graph.stream(init_agent_state, **args):
-                if len(chunk["messages"]) == 0:
-                    pass
-                else:
-                    chunk["messages"][-1].pretty_print()
-                    trace.append(chunk)
-
-            final_state = trace[-1]
-        else:
-            # Standard mode without tracing
-            final_state = self.graph.invoke(init_agent_state, **args)
+        return run, init_agent_state, self.propagator.get_graph_args()
 
-        # Store current state for reflection
-        self.curr_state = final_state
+    def _finish_propagation(self, run, final_state):
+        """Log the final state and extract the decision into the run context."""
+
+        run.final_state = final_state
 
         # Log state
-        self._log_state(trade_date, final_state)
+        self._log_state(run)
+
+        # Extract decision and processed signal
+        run.decision = self.process_signal(final_state["final_trade_decision"], run.ticker)
+        run.finished_at = time.time()
+        return run
 
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+    def run(self, company_name, trade_date) -> RunContext:
+        """Run the trading agents graph for a company on a specific date.
+
+        Re-entrant: nothing is stored on the graph instance, so one compiled
+        graph can serve concurrent runs from several threads.
+        """
+
+        run, init_agent_state, args = self._prepare_propagation(company_name, trade_date)
+
+        # 本次运行内所有工具共享新闻抓取结果
+        with news_memo_scope():
+            if self.debug:
+                # Debug mode with tracing
+                trace = []
+                for chunk in self.graph.stream(init_agent_state, **args):
+                    if len(chunk["messages"]) == 0:
+                        pass
+                    else:
+                        chunk["messages"][-1].pretty_print()
+                        trace.append(chunk)
+
+                final_state = trace[-1]
+            else:
+                # Standard mode without tracing
+                final_state = self.graph.invoke(init_agent_state, **args)
+
+        return self._finish_propagation(run, final_state)
+
+    async def arun(self, company_name, trade_date) -> RunContext:
+        """Async counterpart of run, built on LangGraph ainvoke/astream.
+
+        Tool nodes and async-capable LLM adapters run on the event loop;
+        synchronous agent nodes are dispatched by LangGraph to its executor,
+        so many tickers can be driven from one loop and one instance.
+        """
 
-    def _log_state(self, trade_date, final_state):
-        """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        run, init_agent_state, args = self._prepare_propagation(company_name, trade_date)
+
+        # 本次运行内所有工具共享新闻抓取结果
+        with news_memo_scope():
+            if self.debug:
+                # Debug mode with tracing
+                trace = []
+                async for chunk in self.graph.astream(init_agent_state, **args):
+                    if len(chunk["messages"]) == 0:
+                        pass
+                    else:
+                        chunk["messages"][-1].pretty_print()
+                        trace.append(chunk)
+
+                final_state = trace[-1]
+            else:
+                # Standard mode without tracing
+                final_state = await self.graph.ainvoke(init_agent_state, **args)
+
+        # Signal extraction is a blocking LLM call and state logging writes a file
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._finish_propagation, run, final_state)
+
+    def propagate(self, company_name, trade_date):
+        """Run the graph and return (final_state, decision).
+
+        Also records the run as the instance's most recent state for
+        reflect_and_remember; use run() to keep results per call.
+        """
+        run = self.run(company_name, trade_date)
+        self._remember_last_run(run)
+        return run.final_state, run.decision
+
+    async def apropagate(self, company_name, trade_date):
+        """Async counterpart of propagate."""
+        run = await self.arun(company_name, trade_date)
+        self._remember_last_run(run)
+        return run.final_state, run.decision
+
+    def _remember_last_run(self, run):
+        self.ticker = run.ticker
+        self.curr_state = run.final_state
+
+    @staticmethod
+    def _state_log_entry(final_state):
+        """Select the parts of the final state that are written to the state log."""
+        return {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -308,32 +380,33 @@ class TradingAgentsGraph:
             "final_trade_decision": final_state["final_trade_decision"],
         }
 
-        # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
-        directory.mkdir(parents=True, exist_ok=True)
+    def _log_state(self, run):
+        """Append the run's final state to the per-ticker JSON Lines log."""
+        path = self.state_log.append(run, self._state_log_entry(run.final_state))
+        run.log_path = str(path)
 
-        with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
-            "w",
-        ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+    def reflect_and_remember(self, returns_losses, run: Optional[RunContext] = None):
+        """Reflect on decisions and update memory based on returns.
 
-    def reflect_and_remember(self, returns_losses):
-        """Reflect on decisions and update memory based on returns."""
+        Args:
+            returns_losses: Realized returns used for reflection
+            run: The run to reflect on; defaults to the last propagate() call
+        """
+        state = run.final_state if run is not None else self.curr_state
         self.reflector.reflect_bull_researcher(
-            self.curr_state, returns_losses, self.bull_memory
+            state, returns_losses, self.bull_memory
         )
         self.reflector.reflect_bear_researcher(
-            self.curr_state, returns_losses, self.bear_memory
+            state, returns_losses, self.bear_memory
         )
         self.reflector.reflect_trader(
-            self.curr_state, returns_losses, self.trader_memory
+            state, returns_losses, self.trader_memory
         )
         self.reflector.reflect_invest_judge(
-            self.curr_state, returns_losses, self.invest_judge_memory
+            state, returns_losses, self.invest_judge_memory
         )
         self.reflector.reflect_risk_manager(
-            self.curr_state, returns_losses, self.risk_manager_memory
+            state, returns_losses, self.risk_manager_memory
         )
 
     def process_signal(self, full_signal, stock_symbol=None):
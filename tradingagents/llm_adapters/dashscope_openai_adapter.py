@@ -56,8 +56,18 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         
         # 调用父类的生成方法
         result = super()._generate(*args, **kwargs)
+        self._track_token_usage(result, args, kwargs)
+        return result
+    
+    async def _agenerate(self, *args, **kwargs):
+        """异步生成（父类使用原生异步HTTP客户端），同样追踪 token 使用量"""
         
-        # 尝试追踪 token 使用量
+        result = await super()._agenerate(*args, **kwargs)
+        self._track_token_usage(result, args, kwargs)
+        return result
+    
+    def _track_token_usage(self, result, args, kwargs):
+        """从生成结果中提取并记录 token 使用量"""
         try:
             # 从结果中提取 token 使用信息
             if hasattr(result, 'llm_output') and result.llm_output:
@@ -84,8 +94,6 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         except Exception as track_error:
             # token 追踪失败不应该影响主要功能
             logger.error(f"⚠️ Token 追踪失败: {track_error}")
-        
-        return result
     
     def bind_tools(
         self,
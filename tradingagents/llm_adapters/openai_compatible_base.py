@@ -9,7 +9,7 @@ from typing import Any, Dict, List, Optional, Union
 from langchain_core.messages import BaseMessage
 from langchain_core.outputs import ChatResult
 from langchain_openai import ChatOpenAI
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_llm_logging
@@ -127,6 +127,29 @@ class OpenAICompatibleBase(ChatOpenAI):
         
         return result
     
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        异步生成聊天响应（父类使用原生异步HTTP客户端），并记录token使用量
+        """
+        
+        start_time = time.time()
+        
+        result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+        
+        if TOKEN_TRACKING_ENABLED:
+            try:
+                self._track_token_usage(result, kwargs, start_time)
+            except Exception as e:
+                logger.error(f"⚠️ {self.provider_name} Token追踪失败: {e}", exc_info=True)
+        
+        return result
+    
     def _track_token_usage(self, result: ChatResult, kwargs: Dict, start_time: float):
         """追踪token使用量"""
         
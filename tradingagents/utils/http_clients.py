@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+进程级共享HTTP客户端注册表
+按服务地址复用带连接池的 requests.Session 和 OpenAI 客户端，
+避免每次调用都重新建立TCP+TLS连接；超时与重试策略在这里统一配置
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import httpx
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  httpx启用HTTP/2需要h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# 每个服务地址的连接池大小、连接/读取超时（秒）和重试次数
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 10))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 60))
+# LLM接口（如带联网搜索的responses.create）响应可能远超数据接口，读取超时与OpenAI SDK默认值一致
+HTTP_LLM_READ_TIMEOUT = float(os.getenv('HTTP_LLM_READ_TIMEOUT', 600))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'false').lower() == 'true'
+
+# 只对连接错误和网关类错误重试；429由调用方按各自的退避策略处理
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def _origin(url: Optional[str]) -> str:
+    """scheme://host[:port]，连接池按此划分"""
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class PooledSession(requests.Session):
+    """未显式传入timeout时使用统一超时的Session"""
+
+    def __init__(self, timeout: Tuple[float, float]):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+class HTTPClientRegistry:
+    """按服务地址缓存共享客户端，线程安全"""
+
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 max_retries: int = HTTP_MAX_RETRIES,
+                 http2: bool = HTTP2_ENABLED,
+                 llm_read_timeout: float = HTTP_LLM_READ_TIMEOUT):
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.llm_read_timeout = llm_read_timeout
+        self.max_retries = max_retries
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("⚠️ 未安装h2，HTTP/2不可用，使用HTTP/1.1")
+
+        self._sessions: Dict[str, PooledSession] = {}
+        self._openai_clients: Dict[Tuple[str, Optional[str]], "OpenAI"] = {}
+        self._httpx_clients: Dict[str, "httpx.Client"] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> PooledSession:
+        session = PooledSession((self.connect_timeout, self.read_timeout))
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def session(self, url: Optional[str] = None) -> PooledSession:
+        """
+        获取url所在服务的共享Session
+
+        Session在线程间共享，请通过每次请求的headers参数传递请求头，不要修改session.headers
+        """
+        origin = _origin(url)
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = self._new_session()
+                self._sessions[origin] = session
+                logger.debug(f"🔧 [HTTP客户端] 创建连接池: {origin or '默认'}")
+            return session
+
+    def _llm_timeout(self) -> "httpx.Timeout":
+        return httpx.Timeout(self.llm_read_timeout, connect=self.connect_timeout)
+
+    def _httpx_client(self, origin: str) -> "httpx.Client":
+        """OpenAI客户端使用的httpx连接池，超时按LLM接口配置"""
+        client = self._httpx_clients.get(origin)
+        if client is None:
+            client = httpx.Client(
+                http2=self.http2,
+                timeout=self._llm_timeout(),
+                limits=httpx.Limits(max_connections=self.pool_maxsize,
+                                    max_keepalive_connections=self.pool_maxsize),
+            )
+            self._httpx_clients[origin] = client
+        return client
+
+    def openai_client(self, base_url: Optional[str] = None, api_key: Optional[str] = None) -> "OpenAI":
+        """
+        获取base_url对应的共享OpenAI客户端
+
+        同一服务地址的不同API Key共用一个连接池；api_key为None时由OpenAI SDK读取 OPENAI_API_KEY
+        """
+        if not OPENAI_AVAILABLE:
+            raise ImportError("openai库未安装，无法创建OpenAI客户端")
+
+        key = (base_url or '', api_key)
+        with self._lock:
+            client = self._openai_clients.get(key)
+            if client is None:
+                client = OpenAI(
+                    base_url=base_url,
+                    api_key=api_key,
+                    max_retries=self.max_retries,
+                    timeout=self._llm_timeout(),
+                    http_client=self._httpx_client(_origin(base_url)),
+                )
+                self._openai_clients[key] = client
+                logger.debug(f"🔧 [HTTP客户端] 创建OpenAI客户端: {base_url or '默认'}")
+            return client
+
+    def close(self):
+        """关闭所有连接池"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            for client in self._httpx_clients.values():
+                client.close()
+            self._sessions.clear()
+            self._httpx_clients.clear()
+            self._openai_clients.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'openai_clients': len(self._openai_clients),
+                'connection_pools': len(self._sessions) + len(self._httpx_clients),
+            }
+
+
+_registry: Optional[HTTPClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """获取全局HTTP客户端注册表"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = HTTPClientRegistry()
+    return _registry
+
+
+def get_http_session(url: Optional[str] = None) -> PooledSession:
+    """获取url所在服务的共享requests Session"""
+    return get_http_client_registry().session(url)
+
+
+def get_openai_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> "OpenAI":
+    """获取base_url对应的共享OpenAI客户端"""
+    return get_http_client_registry().openai_client(base_url, api_key)
@@ -280,6 +280,32 @@ def log_tool_usage(tool_name: str, symbol: str = None, **extra_data):
     tool_logger.info(f"📋 [工具使用] {tool_name}", extra=extra)
 
 
+def log_tool_timing(tool_name: str, duration: float, status: str, error: str = None, **extra_data):
+    """
+    记录一次工具执行的耗时和结果（用于不经过装饰器的工具调用）
+
+    Args:
+        tool_name: 工具名称
+        duration: 耗时（秒）
+        status: success / error / timeout / not_found
+        error: 错误信息（可选）
+        **extra_data: 额外的数据
+    """
+    extra = {
+        'tool_name': tool_name,
+        'event_type': f'tool_call_{status}',
+        'duration': duration,
+        'timestamp': datetime.now().isoformat(),
+        **extra_data
+    }
+
+    if status == 'success':
+        tool_logger.info(f"✅ [工具调用] {tool_name} - 完成 (耗时: {duration:.2f}s)", extra=extra)
+    else:
+        extra['error'] = error
+        tool_logger.warning(f"⚠️ [工具调用] {tool_name} - {status} (耗时: {duration:.2f}s): {error}", extra=extra)
+
+
 def log_analysis_step(step_name: str, symbol: str, **extra_data):
     """
     记录分析步骤的便捷函数
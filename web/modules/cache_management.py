@@ -256,28 +256,23 @@ def main():
     
     # 显示缓存文件列表
     try:
-        metadata_files = list(cache.metadata_dir.glob("*_meta.json"))
+        entries = cache.index.find(data_type=data_type)
         
-        if metadata_files:
-            import json
+        if entries:
             from datetime import datetime
             
             cache_items = []
-            for metadata_file in metadata_files:
+            for metadata in entries:
                 try:
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    if metadata.get('data_type') == data_type:
-                        cached_at = datetime.fromisoformat(metadata['cached_at'])
-                        cache_items.append({
-                            'symbol': metadata.get('symbol', 'N/A'),
-                            'data_source': metadata.get('data_source', 'N/A'),
-                            'cached_at': cached_at.strftime('%Y-%m-%d %H:%M:%S'),
-                            'start_date': metadata.get('start_date', 'N/A'),
-                            'end_date': metadata.get('end_date', 'N/A'),
-                            'file_path': metadata.get('file_path', 'N/A')
-                        })
+                    cached_at = datetime.fromisoformat(metadata['cached_at'])
+                    cache_items.append({
+                        'symbol': metadata.get('symbol') or 'N/A',
+                        'data_source': metadata.get('data_source') or 'N/A',
+                        'cached_at': cached_at.strftime('%Y-%m-%d %H:%M:%S'),
+                        'start_date': metadata.get('start_date') or 'N/A',
+                        'end_date': metadata.get('end_date') or 'N/A',
+                        'file_path': metadata.get('file_path') or 'N/A'
+                    })
                 except Exception:
                     continue
             
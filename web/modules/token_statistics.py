@@ -93,8 +93,7 @@ def render_token_statistics():
         render_provider_statistics(stats)
         
         # 显示成本趋势
-        if records:
-            render_cost_trends(records)
+        render_cost_trends(days)
         
         # 显示详细记录表
         render_detailed_records_table(records)
@@ -262,30 +261,18 @@ def render_provider_statistics(stats: Dict[str, Any]):
         )
         st.plotly_chart(fig_requests, use_container_width=True)
 
-def render_cost_trends(records: List[UsageRecord]):
+def render_cost_trends(days: int):
     """渲染成本趋势图"""
     st.markdown("**📈 成本趋势分析**")
     
-    # 按日期聚合数据
-    df_records = pd.DataFrame([
-        {
-            'date': datetime.fromisoformat(record.timestamp).date(),
-            'cost': record.cost,
-            'tokens': record.input_tokens + record.output_tokens,
-            'provider': record.provider
-        }
-        for record in records
-    ])
+    # 账本已按日期增量聚合，无需遍历全部记录
+    df_records = pd.DataFrame(config_manager.get_daily_usage(days))
     
     if df_records.empty:
         st.info("暂无趋势数据")
         return
     
-    # 按日期聚合
-    daily_stats = df_records.groupby('date').agg({
-        'cost': 'sum',
-        'tokens': 'sum'
-    }).reset_index()
+    daily_stats = df_records
     
     # 创建双轴图表
     fig = make_subplots(
@@ -367,21 +354,8 @@ def render_detailed_records_table(records: List[UsageRecord]):
 def load_detailed_records(days: int) -> List[UsageRecord]:
     """加载详细记录"""
     try:
-        all_records = config_manager.load_usage_records()
-        
-        # 过滤时间范围
-        cutoff_date = datetime.now() - timedelta(days=days)
-        filtered_records = []
-        
-        for record in all_records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    filtered_records.append(record)
-            except:
-                continue
-        
-        return filtered_records
+        # 在读取账本时按时间过滤，只构造时间范围内的记录
+        return config_manager.load_usage_records(days)
     except Exception as e:
         st.error(f"加载记录失败: {e}")
         return []